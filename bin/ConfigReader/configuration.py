@@ -19,10 +19,13 @@ import os
 import sys
 import configparser
 
-def get(section, key):
+def get(section, key, default=None):
+	""" Returns the value from the configuration file. If the key is missing, default is returned. Without a default the program exits """
 	try:
 		return config[section][key]
 	except KeyError:
+		if default != None:
+			return default
 		print("[%s] '%s' Key was not found in configuration file. Please check settings"%(section,key))
 		sys.exit(1)
 
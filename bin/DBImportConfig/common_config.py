@@ -21,15 +21,14 @@ import sys
 import logging
 import subprocess 
 import shutil
-import jaydebeapi
-import jpype
 import base64
 import re
 import json
 import ssl
+import hashlib
+import threading
 import requests
 from itertools import zip_longest
-from requests_kerberos import HTTPKerberosAuth
 from Crypto.PublicKey import RSA
 from Crypto.Cipher import AES, PKCS1_OAEP
 from subprocess import Popen, PIPE
@@ -42,6 +41,10 @@ from dateutil.tz import *
 import pandas as pd
 from sourceSchemaReader import schemaReader
 from common.Singleton import Singleton
+from common import httpSession
+from common import configDatabase
+from common import lazyImport
+from common import jdbcGatewayClient
 from common import constants as constant
 from DBImportConfig import decryption as decryption
 from common.Exceptions import *
@@ -51,11 +54,47 @@ from sqlalchemy_utils import create_view
 from sqlalchemy_views import CreateView, DropView
 from sqlalchemy.sql import text, alias, select
 from sqlalchemy.orm import aliased, sessionmaker, Query
-import pymongo
+
+# The JDBC and MongoDB drivers are loaded the first time a connection to a source or target is made
+jaydebeapi = lazyImport.lazyModule("jaydebeapi")
+jpype = lazyImport.lazyModule("jpype")
+pymongo = lazyImport.lazyModule("pymongo")
+
+# The configuration table is read with one query and cached for all config instances in the process.
+# The cache is reloaded when it is older than CONFIG_CACHE_TTL seconds, so changes made in the table are seen by running servers within that time
+CONFIG_CACHE_TTL = 60
+configCache = { "loadTime": None, "values": {} }
+configCacheLock = threading.Lock()
+
+# Resolved connection aliases are cached in the process so loops over many tables or DAGs dont have to query jdbc_connections,
+# jdbc_connections_drivers and decrypt the credentials for every call to lookupConnectionAlias()
+CONNECTION_ALIAS_CACHE_TTL = 60
+CONNECTION_ALIAS_ATTRIBUTES = ("dbAlias", "atlasJdbcSourceSupport",
+	"db_mssql", "db_oracle", "db_mysql", "db_postgresql", "db_progress", "db_db2udb", "db_db2as400", "db_mongodb",
+	"jdbc_url", "jdbc_environment", "jdbc_username", "jdbc_password", "jdbc_servertype", "jdbc_driver", "jdbc_classpath",
+	"jdbc_classpath_for_python", "jdbc_driver_for_python", "jdbc_hostname", "jdbc_port", "jdbc_database", "jdbc_ad_domain",
+	"jdbc_encrypt", "jdbc_encrypt_string", "jdbc_trustedservercert", "jdbc_trustedservercert_password", "jdbc_hostincert",
+	"jdbc_logintimeout", "jdbc_oracle_sid", "jdbc_oracle_servicename", "jdbc_force_column_lowercase", "mongoAuthSource")
+connectionAliasCache = {}
+connectionAliasCacheLock = threading.Lock()
+
+def getJDBCClasspath(classPaths):
+	""" Returns the JAR files from a list of jdbc_connections_drivers.classpath values. Drivers that are not configured, like NULL
+		or the 'add path to JAR file' placeholder, are skipped. Each value can contain more than one JAR file separated with : or , """
+	jarFiles = []
+	for classPath in classPaths:
+		if classPath == None:
+			continue
+
+		for jarFile in re.split("[:,]", classPath):
+			jarFile = jarFile.strip()
+			if jarFile.startswith("/") and jarFile not in jarFiles:
+				jarFiles.append(jarFile)
+	return jarFiles
 
 
 class config(object, metaclass=Singleton):
-	def __init__(self, Hive_DB=None, Hive_Table=None):
+	def __init__(self, Hive_DB=None, Hive_Table=None, instanceName=None):
 		logging.debug("Executing common_config.__init__()")
 
 		self.Hive_DB = Hive_DB
@@ -100,6 +139,10 @@ class config(object, metaclass=Singleton):
 		self.mongoClient = None
 		self.mongoDB = None
 		self.mongoAuthSource = None
+		self.jdbcPasswordFileContent = None
+		self.changeHistoryBatch = False
+		self.changeHistoryRows = []
+		self.configDatabaseStatisticsLogged = False
 		self.kerberosInitiated = False
 
 		self.sparkPathAppend = None
@@ -126,6 +169,13 @@ class config(object, metaclass=Singleton):
 		self.atlasRestEntities = None
 		self.atlasRestUniqueAttributeType = None
 		self.atlasJdbcSourceSupport = None
+		self.atlasRdbmsComplete = False
+		self.atlasBulkMaxEntities = None
+		self.atlasBulkMaxSize = None
+		self.atlasBatch = []
+		self.atlasBatchEntities = 0
+		self.atlasBatchSize = 0
+		self.atlasAsyncLineage = None
 
 		self.sourceSchema = None
 
@@ -178,6 +228,16 @@ class config(object, metaclass=Singleton):
 			except ValueError:
 				self.atlasTimeout = 5
 				logging.warning("Atlas timeout configuration does not contain a valid number. Setting the timeout to 5 seconds")
+			try:
+				self.atlasBulkMaxEntities = int(configuration.get("Atlas", "bulk_max_entities", default="1000"))
+			except ValueError:
+				self.atlasBulkMaxEntities = 1000
+				logging.warning("Atlas bulk_max_entities configuration does not contain a valid number. Setting it to 1000 entities")
+			try:
+				self.atlasBulkMaxSize = int(configuration.get("Atlas", "bulk_max_size_kb", default="4096")) * 1024
+			except ValueError:
+				self.atlasBulkMaxSize = 4096 * 1024
+				logging.warning("Atlas bulk_max_size_kb configuration does not contain a valid number. Setting it to 4096 kb")
 			if configuration.get("Atlas", "ssl_verify").lower() == "false":
 				self.atlasSSLverify = False
 			else:
@@ -186,8 +246,11 @@ class config(object, metaclass=Singleton):
 				else:
 					self.atlasSSLverify = True
 
-		# Sets and create a temporary directory
-		self.tempdir = "/tmp/dbimport." + str(os.getpid()) + ".tmp"
+		# Sets and create a temporary directory. Instances created with config.newInstance() needs an instanceName to get their own directory
+		if instanceName == None:
+			self.tempdir = "/tmp/dbimport." + str(os.getpid()) + ".tmp"
+		else:
+			self.tempdir = "/tmp/dbimport." + str(os.getpid()) + "." + instanceName + ".tmp"
 		try:
 			os.mkdir(self.tempdir)
 		except OSError: 
@@ -204,25 +267,18 @@ class config(object, metaclass=Singleton):
 #		# Fetch configuration about HDFS
 #		self.hdfs_address = configuration.get("HDFS", "hdfs_address")
 
-		# Fetch configuration about MySQL database and how to connect to it
-		mysql_hostname = configuration.get("Database", "mysql_hostname")
-		mysql_port =     configuration.get("Database", "mysql_port")
-		mysql_database = configuration.get("Database", "mysql_database")
-		mysql_username = configuration.get("Database", "mysql_username")
-		mysql_password = configuration.get("Database", "mysql_password")
-
 		if configuration.get("REST_statistics", "post_column_data").lower() == "true":
 			self.post_column_data = True
 		else:
 			self.post_column_data = False
 
-		# Esablish a connection to the DBImport database in MySQL
+		# JDBC connections are made through the JDBC gateway in the DBImport server if it's running on this host. Configuration
+		# files from before the gateway dont have the key, and the gateway is then disabled
+		self.jdbcGatewaySocket = configuration.get("Server", "jdbcGateway_socket", default="").strip()
+
+		# Esablish a connection to the DBImport database in MySQL. The connection is shared with all other users of the configuration database in this thread
 		try:
-			self.mysql_conn = mysql.connector.connect(host=mysql_hostname, 
-												 port=mysql_port, 
-												 database=mysql_database, 
-												 user=mysql_username, 
-												 password=mysql_password)
+			self.mysql_conn = configDatabase.configDatabase().getConnection()
 		except mysql.connector.Error as err:
 			if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
 				logging.error("Something is wrong with your user name or password")
@@ -665,31 +721,17 @@ class config(object, metaclass=Singleton):
 		returnValue = None
 		if self.atlasEnabled == True:
 			try:
-				if requestType == "POST":
-					response = requests.post(URL,
-						headers=self.atlasHeaders,
-						data=data,
-						timeout=self.atlasTimeout,
-						auth=HTTPKerberosAuth(),
-						verify=self.atlasSSLverify)
-
-				elif requestType == "GET":
-					response = requests.get(URL,
-						headers=self.atlasHeaders,
-						timeout=self.atlasTimeout,
-						auth=HTTPKerberosAuth(),
-						verify=self.atlasSSLverify)
-
-				elif requestType == "DELETE":
-					response = requests.delete(URL,
-						headers=self.atlasHeaders,
-						timeout=self.atlasTimeout,
-						auth=HTTPKerberosAuth(),
-						verify=self.atlasSSLverify)
-
-				else:
+				if requestType not in ("POST", "GET", "DELETE"):
 					raise ValueError 
 
+				# The session keeps the connection and the Kerberos context to Atlas between the calls
+				response = httpSession.httpSessions().request("atlas", requestType, URL,
+					kerberos=True,
+					headers=self.atlasHeaders,
+					data=data,
+					timeout=self.atlasTimeout,
+					verify=self.atlasSSLverify)
+
 				returnValue = { "statusCode": response.status_code, "data": response.text }
 				response.close()
 				log.debug("Atlas statusCode = %s"%(response.status_code))
@@ -729,6 +771,159 @@ class config(object, metaclass=Singleton):
 		log.debug("Executing common_config.atlasCommunicate() - Finished")
 		return returnValue
 
+	def atlasBatchAdd(self, jsonData, reference, logger=""):
+		""" Adds the entities in 'jsonData' to the pending bulk request against Atlas. 'reference' is returned together with the result
+			from atlasBatchFlush(). If the batch is full, it will be flushed before the new entities are added and the result from that
+			flush is returned. Otherwise an empty list is returned """
+		log = logging.getLogger(logger)
+		log.debug("Executing common_config.atlasBatchAdd()")
+
+		entityCount = len(jsonData["entities"]) + len(jsonData["referredEntities"])
+		dataSize = len(json.dumps(jsonData))
+
+		result = []
+		if len(self.atlasBatch) > 0:
+			if self.atlasBatchEntities + entityCount > self.atlasBulkMaxEntities or self.atlasBatchSize + dataSize > self.atlasBulkMaxSize:
+				result = self.atlasBatchFlush(logger=logger)
+
+		self.atlasBatch.append({ "jsonData": jsonData, "reference": reference })
+		self.atlasBatchEntities += entityCount
+		self.atlasBatchSize += dataSize
+
+		log.debug("Executing common_config.atlasBatchAdd() - Finished")
+		return result
+
+	def atlasBatchFlush(self, logger=""):
+		""" Sends all pending entities to Atlas in one bulk request. If the bulk request fails, every JSON in the batch is sent by itself
+			so a bad entity only fails its own JSON. Returns a list of (reference, result) tuples where result is True or False """
+		log = logging.getLogger(logger)
+		log.debug("Executing common_config.atlasBatchFlush()")
+
+		batch = self.atlasBatch
+		self.atlasBatch = []
+		self.atlasBatchEntities = 0
+		self.atlasBatchSize = 0
+
+		if len(batch) == 0:
+			return []
+
+		if len(batch) == 1:
+			jsonData = batch[0]["jsonData"]
+		else:
+			jsonData = self.atlasMergeBulkJSON([ item["jsonData"] for item in batch ])
+
+		response = self.atlasPostData(URL = self.atlasRestEntities, data = json.dumps(jsonData), logger=logger)
+		if response == None:
+			# Atlas could not be reached. There is no point in sending the entities one by one
+			return [ (item["reference"], False) for item in batch ]
+
+		if response["statusCode"] == 200:
+			log.debug("Atlas bulk request with %s JSON documents was successful"%(len(batch)))
+			return [ (item["reference"], True) for item in batch ]
+
+		if len(batch) == 1:
+			log.warning("Request from Atlas when updating %s was %s."%(batch[0]["reference"], response["statusCode"]))
+			log.warning("%s"%(response["data"]))
+			return [ (batch[0]["reference"], False) ]
+
+		log.warning("Atlas bulk request with %s JSON documents failed with %s. Sending them one by one"%(len(batch), response["statusCode"]))
+		result = []
+		for item in batch:
+			response = self.atlasPostData(URL = self.atlasRestEntities, data = json.dumps(item["jsonData"]), logger=logger)
+			if response == None:
+				result.append((item["reference"], False))
+			elif response["statusCode"] != 200:
+				log.warning("Request from Atlas when updating %s was %s."%(item["reference"], response["statusCode"]))
+				log.warning("%s"%(response["data"]))
+				result.append((item["reference"], False))
+			else:
+				result.append((item["reference"], True))
+
+		log.debug("Executing common_config.atlasBatchFlush() - Finished")
+		return result
+
+	def useAtlasOutbox(self):
+		""" Returns True if Atlas updates from imports and exports should be saved in the atlas_outbox table instead of being sent to Atlas directly """
+		if self.atlasEnabled == False:
+			return False
+
+		if self.atlasAsyncLineage == None:
+			self.atlasAsyncLineage = self.getConfigValue(key = "atlas_async_lineage")
+
+		return self.atlasAsyncLineage
+
+	def saveAtlasOutbox(self, outboxType, schemaName, tableName, jsonData):
+		""" Saves an Atlas update in the atlas_outbox table. The DBImport server will send it to Atlas """
+		logging.debug("Executing common_config.saveAtlasOutbox()")
+
+		query  = "insert into atlas_outbox (type, dbalias, schema_name, table_name, jsondata) "
+		query += "values (%s, %s, %s, %s, %s)"
+		logging.debug("Executing the following SQL: %s" % (query))
+		self.mysql_cursor.execute(query, (outboxType, self.dbAlias, schemaName, tableName, json.dumps(jsonData, default=str)))
+		self.mysql_conn.commit()
+
+		logging.debug("Executing common_config.saveAtlasOutbox() - Finished")
+
+	def getAtlasRdbmsSnapshot(self):
+		""" Returns self.source_columns_df and self.source_keys_df as a dict that can be saved as JSON """
+		snapshot = {}
+		snapshot["columns"] = self.source_columns_df.to_dict(orient='records')
+		snapshot["keys"] = self.source_keys_df.to_dict(orient='records')
+		return snapshot
+
+	def setAtlasRdbmsSnapshot(self, snapshot):
+		""" Restores self.source_columns_df and self.source_keys_df from a dict created by getAtlasRdbmsSnapshot() """
+		self.source_columns_df = pd.DataFrame(snapshot["columns"])
+		self.source_keys_df = pd.DataFrame(snapshot["keys"])
+
+		if "TABLE_CREATE_TIME" in self.source_columns_df.columns:
+			# The timestamp is a string after it was saved as JSON
+			self.source_columns_df["TABLE_CREATE_TIME"] = self.source_columns_df["TABLE_CREATE_TIME"].apply(lambda value: None if value == None else pd.to_datetime(value).to_pydatetime())
+
+	def atlasMergeBulkJSON(self, jsonList):
+		""" Merges a list of bulk entity JSON documents into one. The temporary guids are renumbered so they are unique in the merged
+			document and referredEntities with the same typeName and qualifiedName are only included once """
+		mergedData = {}
+		mergedData["referredEntities"] = {}
+		mergedData["entities"] = []
+		uniqueGuids = {}
+		nextGuid = 0
+
+		for jsonData in jsonList:
+			guidMap = {}
+			for guid, entity in jsonData["referredEntities"].items():
+				uniqueKey = (entity["typeName"], entity["attributes"].get("qualifiedName"))
+				if uniqueKey in uniqueGuids:
+					guidMap[guid] = uniqueGuids[uniqueKey]
+				else:
+					nextGuid = nextGuid - 1
+					guidMap[guid] = str(nextGuid)
+					uniqueGuids[uniqueKey] = guidMap[guid]
+
+			for guid, entity in jsonData["referredEntities"].items():
+				if guidMap[guid] not in mergedData["referredEntities"]:
+					mergedData["referredEntities"][guidMap[guid]] = self.atlasRemapGuids(entity, guidMap)
+
+			for entity in jsonData["entities"]:
+				mergedData["entities"].append(self.atlasRemapGuids(entity, guidMap))
+
+		return mergedData
+
+	def atlasRemapGuids(self, data, guidMap):
+		""" Returns a copy of 'data' where all guids found in 'guidMap' are replaced with the new guid """
+		if isinstance(data, dict):
+			returnData = {}
+			for key, value in data.items():
+				if key == "guid" and value in guidMap:
+					returnData[key] = guidMap[value]
+				else:
+					returnData[key] = self.atlasRemapGuids(value, guidMap)
+			return returnData
+		elif isinstance(data, list):
+			return [ self.atlasRemapGuids(value, guidMap) for value in data ]
+		else:
+			return data
+
 	def connectSQLAlchemy(self, exitIfFailure=True, logger=""):
 		log = logging.getLogger(logger)
 		""" Connects to the configuration database with SQLAlchemy """
@@ -737,19 +932,13 @@ class config(object, metaclass=Singleton):
 			# If we already have a connection, we just say that it's ok....
 			return True
 
-		self.connectStr = "mysql+pymysql://%s:%s@%s:%s/%s"%(
-			configuration.get("Database", "mysql_username"),
-			configuration.get("Database", "mysql_password"),
-			configuration.get("Database", "mysql_hostname"),
-			configuration.get("Database", "mysql_port"),
-			configuration.get("Database", "mysql_database"))
-
 		try:
-			self.configDB = sa.create_engine(self.connectStr, echo = self.debugLogLevel)
+			# The engine is shared by all config instances in the process, but have its own connections separate from self.mysql_conn
+			self.configDB = configDatabase.configDatabase().getEngine(echo = self.debugLogLevel)
 			self.configDB.connect()
 			self.configDBSession = sessionmaker(bind=self.configDB)
 
-		except sa.exc.OperationalError as err:
+		except (sa.exc.OperationalError, mysql.connector.Error) as err:
 			logging.error("%s"%err)
 			if exitIfFailure == True:
 				self.remove_temporary_files()
@@ -786,6 +975,18 @@ class config(object, metaclass=Singleton):
 	def remove_temporary_files(self):
 		logging.debug("Executing common_config.remove_temporary_files()")
 
+		# Save the change history for schema changes that was done before an error stopped the batch
+		if len(self.changeHistoryRows) > 0:
+			try:
+				self.saveChangeHistory()
+			except mysql.connector.Error as err:
+				logging.warning("Cant save the table change history. %s"%(err))
+
+		if self.configDatabaseStatisticsLogged == False:
+			self.configDatabaseStatisticsLogged = True
+			configDBStatistics = configDatabase.configDatabase().getStatistics()
+			logging.info("Configuration database: %s queries in %s seconds"%(configDBStatistics["queries"], configDBStatistics["seconds"]))
+
 		# Remove the kerberos ticket file
 		if self.kerberosInitiated == True:
 			klistCommandList = ['kdestroy']
@@ -948,6 +1149,7 @@ class config(object, metaclass=Singleton):
 			logging.debug("Executing the following SQL: %s" % (query))
 			self.mysql_cursor.execute(query, (encryptedStr, connection_alias))
 			self.mysql_conn.commit()
+			self.invalidateConnectionAliasCache(connection_alias)
 
 #		decryptedStr = self.crypto.decrypt(encryptedStr)
 #
@@ -967,7 +1169,7 @@ class config(object, metaclass=Singleton):
 		driver = row[0]
 		classPath = row[1]
 
-		if classPath == "add path to JAR file" or not classPath.startswith("/"):
+		if len(getJDBCClasspath([classPath])) == 0:
 			raise invalidConfiguration("Error: You need to specify the full path to the JAR files in the table 'jdbc_connections_drivers'")
 
 		logging.debug("Executing common_config.getJDBCDriverConfig() - Finished")
@@ -975,11 +1177,27 @@ class config(object, metaclass=Singleton):
 
 	def lookupConnectionAlias(self, connection_alias, decryptCredentials=True, copySlave=False):
 		logging.debug("Executing common_config.lookupConnectionAlias()")
+
+		cacheKey = (connection_alias, decryptCredentials, copySlave)
+		if self.getConnectionAliasFromCache(cacheKey) == True:
+			logging.debug("Connection alias '%s' fetched from cache"%(connection_alias))
+			logging.debug("Executing common_config.lookupConnectionAlias() - Finished")
+			return
 	
 		exit_after_function = False
 		self.dbAlias = connection_alias
 		self.atlasJdbcSourceSupport = False
 
+		# The same instance can be used to lookup many connections. The flags from the previous connection must be cleared
+		self.db_mssql = False
+		self.db_oracle = False
+		self.db_mysql = False
+		self.db_postgresql = False
+		self.db_progress = False
+		self.db_db2udb = False
+		self.db_db2as400 = False
+		self.db_mongodb = False
+
 		# Fetch data from jdbc_connection table
 		query = "select jdbc_url, credentials, private_key_path, public_key_path, environment from jdbc_connections where dbalias = %s "
 		logging.debug("Executing the following SQL: %s" % (query))
@@ -1009,13 +1227,7 @@ class config(object, metaclass=Singleton):
 		
 			self.jdbc_username = credentials.split(" ")[0]
 			self.jdbc_password = credentials.split(" ")[1]
-
-			# Sets a creates the password file that is used by sqoop and other tools
-			self.jdbc_password_file = self.tempdir + "/jdbc_passwd"
-			f = open(self.jdbc_password_file, "w")
-			f.write(self.jdbc_password)
-			f.close()
-			os.chmod(self.jdbc_password_file, 0o600)
+			self.writeJDBCPasswordFile()
 		else:
 			self.jdbc_username = None
 			self.jdbc_password = None
@@ -1313,6 +1525,59 @@ class config(object, metaclass=Singleton):
 		if exit_after_function == True:
 			raise Exception
 
+		self.saveConnectionAliasToCache(cacheKey)
+
+	def writeJDBCPasswordFile(self):
+		""" Creates the password file that is used by sqoop and other tools. The file is only written if the password changed """
+		self.jdbc_password_file = self.tempdir + "/jdbc_passwd"
+
+		if self.jdbcPasswordFileContent == self.jdbc_password and os.path.isfile(self.jdbc_password_file):
+			return
+
+		f = open(self.jdbc_password_file, "w")
+		f.write(self.jdbc_password)
+		f.close()
+		os.chmod(self.jdbc_password_file, 0o600)
+		self.jdbcPasswordFileContent = self.jdbc_password
+
+	def getConnectionAliasFromCache(self, cacheKey):
+		""" Sets all connection attributes from the connection alias cache. Returns False if the alias isnt cached or the cache entry is too old """
+		with connectionAliasCacheLock:
+			cacheEntry = connectionAliasCache.get(cacheKey)
+			if cacheEntry == None:
+				return False
+
+			if datetime.now() - cacheEntry["loadTime"] > timedelta(seconds=CONNECTION_ALIAS_CACHE_TTL):
+				connectionAliasCache.pop(cacheKey)
+				return False
+
+			for attribute, value in cacheEntry["attributes"].items():
+				setattr(self, attribute, value)
+
+		if self.jdbc_password != None:
+			self.writeJDBCPasswordFile()
+		else:
+			self.jdbc_password_file = None
+
+		return True
+
+	def saveConnectionAliasToCache(self, cacheKey):
+		""" Saves the connection attributes from the last lookupConnectionAlias() in the connection alias cache """
+		attributes = {}
+		for attribute in CONNECTION_ALIAS_ATTRIBUTES:
+			attributes[attribute] = getattr(self, attribute)
+
+		with connectionAliasCacheLock:
+			connectionAliasCache[cacheKey] = { "loadTime": datetime.now(), "attributes": attributes }
+
+	def invalidateConnectionAliasCache(self, connection_alias=None):
+		""" Removes the connection alias from the cache. If no alias is specified, the entire cache is cleared """
+		logging.debug("Executing common_config.invalidateConnectionAliasCache()")
+		with connectionAliasCacheLock:
+			for cacheKey in list(connectionAliasCache.keys()):
+				if connection_alias == None or cacheKey[0] == connection_alias:
+					connectionAliasCache.pop(cacheKey)
+
 #	def getMongoUri(self):
 #		mongoUri = "mongodb://%s:%s@%s:%s/"%(
 #			self.jdbc_username,
@@ -1347,6 +1612,39 @@ class config(object, metaclass=Singleton):
 
 		logging.debug("Executing common_config.getSourceTableDefinition() - Finished")
 
+	def getJDBCSchemaDefinition(self, source_schema):
+		""" Reads the columns and keys for all tables in a schema with one query each. Returns two dicts with the table name as key and the same DataFrame as getJDBCTableDefinition() would create for that table as value """
+		logging.debug("Executing common_config.getJDBCSchemaDefinition()")
+
+		# Connect to the source database
+		self.connectToJDBC()
+
+		columnsDF = self.sourceSchema.readTableColumns(	self.JDBCCursor,
+														serverType = self.jdbc_servertype,
+														database = self.jdbc_database,
+														schema = source_schema,
+														table = None)
+
+		keysDF = self.sourceSchema.readTableKeys(	self.JDBCCursor,
+													serverType = self.jdbc_servertype,
+													database = self.jdbc_database,
+													schema = source_schema,
+													table = None)
+
+		columnsDict = {}
+		keysDict = {}
+
+		if columnsDF.empty == False:
+			for tableName, tableDF in columnsDF.groupby('TABLE_NAME', sort=False):
+				columnsDict[tableName.strip()] = tableDF.drop(columns=['SCHEMA_NAME', 'TABLE_NAME']).reset_index(drop=True)
+
+		if keysDF.empty == False:
+			for tableName, tableDF in keysDF.groupby('TABLE_NAME', sort=False):
+				keysDict[tableName.strip()] = tableDF.drop(columns=['SCHEMA_NAME', 'TABLE_NAME']).reset_index(drop=True)
+
+		logging.debug("Executing common_config.getJDBCSchemaDefinition() - Finished")
+		return columnsDict, keysDict
+
 	def disconnectFromJDBC(self):
 		logging.debug("Disconnect from JDBC database")
 		try:
@@ -1368,9 +1666,7 @@ class config(object, metaclass=Singleton):
 			log.debug("Executing the following SQL: %s" % (query))
 			self.mysql_cursor.execute(query, )
 
-			self.jdbc_classpath_for_python = []
-			for row in self.mysql_cursor.fetchall():
-				self.jdbc_classpath_for_python.append(row[0])
+			self.jdbc_classpath_for_python = getJDBCClasspath([ row[0] for row in self.mysql_cursor.fetchall() ])
 
 		if self.JDBCCursor == None:
 			log.debug("Connecting to database over JDBC")
@@ -1380,18 +1676,36 @@ class config(object, metaclass=Singleton):
 			log.debug("	self.jdbc_url = %s"%(self.jdbc_url))
 			log.debug("	self.jdbc_classpath_for_python = %s"%(self.jdbc_classpath_for_python))
 
-			JDBCCredentials = [ self.jdbc_username, self.jdbc_password ]
-			try:
-				self.JDBCConn = jaydebeapi.connect(self.jdbc_driver, self.jdbc_url, JDBCCredentials , self.jdbc_classpath_for_python)
-				self.JDBCCursor = self.JDBCConn.cursor()
-			except jpype.JavaException as exception:
-				log.error("Connection to database over JDBC failed with the following error:")
-				log.error(exception.message())
-				if exitIfFailure == True:
-					self.remove_temporary_files()
-					sys.exit(1)
-				else:
-					return False
+			self.JDBCConn = None
+			if self.jdbcGatewaySocket != "":
+				try:
+					self.JDBCConn = jdbcGatewayClient.connect(self.jdbcGatewaySocket, self.dbAlias, self.jdbc_driver, self.jdbc_url, self.jdbc_username, self.jdbc_password)
+					self.JDBCCursor = self.JDBCConn.cursor()
+					log.debug("Connected to database through the JDBC gateway")
+				except jdbcGatewayUnavailable as errMsg:
+					log.debug("JDBC gateway is not available. Connecting without it. %s"%(errMsg))
+				except SQLerror as errMsg:
+					log.error("Connection to database over JDBC failed with the following error:")
+					log.error(errMsg)
+					if exitIfFailure == True:
+						self.remove_temporary_files()
+						sys.exit(1)
+					else:
+						return False
+
+			if self.JDBCConn == None:
+				JDBCCredentials = [ self.jdbc_username, self.jdbc_password ]
+				try:
+					self.JDBCConn = jaydebeapi.connect(self.jdbc_driver, self.jdbc_url, JDBCCredentials , self.jdbc_classpath_for_python)
+					self.JDBCCursor = self.JDBCConn.cursor()
+				except jpype.JavaException as exception:
+					log.error("Connection to database over JDBC failed with the following error:")
+					log.error(exception.message())
+					if exitIfFailure == True:
+						self.remove_temporary_files()
+						sys.exit(1)
+					else:
+						return False
 
 		return True
 
@@ -1584,6 +1898,38 @@ class config(object, metaclass=Singleton):
 		self.mysql_cursor.execute(query, (hiveDB, hiveTable, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), severity, importType, errorText))
 		self.mysql_conn.commit()
 
+	def beginChangeHistoryBatch(self):
+		""" Keeps the change history rows in memory until saveChangeHistory() is called. Used when many columns are changed at once """
+		logging.debug("Executing common_config.beginChangeHistoryBatch()")
+		self.changeHistoryBatch = True
+
+	def addChangeHistoryRow(self, query, values):
+		""" Queues a row for table_change_history or jdbc_table_change_history. The row is saved directly if no batch is started """
+		self.changeHistoryRows.append((query, values))
+
+		if self.changeHistoryBatch == False:
+			self.saveChangeHistory()
+
+	def saveChangeHistory(self):
+		""" Saves all queued change history rows with one executemany per statement and a single commit. This also ends the batch """
+		logging.debug("Executing common_config.saveChangeHistory()")
+		self.changeHistoryBatch = False
+
+		if len(self.changeHistoryRows) == 0:
+			return
+
+		queryValues = {}
+		for query, values in self.changeHistoryRows:
+			queryValues.setdefault(query, []).append(values)
+		self.changeHistoryRows = []
+
+		for query, valueList in queryValues.items():
+			logging.debug("SQL Statement executed: %s" % (query))
+			self.mysql_cursor.executemany(query, valueList)
+		self.mysql_conn.commit()
+
+		logging.debug("Executing common_config.saveChangeHistory() - Finished")
+
 	def logHiveColumnAdd(self, column, columnType=None, description=None, hiveDB=None, hiveTable=None):
 		if description == None:
 			description = "Column '%s' added to table with type '%s'"%(column, columnType)
@@ -1597,9 +1943,7 @@ class config(object, metaclass=Singleton):
 		query += "values "
 		query += "( %s, %s, %s, %s, 'column_added', %s, %s )"
 
-		logging.debug("SQL Statement executed: %s" % (query))
-		self.mysql_cursor.execute(query, (hiveDB, hiveTable, column, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), columnType, description))
-		self.mysql_conn.commit()
+		self.addChangeHistoryRow(query, (hiveDB, hiveTable, column, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), columnType, description))
 
 	def logHiveColumnTypeChange(self, column, columnType, previous_columnType=None, description=None, hiveDB=None, hiveTable=None):
 
@@ -1618,9 +1962,7 @@ class config(object, metaclass=Singleton):
 		query += "values "
 		query += "( %s, %s, %s, %s, 'column_type_change', %s, %s, %s )"
 
-		logging.debug("SQL Statement executed: %s" % (query))
-		self.mysql_cursor.execute(query, (hiveDB, hiveTable, column, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), previous_columnType, columnType, description))
-		self.mysql_conn.commit()
+		self.addChangeHistoryRow(query, (hiveDB, hiveTable, column, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), previous_columnType, columnType, description))
 
 	def logHiveColumnRename(self, columnName, previous_columnName, description=None, hiveDB=None, hiveTable=None):
 
@@ -1636,9 +1978,7 @@ class config(object, metaclass=Singleton):
 		query += "values "
 		query += "( %s, %s, %s, %s, 'column_rename', %s, %s, %s )"
 
-		logging.debug("SQL Statement executed: %s" % (query))
-		self.mysql_cursor.execute(query, (hiveDB, hiveTable, columnName, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), previous_columnName, columnName, description))
-		self.mysql_conn.commit()
+		self.addChangeHistoryRow(query, (hiveDB, hiveTable, columnName, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), previous_columnName, columnName, description))
 
 	def logJDBCColumnAdd(self, column, columnType=None, description=None, dbAlias=None, database=None, schema=None, table=None):
 		if description == None:
@@ -1649,9 +1989,7 @@ class config(object, metaclass=Singleton):
 		query += "values "
 		query += "( %s, %s, %s, %s, %s, %s, 'column_added', %s, %s )"
 
-		logging.debug("SQL Statement executed: %s" % (query))
-		self.mysql_cursor.execute(query, (dbAlias, database, schema, table, column, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), columnType, description))
-		self.mysql_conn.commit()
+		self.addChangeHistoryRow(query, (dbAlias, database, schema, table, column, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), columnType, description))
 
 	def logJDBCColumnTypeChange(self, column, columnType, previous_columnType=None, description=None, dbAlias=None, database=None, schema=None, table=None):
 
@@ -1666,9 +2004,7 @@ class config(object, metaclass=Singleton):
 		query += "values "
 		query += "( %s, %s, %s, %s, %s, %s, 'column_type_change', %s, %s, %s )"
 
-		logging.debug("SQL Statement executed: %s" % (query))
-		self.mysql_cursor.execute(query, (dbAlias, database, schema, table, column, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), previous_columnType, columnType, description))
-		self.mysql_conn.commit()
+		self.addChangeHistoryRow(query, (dbAlias, database, schema, table, column, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), previous_columnType, columnType, description))
 
 	def logJDBCColumnRename(self, columnName, previous_columnName, description=None, dbAlias=None, database=None, schema=None, table=None):
 
@@ -1680,9 +2016,7 @@ class config(object, metaclass=Singleton):
 		query += "values "
 		query += "( %s, %s, %s, %s, %s, %s, 'column_rename', %s, %s, %s )"
 
-		logging.debug("SQL Statement executed: %s" % (query))
-		self.mysql_cursor.execute(query, (dbAlias, database, schema, table, columnName, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), previous_columnName, columnName, description))
-		self.mysql_conn.commit()
+		self.addChangeHistoryRow(query, (dbAlias, database, schema, table, columnName, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), previous_columnName, columnName, description))
 
 	def getQuoteAroundColumn(self):
 		quoteAroundColumn = ""
@@ -1724,10 +2058,10 @@ class config(object, metaclass=Singleton):
 		returnValue = None
 		boolValue = False
 	
-		if key in ("hive_remove_locks_by_force", "airflow_disable", "import_start_disable", "import_stage_disable", "export_start_disable", "export_stage_disable", "hive_validate_before_execution", "hive_print_messages", "import_process_empty"):
+		if key in ("hive_remove_locks_by_force", "airflow_disable", "import_start_disable", "import_stage_disable", "export_start_disable", "export_stage_disable", "hive_validate_before_execution", "hive_print_messages", "import_process_empty", "atlas_async_lineage", "buffer_stage_statistics"):
 			valueColumn = "valueInt"
 			boolValue = True
-		elif key in ("sqoop_import_default_mappers", "sqoop_import_max_mappers", "sqoop_export_default_mappers", "sqoop_export_max_mappers", "spark_export_default_executors", "spark_export_max_executors", "spark_import_default_executors", "spark_import_max_executors", "atlas_discovery_interval"):
+		elif key in ("sqoop_import_default_mappers", "sqoop_import_max_mappers", "sqoop_export_default_mappers", "sqoop_export_max_mappers", "spark_export_default_executors", "spark_export_max_executors", "spark_import_default_executors", "spark_import_max_executors", "atlas_discovery_interval", "copy_sync_max_parallel"):
 			valueColumn = "valueInt"
 		elif key in ("import_staging_database", "export_staging_database", "hive_validate_table", "airflow_dbimport_commandpath", "airflow_dag_directory", "airflow_dag_staging_directory", "airflow_dag_file_group", "airflow_dag_file_permission", "airflow_dummy_task_queue", "cluster_name", "hdfs_address", "hdfs_blocksize", "hdfs_basedir"):
 			valueColumn = "valueStr"
@@ -1736,17 +2070,21 @@ class config(object, metaclass=Singleton):
 			self.remove_temporary_files()
 			sys.exit(1)
 
-		query = "select %s from configuration where configkey = '%s'"%(valueColumn, key)
-
-		logging.debug("SQL Statement executed: %s" % (query) )
-		self.mysql_cursor.execute(query)
-		row = self.mysql_cursor.fetchone()
+		row = self.getConfigCacheRow(key)
+		if row == None:
+			logging.error("Configuration Key '%s' does not exist in the configuration table"%(key))
+			self.remove_temporary_files()
+			sys.exit(1)
 
 		if valueColumn == "valueInt":
-			returnValue = int(row[0])
+			if row[valueColumn] == None:
+				logging.error("Configuration Key '%s' must have a value in '%s'"%(key, valueColumn))
+				self.remove_temporary_files()
+				sys.exit(1)
+			returnValue = int(row[valueColumn])
 
 		if valueColumn == "valueStr":
-			returnValue = row[0]
+			returnValue = row[valueColumn]
 			if returnValue == None or returnValue.strip() == "":
 				logging.error("Configuration Key '%s' must have a value in '%s'"%(key, valueColumn))
 				self.remove_temporary_files()
@@ -1766,6 +2104,33 @@ class config(object, metaclass=Singleton):
 		logging.debug("Executing common_config.getConfigValue() - Finished")
 		return returnValue
 
+	def getConfigCacheRow(self, key):
+		""" Returns a dict with valueInt and valueStr for the key from the configuration cache. The cache is loaded if it is empty or expired """
+		with configCacheLock:
+			loadTime = configCache["loadTime"]
+			if loadTime == None or datetime.now() - loadTime > timedelta(seconds=CONFIG_CACHE_TTL):
+				self.loadConfigCache()
+
+			return configCache["values"].get(key)
+
+	def loadConfigCache(self):
+		""" Reads the entire configuration table into the cache. Must be called with configCacheLock held """
+		logging.debug("Executing common_config.loadConfigCache()")
+
+		query = "select configKey, valueInt, valueStr from configuration"
+
+		logging.debug("SQL Statement executed: %s" % (query) )
+		self.mysql_cursor.execute(query)
+
+		values = {}
+		for row in self.mysql_cursor.fetchall():
+			values[row[0]] = { "valueInt": row[1], "valueStr": row[2] }
+
+		configCache["values"] = values
+		configCache["loadTime"] = datetime.now()
+
+		logging.debug("Executing common_config.loadConfigCache() - Finished")
+
 	def connectToMongo(self, exitIfFailure=True, logger=""):
 		log = logging.getLogger(logger)
 		log.debug("Executing common_config.connectToMongo()")
@@ -1952,27 +2317,38 @@ class config(object, metaclass=Singleton):
 		if printInfo == True:
 			log.info("Updating Atlas with remote database schema")
 
+		jsonData = self.getAtlasRdbmsTableJSON(schemaName = schemaName, tableName = tableName, logger=logger)
+		if jsonData == None:
+			return False
+
+		response = self.atlasPostData(URL = self.atlasRestEntities, data = json.dumps(jsonData))
+		if response == None:
+			return False
+
+		statusCode = response["statusCode"]
+		if statusCode != 200:
+			log.warning("Request from Atlas when updating source schema was %s."%(statusCode))
+			log.warning("%s"%(response["data"]))
+			self.atlasEnabled == False
+			return False
+
+		return self.updateAtlasRdbmsColumnsAndKeys(schemaName = schemaName, tableName = tableName, printInfo = printInfo, logger=logger)
+		log.debug("Executing common_config.updateAtlasWithSourceSchema() - Finished")
+
+	def getAtlasRdbmsTableJSON(self, schemaName, tableName, logger=""):
+		""" Returns the JSON for the rdbms_table and all rdbms_column entities based on self.source_columns_df and self.source_keys_df """
+		log = logging.getLogger(logger)
+		log.debug("Executing common_config.getAtlasRdbmsTableJSON()")
+
 		# Get the referredEntities part of the JSON. This is common for both import and export as the rdbms_* in Atlas is the same
 		jsonData = self.getAtlasRdbmsReferredEntities(	schemaName = schemaName,
 														tableName = tableName
 														)
-
-		# Get the unique names for the rdbms_* entities. This is common for both import and export as the rdbms_* in Atlas is the same
-		returnDict = self.getAtlasRdbmsNames(schemaName = schemaName, tableName = tableName)
-		if returnDict == None:
-			return False
-
-		tableUri = returnDict["tableUri"]
-		dbUri = returnDict["dbUri"]
-		dbName = returnDict["dbName"]
-		instanceUri = returnDict["instanceUri"]
-		instanceName = returnDict["instanceName"]
-		instanceType = returnDict["instanceType"]
+		if jsonData == None:
+			return None
 
 		# Get extended data from jdbc_connections table
 		jdbcConnectionDict = self.getAtlasJdbcConnectionData()
-		contactInfo = jdbcConnectionDict["contact_info"]
-		description = jdbcConnectionDict["description"]
 		owner = jdbcConnectionDict["owner"]
 
 		jsonData["entities"] = []
@@ -2026,17 +2402,23 @@ class config(object, metaclass=Singleton):
 		log.debug(json.dumps(jsonData, indent=3))
 		log.debug("======================================")
 
-		response = self.atlasPostData(URL = self.atlasRestEntities, data = json.dumps(jsonData))
-		if response == None:
-			return False
+		return jsonData
+		log.debug("Executing common_config.getAtlasRdbmsTableJSON() - Finished")
 
-		statusCode = response["statusCode"]
-		if statusCode != 200:
-			log.warning("Request from Atlas when updating source schema was %s."%(statusCode))
-			log.warning("%s"%(response["data"]))
-			self.atlasEnabled == False
+	def updateAtlasRdbmsColumnsAndKeys(self, schemaName, tableName, printInfo=True, logger=""):
+		""" Removes columns from Atlas that no longer exists in the source and creates the foreign keys. Must be called after the rdbms_table is created in Atlas """
+		log = logging.getLogger(logger)
+		log.debug("Executing common_config.updateAtlasRdbmsColumnsAndKeys()")
+
+		# Set to False if columns or foreign keys could not be updated in Atlas
+		self.atlasRdbmsComplete = True
+
+		returnDict = self.getAtlasRdbmsNames(schemaName = schemaName, tableName = tableName)
+		if returnDict == None:
 			return False
 
+		tableUri = returnDict["tableUri"]
+
 		# We now have to find columns that exists in DBImport but not in the source anymore.
 		# These columns need to be deleted from Atlas
 
@@ -2089,6 +2471,7 @@ class config(object, metaclass=Singleton):
 						log.warning("Request from Atlas when deleting old columns was %s."%(statusCode))
 						log.warning("%s"%(response["data"]))
 						self.atlasEnabled == False
+						self.atlasRdbmsComplete = False
 
 		# Code to add Foreign Keys to table. This is done in a new JSON as we reference the table we just created. One JSON per FK
 
@@ -2206,13 +2589,74 @@ class config(object, metaclass=Singleton):
 						log.warning("Request from Atlas when creating Foreign Keys was %s"%(statusCode))
 						log.warning("%s"%(response["data"]))
 						self.atlasEnabled == False
+						self.atlasRdbmsComplete = False
 					else:
 						log.debug("Creating/updating Atlas ForeignKey against %s.%s"%(refSchemaName, refTableName))
 				else:
 					log.warning("Foreign Key cant be created as refered table(%s.%s) does not exists in Atlas"%(refSchemaName, refTableName)) 
+					self.atlasRdbmsComplete = False
 
 		return True
-		log.debug("Executing common_config.updateAtlasWithSourceSchema() - Finished")
+		log.debug("Executing common_config.updateAtlasRdbmsColumnsAndKeys() - Finished")
+
+	def getAtlasSchemaFingerprint(self, jdbcConnectionDict):
+		""" Returns a hash of self.source_columns_df, self.source_keys_df and the connection information that is sent to Atlas. Used to find tables that changed since the last discovery """
+		fingerprint = hashlib.sha256()
+		fingerprint.update(self.source_columns_df.to_json(orient='records').encode('utf-8'))
+		fingerprint.update(self.source_keys_df.to_json(orient='records').encode('utf-8'))
+		for key in ("contact_info", "description", "owner"):
+			fingerprint.update(str(jdbcConnectionDict[key]).encode('utf-8'))
+		return fingerprint.hexdigest()
+
+	def saveAtlasSchemaFingerprints(self, dbAlias, savedFingerprints, newFingerprints, logger=""):
+		""" Saves the fingerprints from the current discovery. Fingerprints for tables that was removed or failed to update are deleted """
+		log = logging.getLogger(logger)
+		log.debug("Executing common_config.saveAtlasSchemaFingerprints()")
+
+		deleteRows = []
+		for (schema, table) in savedFingerprints:
+			if (schema, table) not in newFingerprints:
+				deleteRows.append((dbAlias, schema, table))
+
+		upsertRows = []
+		for (schema, table), fingerprint in newFingerprints.items():
+			if savedFingerprints.get((schema, table)) != fingerprint:
+				upsertRows.append((dbAlias, schema, table, fingerprint))
+
+		if len(deleteRows) > 0:
+			query = "delete from atlas_schema_fingerprint where dbalias = %s and schema_name = %s and table_name = %s"
+			log.debug("Executing the following SQL: %s" % (query))
+			self.mysql_cursor.executemany(query, deleteRows)
+
+		if len(upsertRows) > 0:
+			query  = "insert into atlas_schema_fingerprint (dbalias, schema_name, table_name, fingerprint, last_update) "
+			query += "values (%s, %s, %s, %s, now()) "
+			query += "on duplicate key update fingerprint = values(fingerprint), last_update = values(last_update)"
+			log.debug("Executing the following SQL: %s" % (query))
+			self.mysql_cursor.executemany(query, upsertRows)
+
+		self.mysql_conn.commit()
+		log.debug("Executing common_config.saveAtlasSchemaFingerprints() - Finished")
+
+	def processAtlasDiscoveryBatch(self, batchResult, batchTables, newFingerprints, logger=""):
+		""" Completes the tables that was sent to Atlas in a bulk request. Columns that no longer exists are removed and foreign keys are created """
+		log = logging.getLogger(logger)
+		log.debug("Executing common_config.processAtlasDiscoveryBatch()")
+
+		for reference, result in batchResult:
+			tableDict = batchTables.pop(reference)
+			if result == False:
+				continue
+
+			self.atlasEnabled = True
+			self.source_columns_df = tableDict["columns"]
+			self.source_keys_df = tableDict["keys"]
+
+			result = self.updateAtlasRdbmsColumnsAndKeys(schemaName = tableDict["schema"], tableName = tableDict["table"], printInfo = False, logger=logger)
+			if result == True and self.atlasRdbmsComplete == True and tableDict["fingerprint"] != None:
+				newFingerprints[(tableDict["schema"], tableDict["table"])] = tableDict["fingerprint"]
+
+		log.debug("Executing common_config.processAtlasDiscoveryBatch() - Finished")
 
 	def discoverAtlasRdbms(self, dbAlias, logger=""):
 		""" Discover all RDBMS objects on the 'dbAlias' and populate Atlas with them """
@@ -2237,8 +2681,28 @@ class config(object, metaclass=Singleton):
 
 		tablesAndViewsDF = self.getJDBCtablesAndViews()
 
+		# Fingerprints from the last discovery. Tables with an unchanged fingerprint dont need to be sent to Atlas again
+		query = "select schema_name, table_name, fingerprint from atlas_schema_fingerprint where dbalias = %s"
+		log.debug("Executing the following SQL: %s" % (query))
+		self.mysql_cursor.execute(query, (dbAlias, ))
+
+		savedFingerprints = {}
+		for fingerprintRow in self.mysql_cursor.fetchall():
+			savedFingerprints[(fingerprintRow[0], fingerprintRow[1])] = fingerprintRow[2]
+		newFingerprints = {}
+		unchangedTables = 0
+
+		# Tables that are waiting in the Atlas bulk request
+		batchTables = {}
+
+		# The source schema is read once for every schema instead of once per table. The result is cached here and
+		# used to populate self.source_columns_df and self.source_keys_df before each table is sent to Atlas
+		schemaColumnsDict = {}
+		schemaKeysDict = {}
+		currentSchema = None
+
 		# Add all tables we can find to Atlas
-		for index, row in tablesAndViewsDF.iterrows():
+		for index, row in tablesAndViewsDF.sort_values(by=['schema']).iterrows():
 			updateAtlasWithTable = False
 			schema = row['schema'].lower()
 			table = row['table'].lower()
@@ -2268,13 +2732,32 @@ class config(object, metaclass=Singleton):
 			if updateAtlasWithTable == False:
 				continue
 
-			# Clear the self.source_columns_df to force it to reload in the updateAtlasWithRDBMSdata function
-			self.source_columns_df = pd.DataFrame()
 			self.atlasEnabled = True		# This can be set to False in self.updateAtlasWithRDBMSdata depending on what it finds
 
 			schema = row['schema'].strip()
 			table = row['table'].strip()
 
+			if schema != currentSchema:
+				currentSchema = schema
+				if schema == "-":
+					# MySQL dont have schemas. The database is used instead
+					schemaColumnsDict, schemaKeysDict = self.getJDBCSchemaDefinition(source_schema = self.jdbc_database)
+				else:
+					schemaColumnsDict, schemaKeysDict = self.getJDBCSchemaDefinition(source_schema = schema)
+
+			# Tables that are missing in the schema read are read one by one further down
+			self.source_columns_df = schemaColumnsDict.get(table, pd.DataFrame())
+			self.source_keys_df = schemaKeysDict.get(table, pd.DataFrame())
+
+			fingerprint = None
+			if self.source_columns_df.empty == False:
+				fingerprint = self.getAtlasSchemaFingerprint(jdbcConnectionDict)
+				if savedFingerprints.get((schema, table)) == fingerprint:
+					log.debug("Table schema for %s.%s on dbalias %s is unchanged since last discovery"%(schema, table, dbAlias))
+					newFingerprints[(schema, table)] = fingerprint
+					unchangedTables += 1
+					continue
+
 			if row['schema'] != "-":
 #				log.info("Creating/updating Atlas metadata for %s.%s for dbalias %s"%(row['schema'], row['table'], dbAlias))
 				log.info("Creating/updating Atlas table schema for %s.%s on dbalias %s"%(schema, table, dbAlias))
@@ -2282,10 +2765,31 @@ class config(object, metaclass=Singleton):
 #				log.info("Creating/updating Atlas metadata for %s for dbalias %s"%(row['table'], dbAlias))
 				log.info("Creating/updating Atlas table schema for %s on dbalias %s"%(table, dbAlias))
 
-			result = self.updateAtlasWithRDBMSdata(schemaName = schema, tableName = table, printInfo = False, logger=logger)
-			if result == False:
+			if self.source_columns_df.empty == True:
+				self.getJDBCTableDefinition(source_schema = schema, source_table = table, printInfo = False)
+
+			if self.source_columns_df.empty == True:
+				log.warning("No columns could be found on the source system for %s.%s"%(schema, table))
 				continue
-#				return False
+
+			jsonData = self.getAtlasRdbmsTableJSON(schemaName = schema, tableName = table, logger=logger)
+			if jsonData == None:
+				continue
+
+			# The table is sent to Atlas together with other tables in a bulk request
+			reference = "%s.%s on dbalias %s"%(schema, table, dbAlias)
+			batchTables[reference] = { "schema": schema, "table": table, "fingerprint": fingerprint, "columns": self.source_columns_df, "keys": self.source_keys_df }
+			batchResult = self.atlasBatchAdd(jsonData, reference = reference, logger=logger)
+			self.processAtlasDiscoveryBatch(batchResult, batchTables, newFingerprints, logger=logger)
+
+		self.atlasEnabled = True
+		batchResult = self.atlasBatchFlush(logger=logger)
+		self.processAtlasDiscoveryBatch(batchResult, batchTables, newFingerprints, logger=logger)
+
+		if unchangedTables > 0:
+			log.info("%s tables on dbalias %s are unchanged since last discovery and was not sent to Atlas"%(unchangedTables, dbAlias))
+
+		self.saveAtlasSchemaFingerprints(dbAlias, savedFingerprints, newFingerprints, logger=logger)
 
 		# Remove tables that exists in Atlas that we didnt find
 
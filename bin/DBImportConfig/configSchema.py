@@ -1,7 +1,7 @@
 # coding: utf-8
 # from sqlalchemy import CHAR, Column, DateTime, Enum, ForeignKey, ForeignKeyConstraint, Index, String, Table, Text, Time, text
 from sqlalchemy import *
-from sqlalchemy.dialects.mysql import BIGINT, INTEGER, TINYINT, SMALLINT
+from sqlalchemy.dialects.mysql import BIGINT, INTEGER, TINYINT, SMALLINT, LONGTEXT
 from sqlalchemy.orm import relationship, aliased
 from sqlalchemy.sql import alias, select, func
 from sqlalchemy.ext.declarative import declarative_base
@@ -23,6 +23,9 @@ class dbimportInstances(Base):
     hdfs_address = Column(String(64), nullable=False, comment='HDFS address. Example hdfs://hadoopcluster')
     hdfs_basedir = Column(String(64), nullable=False, comment='The base dir to write data to. Example /apps/dbimport')
     sync_credentials = Column(TINYINT(4), nullable=False, server_default=text("'0'"), comment='0 = Credentials wont be synced, 1 = The credentials information will be synced to the other cluster')
+    max_distcp_sessions = Column(SmallInteger, nullable=True, comment='Maximum number of concurrent distCp copies the DBImport server will run against this instance. NULL = no limit')
+    distcp_bandwidth = Column(Integer, nullable=True, comment='Bandwidth in MB/s for each map in distCp copies against this instance. NULL = distCp default')
+    distcp_maps = Column(SmallInteger, nullable=True, comment='Maximum number of maps in distCp copies against this instance. NULL = distCp default')
 
 class copyTables(Base):
     __tablename__ = 'copy_tables'
@@ -37,7 +40,10 @@ class copyTables(Base):
 
 class copyASyncStatus(Base):
     __tablename__ = 'copy_async_status'
-    __table_args__ = {'comment': 'The status table for asynchronous copy between DBImport instances.'}
+    __table_args__ = (
+        Index('copy_async_status_lease', 'copy_status', 'lease_expire'),
+        {'comment': 'The status table for asynchronous copy between DBImport instances.'}
+    )
 
     table_id = Column(Integer, primary_key=True, nullable=False, index=True, comment='Reference to import_table.table_id')
     hive_db = Column(String(256), nullable=False, comment='Hive Database')
@@ -48,6 +54,43 @@ class copyASyncStatus(Base):
     failures = Column(Integer, server_default=text("'0'"), nullable=False, comment='Number of failures on current state')
     hdfs_source_path = Column(String(768), nullable=False, comment='HDFS path to copy from')
     hdfs_target_path = Column(String(768), nullable=False, comment='HDFS path to copy to')
+    lease_owner = Column(String(128), nullable=True, comment='The DBImport server that currently owns the copy')
+    lease_expire = Column(DateTime, nullable=True, comment='Time when the lease of the owning DBImport server expires. After that, another server can take over the copy')
+    incremental_copy = Column(TINYINT(4), nullable=False, server_default=text("'0'"), comment='1 = Only copy the files that changed since the last successful copy')
+
+class copyManifest(Base):
+    __tablename__ = 'copy_manifest'
+    __table_args__ = {'comment': 'List of files that was copied to a DBImport instance in the last successful copy. Used to only copy changed files on incremental imports'}
+
+    hive_db = Column(String(256), primary_key=True, nullable=False, comment='Hive Database')
+    hive_table = Column(String(256), primary_key=True, nullable=False, comment='Hive Table')
+    destination = Column(String(32), primary_key=True, nullable=False, comment="DBImport instance the data was copied to")
+    hdfs_source_path = Column(String(768), nullable=False, comment='HDFS path the files was copied from')
+    hdfs_target_path = Column(String(768), nullable=False, comment='HDFS path the files was copied to')
+    manifest = Column(LONGTEXT, nullable=False, comment='JSON with all files, their size and modification time on the source at the time of the copy. Recently modified files also have their checksum')
+    last_copy = Column(DateTime, nullable=False, comment='Time of the last successful copy')
+
+class copyStatistics(Base):
+    __tablename__ = 'copy_statistics'
+    __table_args__ = (
+        Index('copy_statistics_destination', 'destination', 'start'),
+        {'comment': 'Statistics from every distCp copy to other DBImport instances.'}
+    )
+
+    id = Column(BIGINT(20), primary_key=True, autoincrement=True, comment='Auto Incremented PrimaryKey of the table')
+    hive_db = Column(String(256), nullable=False, comment='Hive Database')
+    hive_table = Column(String(256), nullable=False, comment='Hive Table')
+    destination = Column(String(32), nullable=False, comment="DBImport instance the data was copied to")
+    data_transfer = Column(Enum('Synchronous','Asynchronous'), nullable=False, comment='Synchronous or Asynchronous copy')
+    incremental_copy = Column(TINYINT(4), nullable=False, server_default=text("'0'"), comment='1 = Only the changed files was copied')
+    result = Column(TINYINT(4), nullable=False, comment='1 = Copy was successful, 0 = Copy failed')
+    start = Column(DateTime, nullable=False, comment='Time when the copy started')
+    stop = Column(DateTime, nullable=False, comment='Time when the copy was completed')
+    duration = Column(Integer, nullable=False, comment='Duration of the copy in seconds')
+    bytes_copied = Column(BIGINT(20), nullable=False, server_default=text("'0'"), comment='Number of bytes copied')
+    bytes_skipped = Column(BIGINT(20), nullable=False, server_default=text("'0'"), comment='Number of bytes skipped as they already existed on the target')
+    files_copied = Column(BIGINT(20), nullable=False, server_default=text("'0'"), comment='Number of files copied')
+    files_skipped = Column(BIGINT(20), nullable=False, server_default=text("'0'"), comment='Number of files skipped as they already existed on the target')
 
 class airflowCustomDags(Base):
     __tablename__ = 'airflow_custom_dags'
@@ -703,6 +746,35 @@ class importTables(Base):
     create_foreign_keys = Column(TINYINT(4), nullable=False, comment='-1 (default) = Get information from jdbc_connections table', server_default=text("'-1'"))
 
 
+class atlasSchemaFingerprint(Base):
+    __tablename__ = 'atlas_schema_fingerprint'
+    __table_args__ = {'comment': 'Fingerprint of the source table schema from the last Atlas discovery. Tables with an unchanged fingerprint are not sent to Atlas again'}
+
+    dbalias = Column(String(256), primary_key=True, nullable=False, comment='Database connection name')
+    schema_name = Column(String(256), primary_key=True, nullable=False, comment='Schema Name')
+    table_name = Column(String(256), primary_key=True, nullable=False, comment='Table Name')
+    fingerprint = Column(String(64), nullable=False, comment='SHA256 hash of the columns, keys and connection information sent to Atlas')
+    last_update = Column(DateTime, nullable=False, comment='Time when the table was last sent to Atlas')
+
+
+class atlasOutbox(Base):
+    __tablename__ = 'atlas_outbox'
+    __table_args__ = (
+        Index('atlas_outbox_next_attempt', 'next_attempt'),
+        {'comment': 'Atlas updates from imports and exports waiting to be sent to Atlas by the DBImport server'}
+    )
+
+    id = Column(BIGINT(20), primary_key=True, autoincrement=True, comment='Unique Identifier')
+    type = Column(Enum('rdbms_table', 'lineage'), nullable=False, comment="rdbms_table = Source/target table schema, lineage = Entities for the import or export lineage")
+    dbalias = Column(String(256), nullable=False, comment='Database connection name')
+    schema_name = Column(String(256), nullable=False, comment='Schema Name')
+    table_name = Column(String(256), nullable=False, comment='Table Name')
+    create_time = Column(DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP"), comment='Time when the update was created')
+    attempts = Column(Integer, nullable=False, server_default=text("'0'"), comment='Number of failed attempts to send the update to Atlas')
+    next_attempt = Column(DateTime, nullable=True, comment='The update will not be sent to Atlas before this time. NULL = as soon as possible')
+    jsondata = Column(LONGTEXT, nullable=False, comment='The payload. Table schema for rdbms_table and the Atlas entities for lineage')
+
+
 class jdbcConnectionsEnvironments(Base):
     __tablename__ = 'jdbc_connections_environments'
     __table_args__ = {'comment': 'Environments types. Used in jdbc_connections table to define what kind of connection type it is'}
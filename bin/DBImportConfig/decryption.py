@@ -28,6 +28,20 @@ from ConfigReader import configuration
 from common.Exceptions import *
 import pandas as pd
 
+# Parsed RSA keys are cached per file in the process. The file is read again if the modification time changes
+rsaKeyCache = {}
+
+def loadKeyFile(keyFile):
+	""" Returns the content of the key file and the imported RSA key """
+	keyFileTime = os.path.getmtime(keyFile)
+	cacheEntry = rsaKeyCache.get(keyFile)
+	if cacheEntry == None or cacheEntry[0] != keyFileTime:
+		keyString = open(keyFile,"r").read()
+		cacheEntry = (keyFileTime, keyString, RSA.importKey(keyString))
+		rsaKeyCache[keyFile] = cacheEntry
+
+	return cacheEntry[1], cacheEntry[2]
+
 class crypto(object):
 	def __init__(self):
 		logging.debug("Executing crypto.__init__()")
@@ -48,8 +62,7 @@ class crypto(object):
 			raise invalidConfiguration("The private key file cant be opened.\n" +
 				"Please check the path in the configuration file for settings Credentials/private_key")
 
-		self.privateKeyString = open(self.privateKeyFile,"r").read()
-		self.privateKey = RSA.importKey(self.privateKeyString)
+		self.privateKeyString, self.privateKey = loadKeyFile(self.privateKeyFile)
 
 	def setPublicKeyFile(self, publicKeyFile):
 		self.publicKeyFile = publicKeyFile
@@ -61,8 +74,7 @@ class crypto(object):
 			raise invalidConfiguration("The public key file cant be opened.\n" +
 				"Please check the path in the configuration file for settings Credentials/public_key")
 
-		self.publicKeyString = open(self.publicKeyFile,"r").read()
-		self.publicKey = RSA.importKey(self.publicKeyString)
+		self.publicKeyString, self.publicKey = loadKeyFile(self.publicKeyFile)
 
 	def decrypt(self, strToDecrypt):
 
@@ -81,7 +81,7 @@ class config(object, metaclass=Singleton):
 		self.generatedSqoopOptions = None
 
 		# Initialize the stage class that will handle all stage operations for us
-		self.stage = export_stage.stage(self.mysql_conn, connectionAlias=connectionAlias, targetSchema=targetSchema, targetTable=targetTable)
+		self.stage = export_stage.stage(self.mysql_conn, connectionAlias=connectionAlias, targetSchema=targetSchema, targetTable=targetTable, bufferStatistics=self.common_config.getConfigValue(key = "buffer_stage_statistics"))
 		
 		logging.debug("Executing export_config.__init__() - Finished")
 
@@ -112,6 +112,12 @@ class config(object, metaclass=Singleton):
 		self.common_config.logJDBCColumnRename(columnName, previous_columnName, description=description, dbAlias=dbAlias, database=database, schema=schema, table=table)
 
 	def remove_temporary_files(self):
+		# Save the statistics for the stages that was completed before an error stopped the export
+		try:
+			self.stage.flushStageStatistics()
+		except mysql.connector.Error as err:
+			logging.warning("Cant save the stage statistics. %s"%(err))
+
 		self.common_config.remove_temporary_files()
 
 	def setStage(self, stage, force=False):
@@ -286,52 +292,47 @@ class config(object, metaclass=Singleton):
 		logging.debug("Executing export_config.saveColumnData()")
 		logging.info("Saving column data to MySQL table - export_columns")
 
-		for index, row in columnsDF.iterrows():
-			columnName = row['name']
-			columnType = row['type']
-			columnComment = row['comment']
-			columnOrder = row['idx']
-
-			query = "select column_id from export_columns where table_id = %s and column_name = %s "
-			self.mysql_cursor01.execute(query, (self.tableID, columnName))
-			logging.debug("SQL Statement executed: %s" % (self.mysql_cursor01.statement) )
-
-			row = self.mysql_cursor01.fetchone()
-			if row != None:
-				columnID = row[0]
-			else:
-				columnID = None
-
-			if columnID == None:
-				query = ("insert into export_columns "
-						"( "
-						"    table_id, "
-						"    column_name, "
-						"    column_type, "
-						"    column_order, "
-						"    hive_db, "
-						"    hive_table, "
-						"    last_update_from_hive, "
-						"    comment "
-						") values ( %s, %s, %s, %s, %s, %s, %s, %s )")
-	
-				self.mysql_cursor01.execute(query, (self.tableID, columnName, columnType, columnOrder, self.hiveDB, self.hiveTable, self.startDate, columnComment))
-			else:
-				query = ("update export_columns set "
-						"    column_type = %s, "
-						"    column_order = %s, "
-						"    hive_db = %s, "
-						"    hive_table = %s, "
-						"    last_update_from_hive = %s, "
-						"    comment = %s "
-						"where column_id = %s ")
+		# Fetch all existing columns for the table in one query. The key is in lowercase as MySQL compares column_name case insensitive
+		query = "select column_name, column_id from export_columns where table_id = %s "
+		self.mysql_cursor01.execute(query, (self.tableID, ))
+		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor01.statement) )
 
-				self.mysql_cursor01.execute(query, (columnType, columnOrder, self.hiveDB, self.hiveTable, self.startDate, columnComment, columnID))
+		columnIDs = {}
+		for row in self.mysql_cursor01.fetchall():
+			columnIDs[row[0].lower()] = row[1]
 
-			logging.debug("SQL Statement executed: %s" % (self.mysql_cursor01.statement) )
+		# Columns without a column_id are inserted and the others are updated
+		columnValues = []
+		for index, row in columnsDF.iterrows():
+			columnName = row['name']
+			columnID = columnIDs.get(columnName.lower())
+			columnValues.append((columnID, self.tableID, columnName, row['type'], row['idx'], self.hiveDB, self.hiveTable, self.startDate, row['comment']))
+
+		if len(columnValues) > 0:
+			query = ("insert into export_columns "
+					"( "
+					"    column_id, "
+					"    table_id, "
+					"    column_name, "
+					"    column_type, "
+					"    column_order, "
+					"    hive_db, "
+					"    hive_table, "
+					"    last_update_from_hive, "
+					"    comment "
+					") values ( %s, %s, %s, %s, %s, %s, %s, %s, %s ) "
+					"on duplicate key update "
+					"    column_type = values(column_type), "
+					"    column_order = values(column_order), "
+					"    hive_db = values(hive_db), "
+					"    hive_table = values(hive_table), "
+					"    last_update_from_hive = values(last_update_from_hive), "
+					"    comment = values(comment) ")
+
+			self.mysql_cursor01.executemany(query, columnValues)
+			logging.debug("SQL Statement executed: %s" % (query) )
 			self.mysql_conn.commit()
 
-		
 		logging.debug("Executing export_config.saveColumnData() - Finished")
 
 	def clearTableRowCount(self):
@@ -591,6 +592,7 @@ class config(object, metaclass=Singleton):
 		""" Updates the target table with new column definitions """
 		logging.debug("Executing export_config.updateTargetTable()")
 		logging.info("Updating the Target Table")
+		self.common_config.beginChangeHistoryBatch()
 
 		columnsSource = self.getColumnsFromConfigDatabase(excludeColumns=True)
 		forceUppercase = False
@@ -927,7 +929,7 @@ class config(object, metaclass=Singleton):
 			alterTableExecuted = True
 
 
-
+		self.common_config.saveChangeHistory()
 		logging.debug("Executing export_config.updateTargetTable() - Finished")
 
 	def getSqoopMapColumnJava(self):
@@ -1541,6 +1543,15 @@ class config(object, metaclass=Singleton):
 		# Fetch the remote system schema again as it might have been updated in the export
 		self.common_config.getJDBCTableDefinition(source_schema = targetSchema, source_table = targetTable, printInfo=False)
 
+		if self.common_config.useAtlasOutbox() == True:
+			# The DBImport server sends the table schema to Atlas. We only need to save it in the outbox
+			logging.info("Saving target database schema for Atlas")
+			self.common_config.saveAtlasOutbox(outboxType = "rdbms_table", 
+												schemaName = targetSchema, 
+												tableName = targetTable, 
+												jsonData = self.common_config.getAtlasRdbmsSnapshot())
+			return
+
 		self.common_config.updateAtlasWithRDBMSdata(schemaName = targetSchema,
 													tableName = targetTable 
 													)
@@ -1555,7 +1566,10 @@ class config(object, metaclass=Singleton):
 		if self.common_config.atlasEnabled == False:
 			return
 
-		logging.info("Updating Atlas with export lineage")
+		if self.common_config.useAtlasOutbox() == True:
+			logging.info("Saving export lineage for Atlas")
+		else:
+			logging.info("Updating Atlas with export lineage")
 
 		tableComment = ""
 
@@ -1633,11 +1647,11 @@ class config(object, metaclass=Singleton):
 
 		logging.debug(json.dumps(jsonData, indent=3))
 
-		response = self.common_config.atlasPostData(URL = self.common_config.atlasRestEntities, data = json.dumps(jsonData))
-		statusCode = response["statusCode"]
-		if statusCode != 200:
-			logging.warning("Request from Atlas when updating export lineage was %s."%(statusCode))
-			self.common_config.atlasEnabled == False
+		if self.common_config.useAtlasOutbox() == True:
+			self.common_config.saveAtlasOutbox(outboxType = "lineage", schemaName = targetSchema, tableName = targetTable, jsonData = jsonData)
+		else:
+			self.common_config.atlasBatchAdd(jsonData, reference = "export lineage for %s.%s"%(self.hiveDB, self.hiveTable))
+			self.common_config.atlasBatchFlush()
 
 #		print(response)
 
@@ -29,7 +29,7 @@ import time
 import pandas as pd
 
 class stage(object):
-	def __init__(self, mysql_conn, connectionAlias=None, targetSchema=None, targetTable=None):
+	def __init__(self, mysql_conn, connectionAlias=None, targetSchema=None, targetTable=None, bufferStatistics=False):
 		logging.debug("Executing stage.__init__()")
 
 		self.connectionAlias = connectionAlias
@@ -46,6 +46,10 @@ class stage(object):
 		self.stageDurationStop = float()
 		self.stageDurationTime = float()
 
+		# If bufferStatistics is True, the rows for export_stage_statistics are kept in memory and saved when the export moves to a new phase
+		self.bufferStatistics = bufferStatistics
+		self.stageStatisticsRows = []
+
 #		if configuration.get("REST_statistics", "post_export_data").lower() == "true":
 #			self.post_export_data = True
 #		else:
@@ -245,6 +249,8 @@ class stage(object):
 			if value == False: value = 0
 			valuesPart.append(value)
 
+		self.flushStageStatistics()
+
 		query = "select stage, start, stop, duration from export_stage_statistics where dbalias = %s and target_schema = %s and target_table = %s"
 		self.mysql_cursor.execute(query, (self.connectionAlias, self.targetSchema, self.targetTable))
 		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
@@ -335,6 +341,8 @@ class stage(object):
 		""" Returns the start and stop time for a specific stage. If no info can be found, None is returned """
 		logging.debug("Executing stage.getStageStartStop()")
 
+		self.flushStageStatistics()
+
 		query = "select stage, start, stop, duration from export_stage_statistics where dbalias = %s and target_schema = %s and target_table = %s"
 		self.mysql_cursor.execute(query, (self.connectionAlias, self.targetSchema, self.targetTable))
 		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
@@ -367,6 +375,8 @@ class stage(object):
 		""" Removes all stage information from the export_stage table """
 		logging.debug("Executing stage.clearStage()")
 
+		self.stageStatisticsRows = []
+
 		if self.memoryStage == False:
 			query = "delete from export_stage where dbalias = %s and target_schema = %s and target_table = %s"
 			self.mysql_cursor.execute(query, (self.connectionAlias, self.targetSchema, self.targetTable))
@@ -435,84 +445,24 @@ class stage(object):
 		logging.debug("stageDurationStop:  %s"%(self.stageDurationStop))
 		logging.debug("stageDurationTime:  %s"%(self.stageDurationTime))
 
-		query = "select count(stage) from export_stage_statistics where dbalias = %s and target_schema = %s and target_table = %s and stage = %s"
-		self.mysql_cursor.execute(query, (self.connectionAlias, self.targetSchema, self.targetTable, self.currentStage))
-		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
-
-		row = self.mysql_cursor.fetchone()
-		rowCount = row[0]
-		if rowCount == 0:
-			query  = "insert into export_stage_statistics "
-			query += "( dbalias, target_schema, target_table, stage, start, stop, duration )"
-			query += "values "
-			query += "( "
-			query += "	'%s', "%(self.connectionAlias)
-			query += "	'%s', "%(self.targetSchema)
-			query += "	'%s', "%(self.targetTable)
-			query += "	%s, "%(self.currentStage)
-			query += "	'%s', "%(self.stageTimeStart)
-			query += "	'%s', "%(self.stageTimeStop)
-			query += "	%s "%(round(self.stageDurationTime))
-			query += ") "
-		else:
-			query  = "update export_stage_statistics set"
-			query += "	start = '%s', "%(self.stageTimeStart)
-			query += "	stop = '%s', "%(self.stageTimeStop)
-			query += "	duration = %s "%(round(self.stageDurationTime))
-			query += "where "
-			query += "	dbalias = '%s' "%(self.connectionAlias)
-			query += "	and target_schema = '%s' "%(self.targetSchema)
-			query += "	and target_table = '%s' "%(self.targetTable)
-			query += "	and stage = '%s' "%(self.currentStage)
-	
-		self.mysql_cursor.execute(query)
-		self.mysql_conn.commit()
-		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
-
+		# Save the statistics for the stage that just finished. When buffered, they are only saved when the export moves to a new phase
+		self.stageStatisticsRows.append((self.connectionAlias, self.targetSchema, self.targetTable, self.currentStage, self.stageTimeStart, self.stageTimeStop, round(self.stageDurationTime)))
+		if self.bufferStatistics == False or int(newStage / 1000) != int(self.currentStage / 1000):
+			self.flushStageStatistics(commit=False)
 
 		stageDescription = self.getStageDescription(newStage)
 
-		# Save stage information in export_stage
-		query = "select count(stage) from export_stage where dbalias = %s and target_schema = %s and target_table = %s"
-		self.mysql_cursor.execute(query, (self.connectionAlias, self.targetSchema, self.targetTable))
-		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
-
-		row = self.mysql_cursor.fetchone()
-		rowCount = row[0]
-		if rowCount == 0:
-			query  = "insert into export_stage "
-			query += "( "
-			query += "	dbalias, "
-			query += "	target_schema, "
-			query += "	target_table, "
-			query += "	stage, "
-			query += "	stage_description, "
-			query += "	stage_time "
-#			query += "	unrecoverable_error "
-			query += ") "
-			query += "values "
-			query += "( "
-			query += "	'%s', "%(self.connectionAlias)
-			query += "	'%s', "%(self.targetSchema)
-			query += "	'%s', "%(self.targetTable)
-			query += "	%s, "%(newStage)
-			query += "	'%s', "%(stageDescription)
-			query += "	'%s' "%(datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
-#			query += "	0 "
-			query += ") "
-		else:
-			query  = "update export_stage set"
-			query += "	stage = %s, "%(newStage)
-			query += "	stage_description = '%s', "%(stageDescription)
-			query += "	stage_time = '%s' "%(datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
-			query += "where "
-			query += "	dbalias = '%s' "%(self.connectionAlias)
-			query += "	and target_schema = '%s' "%(self.targetSchema)
-			query += "	and target_table = '%s' "%(self.targetTable)
-
-		self.mysql_cursor.execute(query)
+		# Save stage information in export_stage. The statement runs once for every stage, so it is prepared once and reused
+		query  = "insert into export_stage "
+		query += "( dbalias, target_schema, target_table, stage, stage_description, stage_time ) "
+		query += "values ( %s, %s, %s, %s, %s, %s ) "
+		query += "on duplicate key update "
+		query += "	stage = values(stage), "
+		query += "	stage_description = values(stage_description), "
+		query += "	stage_time = values(stage_time) "
+		self.mysql_conn.preparedCursor(query).execute(query, (self.connectionAlias, self.targetSchema, self.targetTable, newStage, stageDescription, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')))
 		self.mysql_conn.commit()
-		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
+		logging.debug("SQL Statement executed: %s" % (query) )
 
 		self.currentStage = newStage
 		self.stageTimeStart = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
@@ -523,6 +473,29 @@ class stage(object):
 
 		logging.debug("Executing stage.setStage() - Finished")
 
+	def flushStageStatistics(self, commit=True):
+		""" Saves the buffered stage statistics to the export_stage_statistics table """
+		if len(self.stageStatisticsRows) == 0:
+			return
+
+		logging.debug("Executing stage.flushStageStatistics()")
+
+		query  = "insert into export_stage_statistics "
+		query += "( dbalias, target_schema, target_table, stage, start, stop, duration ) "
+		query += "values ( %s, %s, %s, %s, %s, %s, %s ) "
+		query += "on duplicate key update "
+		query += "	start = values(start), "
+		query += "	stop = values(stop), "
+		query += "	duration = values(duration) "
+		self.mysql_cursor.executemany(query, self.stageStatisticsRows)
+		logging.debug("SQL Statement executed: %s" % (query) )
+		self.stageStatisticsRows = []
+
+		if commit == True:
+			self.mysql_conn.commit()
+
+		logging.debug("Executing stage.flushStageStatistics() - Finished")
+
 	def saveRetryAttempt(self, stage):
 		""" Saves the retry attempt in the export_retries_log table """
 		logging.debug("Executing stage.saveRetryAttempt()")
@@ -530,6 +503,7 @@ class stage(object):
 		if self.memoryStage == True:
 			return
 
+		self.flushStageStatistics()
 		stageDescription = self.getStageDescription(stage)
 
 		query  = "insert into export_retries_log "
@@ -24,7 +24,6 @@ import ssl
 import requests
 import getpass
 import urllib
-from requests_kerberos import HTTPKerberosAuth
 from ConfigReader import configuration
 import mysql.connector
 from common.Singleton import Singleton 
@@ -37,7 +36,6 @@ from mysql.connector import errorcode
 from datetime import datetime
 import pandas as pd
 import numpy as np
-import pymongo
 
 class config(object, metaclass=Singleton):
 	def __init__(self, Hive_DB=None, Hive_Table=None):
@@ -135,7 +133,7 @@ class config(object, metaclass=Singleton):
 		self.mysql_cursor02 = self.mysql_conn.cursor(buffered=True)
 
 		# Initialize the stage class that will handle all stage operations for us
-		self.stage = stage.stage(self.mysql_conn, self.Hive_DB, self.Hive_Table)
+		self.stage = stage.stage(self.mysql_conn, self.Hive_DB, self.Hive_Table, bufferStatistics=self.common_config.getConfigValue(key = "buffer_stage_statistics"))
 		
 		logging.debug("Executing import_config.__init__() - Finished")
 
@@ -157,6 +155,12 @@ class config(object, metaclass=Singleton):
 		self.common_config.logHiveColumnRename(columnName, previous_columnName, description=description, hiveDB=hiveDB, hiveTable=hiveTable)
 
 	def remove_temporary_files(self):
+		# Save the statistics for the stages that was completed before an error stopped the import
+		try:
+			self.stage.flushStageStatistics()
+		except mysql.connector.Error as err:
+			logging.warning("Cant save the stage statistics. %s"%(err))
+
 		self.common_config.remove_temporary_files()
 
 	def setStage(self, stage, force=False):
@@ -870,6 +874,24 @@ class config(object, metaclass=Singleton):
 		columnOrder = 0
 		self.sqoop_use_generated_sql = False
 		columnNameReserved = False
+		columnValues = []
+		columnDocuments = []
+
+		# Fetch the settings for all columns on the table in one query. The key is in lowercase as MySQL compares source_column_name case insensitive
+		query  = "select "
+		query += "	source_column_name, "
+		query += "	column_id, "
+		query += "	include_in_import, "
+		query += "	column_name_override, "
+		query += "	column_type_override, "
+		query += "	sqoop_column_type_override "
+		query += "from import_columns where table_id = %s "
+		self.mysql_cursor01.execute(query, (self.table_id, ))
+		logging.debug("SQL Statement executed: \n%s" % (self.mysql_cursor01.statement) )
+
+		columnSettings = {}
+		for columnRow in self.mysql_cursor01.fetchall():
+			columnSettings[columnRow[0].lower()] = columnRow[1:]
 
 		for index, row in self.common_config.source_columns_df.iterrows():
 			column_name = self.stripUnwantedCharColumnName(row['SOURCE_COLUMN_NAME'])
@@ -883,22 +905,12 @@ class config(object, metaclass=Singleton):
 			self.table_comment = self.stripUnwantedCharComment(row['TABLE_COMMENT'])
 
 			# Get the settings for this specific column
-			query  = "select "
-			query += "	column_id, "
-			query += "	include_in_import, "
-			query += "	column_name_override, "
-			query += "	column_type_override, "
-			query += "	sqoop_column_type_override "
-			query += "from import_columns where table_id = %s and source_column_name = %s "
-			self.mysql_cursor01.execute(query, (self.table_id, source_column_name))
-			logging.debug("SQL Statement executed: \n%s" % (self.mysql_cursor01.statement) )
-
 			includeColumnInImport = True
 			columnID = None
 			columnTypeOverride = None
 			sqoopColumnTypeOverride = None
 
-			columnRow = self.mysql_cursor01.fetchone()
+			columnRow = columnSettings.get(source_column_name.lower())
 			if columnRow != None:
 				columnID = columnRow[0]
 				if columnRow[1] == 0:
@@ -1155,49 +1167,8 @@ class config(object, metaclass=Singleton):
 						columnNameReserved = True
 						logging.warning("The column '%s' is a reserved column namn in Sqoop. Please rename the column in 'column_name_override'"%(source_column_name))
 
-			# Run a query to see if the column already exists. Will be used to determine if we do an insert or update
-#			query = "select column_id from import_columns where table_id = %s and source_column_name = %s "
-#			self.mysql_cursor01.execute(query, (self.table_id, source_column_name))
-#			logging.debug("SQL Statement executed: \n%s" % (self.mysql_cursor01.statement) )
-
-#			if self.mysql_cursor01.rowcount == 0:
-			if columnID == None:
-				query = ("insert into import_columns "
-						"("
-						"    table_id,"
-						"    hive_db,"
-						"    hive_table,"
-						"    column_name,"
-						"    column_order,"
-						"    source_column_name,"
-						"    column_type,"
-						"    source_column_type,"
-						"    source_database_type,"
-						"    sqoop_column_type,"
-						"    last_update_from_source,"
-						"    comment"
-						") values ( %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s )")
-	
-				self.mysql_cursor01.execute(query, (self.table_id, self.Hive_DB, self.Hive_Table, column_name.lower(), columnOrder, source_column_name, column_type, source_column_type, self.common_config.jdbc_servertype, sqoop_column_type, self.startDate, source_column_comment))
-				logging.debug("SQL Statement executed: %s" % (self.mysql_cursor01.statement) )
-			else:
-				query = ("update import_columns set "
-						"    hive_db = %s, "
-						"    hive_table = %s, "
-						"    column_name = %s, "
-						"    column_order = %s, "
-						"    column_type = %s, "
-						"    source_column_type = %s, "
-						"    source_database_type = %s, "
-						"    sqoop_column_type = %s, "
-						"    source_primary_key = NULL, "
-						"    last_update_from_source = %s, "
-						"    comment = %s "
-						"where table_id = %s and source_column_name = %s ")
-
-				self.mysql_cursor01.execute(query, (self.Hive_DB, self.Hive_Table, column_name.lower(), columnOrder, column_type, source_column_type, self.common_config.jdbc_servertype, sqoop_column_type, self.startDate, source_column_comment, self.table_id, source_column_name))
-				logging.debug("SQL Statement executed: %s" % (self.mysql_cursor01.statement) )
-
+			# The column is inserted if columnID is None and updated otherwise. All columns are saved with one statement after the loop
+			columnValues.append((columnID, self.table_id, self.Hive_DB, self.Hive_Table, column_name.lower(), columnOrder, source_column_name, column_type, source_column_type, self.common_config.jdbc_servertype, sqoop_column_type, self.startDate, source_column_comment))
 
 			if self.common_config.post_column_data == True:
 				jsonData = {}
@@ -1214,17 +1185,46 @@ class config(object, metaclass=Singleton):
 				jsonData["source_column"] = source_column_name
 				jsonData["source_column_type"] = source_column_type
 				jsonData["column_type"] = column_type
+				columnDocuments.append(jsonData)
 	
-				logging.debug("Sending the following JSON to the REST interface: %s"% (json.dumps(jsonData, sort_keys=True, indent=4)))
-				response = self.rest.sendData(json.dumps(jsonData))
-				if response != 200:
-					# There was something wrong with the REST call. So we save it to the database and handle it later
-					logging.debug("REST call failed!")
-					logging.debug("Saving the JSON to the json_to_rest table instead")
-					query = "insert into json_to_rest (type, status, jsondata) values ('import_column', 0, %s)"
-					self.mysql_cursor01.execute(query, (json.dumps(jsonData), ))
-					logging.debug("SQL Statement executed: %s" % (self.mysql_cursor01.statement) )
-				
+		if len(columnDocuments) > 0:
+			# All columns are sent to the REST interface in one batch from a background thread so the import dont have to wait for it
+			logging.debug("Sending the following JSON to the REST interface: %s"% (json.dumps(columnDocuments, sort_keys=True, indent=4)))
+			rest.restSender().sendBatch("import_column", columnDocuments)
+
+		if len(columnValues) > 0:
+			query = ("insert into import_columns "
+					"("
+					"    column_id,"
+					"    table_id,"
+					"    hive_db,"
+					"    hive_table,"
+					"    column_name,"
+					"    column_order,"
+					"    source_column_name,"
+					"    column_type,"
+					"    source_column_type,"
+					"    source_database_type,"
+					"    sqoop_column_type,"
+					"    last_update_from_source,"
+					"    comment"
+					") values ( %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s ) "
+					"on duplicate key update "
+					"    hive_db = values(hive_db), "
+					"    hive_table = values(hive_table), "
+					"    column_name = values(column_name), "
+					"    column_order = values(column_order), "
+					"    column_type = values(column_type), "
+					"    source_column_type = values(source_column_type), "
+					"    source_database_type = values(source_database_type), "
+					"    sqoop_column_type = values(sqoop_column_type), "
+					"    source_primary_key = NULL, "
+					"    last_update_from_source = values(last_update_from_source), "
+					"    comment = values(comment) ")
+
+			self.mysql_cursor01.executemany(query, columnValues)
+			logging.debug("SQL Statement executed: %s" % (query) )
+
 		# Commit all the changes to the import_column column
 		self.mysql_conn.commit()
 
@@ -1387,21 +1387,19 @@ class config(object, metaclass=Singleton):
 		# Create a new DF that only contains FK's
 		source_fk_df = self.common_config.source_keys_df[self.common_config.source_keys_df['CONSTRAINT_TYPE'] == key_type_reference]
 
-		# Loop through all unique ForeignKeys that is presented in the source.
+		# Loop through all unique ForeignKeys that is presented in the source and collect the FK columns together with the referenced table
+		fkColumns = []
+		refTables = []
 #		for source_fk in source_fk_df[source_fk_df['CONSTRAINT_TYPE'] == key_type_reference].CONSTRAINT_NAME.unique():
 		for source_fk in source_fk_df.CONSTRAINT_NAME.unique():
 			logging.debug("Parsing FK with name '%s'"%(source_fk))
 		
 			# Iterate over the rows that matches the FK name
 			for index, row in source_fk_df[source_fk_df['CONSTRAINT_NAME'] == source_fk].iterrows():
-#				print("Key row: %s"%(row))
 # #SCHEMA_NAME|TABLE_NAME|CONSTRAINT_NAME|CONSTRAINT_TYPE|COL_NAME|COL_DATA_TYPE|REFERENCE_SCHEMA_NAME|REFERENCE_TABLE_NAME|REFERENCE_COL_NAME|COL_KEY_POSITION
 				source_fk_name = row['CONSTRAINT_NAME']
-				column_name = row['COL_NAME']
 				ref_schema_name = row['REFERENCE_SCHEMA_NAME']
 				ref_table_name = row['REFERENCE_TABLE_NAME']
-				ref_column_name = row['REFERENCE_COL_NAME']
-				key_position = row['COL_KEY_POSITION']
 
 				# If we already worked with this FK, we fetch the fk_index from the dictinary.
 				# If not, we add it to the dictionary and increase the counter so the next FK gets a higher index number.
@@ -1415,64 +1413,85 @@ class config(object, metaclass=Singleton):
 				# MySQL dont have schemas. So we make them default to dash
 				if self.common_config.db_mysql == True:	ref_schema_name = "-"
 
-				# Select table_id's that matches the source based on dbalias, schema and table name
-				# This can be many table_id's as we might have imported the same source multiple times
-				# under different names.
-				# TODO: Right now, we only support reference to one table per FK. If we have imported the same table more than once
-				# the FK will add with primary key validation. To get this error, remove the "limit 1" in the sql statement and import
-				# the same source table twice
-				query = "select table_id from import_tables where dbalias = %s and source_schema = %s and source_table = %s limit 1"
-				self.mysql_cursor01.execute(query, (self.connection_alias, ref_schema_name, ref_table_name ))
-				logging.debug("SQL Statement executed: %s" % (self.mysql_cursor01.statement) )
+				fkColumns.append((fk_index, row['COL_NAME'], ref_schema_name, ref_table_name, row['REFERENCE_COL_NAME'], row['COL_KEY_POSITION']))
+				if (ref_schema_name, ref_table_name) not in refTables:
+					refTables.append((ref_schema_name, ref_table_name))
+
+		if len(fkColumns) == 0: return
+
+		# Select the table_id's for all referenced tables in one query. The same source might have been imported multiple times
+		# under different names.
+		# TODO: Right now, we only support reference to one table per FK. If we have imported the same table more than once
+		# the FK will add with primary key validation. That is why only the lowest table_id is used for each source table
+		query  = "select source_schema, source_table, min(table_id) from import_tables "
+		query += "where dbalias = %s and (source_schema, source_table) in ("
+		query += ", ".join(["(%s, %s)"] * len(refTables))
+		query += ") group by source_schema, source_table"
+		queryParams = [ self.connection_alias ]
+		for refTable in refTables:
+			queryParams.extend(refTable)
+
+		self.mysql_cursor01.execute(query, queryParams)
+		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor01.statement) )
 
-				if self.mysql_cursor01.rowcount == 0:
-					logging.warning("Reference table '%s.%s' on alias '%s' does not exist in MySQL. Skipping FK on this table"%(ref_schema_name, ref_table_name, self.connection_alias))
-				else:
-					rows = self.mysql_cursor01.fetchall()
-					for ref_table_id in rows:
-						# Looping through all table_id's that matches the source from the previous select
-						logging.debug("Parsing referenced table with table_id: %s"%(ref_table_id[0]))
-
-						# Fetch the column_id for the table own column
-						query = "select column_id from import_columns where table_id = %s and lower(source_column_name) = %s"
-						self.mysql_cursor02.execute(query, (self.table_id, column_name ))
-						logging.debug("SQL Statement executed: %s" % (self.mysql_cursor02.statement) )
-						row = self.mysql_cursor02.fetchone()
-						source_column_id = row[0]
-
-						# Fetch the column_id for the column in the referensed table
-						query = "select column_id from import_columns where table_id = %s and lower(source_column_name) = %s"
-						self.mysql_cursor02.execute(query, (ref_table_id[0], ref_column_name ))
-						logging.debug("SQL Statement executed: %s" % (self.mysql_cursor02.statement) )
-						row = self.mysql_cursor02.fetchone()
-
-						if self.mysql_cursor02.rowcount == 0:
-							logging.warning("Referenced column '%s' in '%s.%s' cant be found in MySQL. Skipping FK on this table"%(ref_column_name, ref_schema_name, ref_table_name))
-							ref_column_id = None
-						else:
-		#					row = self.mysql_cursor02.fetchone()
-							ref_column_id = row[0]
-
-							# Save the FK data to the MySQL table
-							query = ("insert into import_foreign_keys "
-									"("
-									"    table_id, "
-									"    column_id, "
-									"    fk_index, "
-									"    fk_table_id, "
-									"    fk_column_id, "
-									"    key_position "
-									") values ( %s, %s, %s, %s, %s, %s )")
-
-							logging.debug("self.table_id:    %s"%(self.table_id))
-							logging.debug("source_column_id: %s"%(source_column_id))
-							logging.debug("fk_index:         %s"%(fk_index))
-							logging.debug("ref_table_id[0]:  %s"%(ref_table_id[0]))
-							logging.debug("ref_column_id:    %s"%(ref_column_id))
-							logging.debug("key_position:     %s"%(key_position))
-							self.mysql_cursor02.execute(query, (self.table_id, source_column_id, fk_index, ref_table_id[0], ref_column_id, key_position  ))
-							self.mysql_conn.commit()
-							logging.debug("SQL Statement executed: %s" % (self.mysql_cursor02.statement) )
+		# MySQL compares the names case insensitive, so the dictionaries uses lowercase keys
+		refTableIDs = {}
+		for row in self.mysql_cursor01.fetchall():
+			refTableIDs[(row[0].lower(), row[1].lower())] = row[2]
+
+		# Fetch the column_id's for the table own columns and the columns in all referenced tables in one query
+		tableIDs = [ self.table_id ] + list(set(refTableIDs.values()))
+		query  = "select table_id, source_column_name, column_id from import_columns "
+		query += "where table_id in (%s)"%(", ".join(["%s"] * len(tableIDs)))
+		self.mysql_cursor01.execute(query, tableIDs)
+		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor01.statement) )
+
+		columnIDs = {}
+		for row in self.mysql_cursor01.fetchall():
+			columnIDs[(row[0], row[1].lower())] = row[2]
+
+		fkValues = []
+		for fk_index, column_name, ref_schema_name, ref_table_name, ref_column_name, key_position in fkColumns:
+			ref_table_id = refTableIDs.get((ref_schema_name.lower(), ref_table_name.lower()))
+			if ref_table_id == None:
+				logging.warning("Reference table '%s.%s' on alias '%s' does not exist in MySQL. Skipping FK on this table"%(ref_schema_name, ref_table_name, self.connection_alias))
+				continue
+
+			logging.debug("Parsing referenced table with table_id: %s"%(ref_table_id))
+
+			source_column_id = columnIDs.get((self.table_id, column_name.lower()))
+			if source_column_id == None:
+				logging.warning("Column '%s' cant be found in MySQL. Skipping FK on this table"%(column_name))
+				continue
+
+			ref_column_id = columnIDs.get((ref_table_id, ref_column_name.lower()))
+			if ref_column_id == None:
+				logging.warning("Referenced column '%s' in '%s.%s' cant be found in MySQL. Skipping FK on this table"%(ref_column_name, ref_schema_name, ref_table_name))
+				continue
+
+			logging.debug("self.table_id:    %s"%(self.table_id))
+			logging.debug("source_column_id: %s"%(source_column_id))
+			logging.debug("fk_index:         %s"%(fk_index))
+			logging.debug("ref_table_id:     %s"%(ref_table_id))
+			logging.debug("ref_column_id:    %s"%(ref_column_id))
+			logging.debug("key_position:     %s"%(key_position))
+			fkValues.append((self.table_id, source_column_id, fk_index, ref_table_id, ref_column_id, key_position))
+
+		if len(fkValues) > 0:
+			# Save the FK data to the MySQL table
+			query = ("insert into import_foreign_keys "
+					"("
+					"    table_id, "
+					"    column_id, "
+					"    fk_index, "
+					"    fk_table_id, "
+					"    fk_column_id, "
+					"    key_position "
+					") values ( %s, %s, %s, %s, %s, %s )")
+
+			self.mysql_cursor02.executemany(query, fkValues)
+			self.mysql_conn.commit()
+			logging.debug("SQL Statement executed: %s" % (query) )
 
 		logging.debug("Executing import_config.saveKeyData() - Finished")
 
@@ -2595,6 +2614,18 @@ class config(object, metaclass=Singleton):
 		if self.common_config.atlasEnabled == False:
 			return
 
+		if self.common_config.useAtlasOutbox() == True:
+			# The DBImport server sends the table schema to Atlas. We only need to save it in the outbox
+			if self.common_config.source_columns_df.empty == True:
+				self.common_config.getJDBCTableDefinition(source_schema = self.source_schema, source_table = self.source_table, printInfo = False)
+
+			logging.info("Saving source database schema for Atlas")
+			self.common_config.saveAtlasOutbox(outboxType = "rdbms_table", 
+												schemaName = self.source_schema, 
+												tableName = self.source_table, 
+												jsonData = self.common_config.getAtlasRdbmsSnapshot())
+			return
+
 		self.common_config.updateAtlasWithRDBMSdata(schemaName = self.source_schema,
 													tableName = self.source_table
 													)
@@ -2736,7 +2767,10 @@ class config(object, metaclass=Singleton):
 		if self.common_config.atlasEnabled == False:
 			return
 
-		logging.info("Updating Atlas with import lineage")
+		if self.common_config.useAtlasOutbox() == True:
+			logging.info("Saving import lineage for Atlas")
+		else:
+			logging.info("Updating Atlas with import lineage")
 
 		# Get the referredEntities part of the JSON. This is common for both import and export as the rdbms_* in Atlas is the same
 		jsonData = self.common_config.getAtlasRdbmsReferredEntities(schemaName = self.source_schema,
@@ -2788,11 +2822,11 @@ class config(object, metaclass=Singleton):
 
 		logging.debug(json.dumps(jsonData, indent=3))
 
-		response = self.common_config.atlasPostData(URL = self.common_config.atlasRestEntities, data = json.dumps(jsonData))
-		statusCode = response["statusCode"]
-		if statusCode != 200:
-			logging.warning("Request from Atlas when updating import lineage was %s."%(statusCode))
-			self.common_config.atlasEnabled == False
+		if self.common_config.useAtlasOutbox() == True:
+			self.common_config.saveAtlasOutbox(outboxType = "lineage", schemaName = self.source_schema, tableName = self.source_table, jsonData = jsonData)
+		else:
+			self.common_config.atlasBatchAdd(jsonData, reference = "import lineage for %s.%s"%(self.Hive_DB, self.Hive_Table))
+			self.common_config.atlasBatchFlush()
 
 		logging.debug("Executing import_config.updateAtlasWithImportLineage() - Finished")
 
@@ -29,7 +29,7 @@ import time
 import pandas as pd
 
 class stage(object):
-	def __init__(self, mysql_conn, Hive_DB, Hive_Table):
+	def __init__(self, mysql_conn, Hive_DB, Hive_Table, bufferStatistics=False):
 		logging.debug("Executing stage.__init__()")
 
 		self.Hive_DB = Hive_DB
@@ -44,6 +44,10 @@ class stage(object):
 		self.stageDurationStop = float()
 		self.stageDurationTime = float()
 
+		# If bufferStatistics is True, the rows for import_stage_statistics are kept in memory and saved when the import moves to a new phase
+		self.bufferStatistics = bufferStatistics
+		self.stageStatisticsRows = []
+
 		if configuration.get("REST_statistics", "post_import_data").lower() == "true":
 			self.post_import_data = True
 		else:
@@ -437,6 +441,8 @@ class stage(object):
 		for key, value in kwargs.items():
 			jsonData[key] = value
 
+		self.flushStageStatistics()
+
 		query = "select stage, start, stop, duration from import_stage_statistics where hive_db = %s and hive_table = %s"
 		self.mysql_cursor.execute(query, (self.Hive_DB, self.Hive_Table))
 		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
@@ -501,6 +507,8 @@ class stage(object):
 			if value == False: value = 0
 			valuesPart.append(value)
 
+		self.flushStageStatistics()
+
 		query = "select stage, start, stop, duration from import_stage_statistics where hive_db = %s and hive_table = %s"
 		self.mysql_cursor.execute(query, (self.Hive_DB, self.Hive_Table))
 		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
@@ -603,6 +611,8 @@ class stage(object):
 		""" Removes all stage information from the import_stage table """
 		logging.debug("Executing stage.clearStage()")
 
+		self.stageStatisticsRows = []
+
 		if self.memoryStage == False:
 			query = "delete from import_stage where hive_db = %s and hive_table = %s"
 			self.mysql_cursor.execute(query, (self.Hive_DB, self.Hive_Table))
@@ -648,6 +658,8 @@ class stage(object):
 		""" Returns the start and stop time for a specific stage. If no info can be found, None is returned """
 		logging.debug("Executing stage.getStageStartStop()")
 
+		self.flushStageStatistics()
+
 		query = "select stage, start, stop, duration from import_stage_statistics where hive_db = %s and hive_table = %s "
 		self.mysql_cursor.execute(query, (self.Hive_DB, self.Hive_Table))
 		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
@@ -701,79 +713,36 @@ class stage(object):
 		logging.debug("stageDurationStop:  %s"%(self.stageDurationStop))
 		logging.debug("stageDurationTime:  %s"%(self.stageDurationTime))
 
-		query = "select count(stage) from import_stage_statistics where hive_db = %s and hive_table = %s and stage = %s"
-		self.mysql_cursor.execute(query, (self.Hive_DB, self.Hive_Table, self.currentStage))
-		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
-
-		row = self.mysql_cursor.fetchone()
-		rowCount = row[0]
-		if rowCount == 0:
-			query  = "insert into import_stage_statistics "
-			query += "( hive_db, hive_table, stage, start, stop, duration )"
-			query += "values "
-			query += "( "
-			query += "	'%s', "%(self.Hive_DB)
-			query += "	'%s', "%(self.Hive_Table)
-			query += "	%s, "%(self.currentStage)
-			query += "	'%s', "%(self.stageTimeStart)
-			query += "	'%s', "%(self.stageTimeStop)
-			query += "	%s "%(round(self.stageDurationTime))
-			query += ") "
-		else:
-			query  = "update import_stage_statistics set"
-			query += "	start = '%s', "%(self.stageTimeStart)
-			query += "	stop = '%s', "%(self.stageTimeStop)
-			query += "	duration = %s "%(round(self.stageDurationTime))
-			query += "where "
-			query += "	hive_db = '%s' "%(self.Hive_DB)
-			query += "	and hive_table = '%s' "%(self.Hive_Table)
-			query += "	and stage = '%s' "%(self.currentStage)
-	
-		self.mysql_cursor.execute(query)
-		self.mysql_conn.commit()
-		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
-
+		# Save the statistics for the stage that just finished. When buffered, they are only saved when the import moves to a new phase
+		self.stageStatisticsRows.append((self.Hive_DB, self.Hive_Table, self.currentStage, self.stageTimeStart, self.stageTimeStop, round(self.stageDurationTime)))
+		if self.bufferStatistics == False or int(newStage / 1000) != int(self.currentStage / 1000):
+			self.flushStageStatistics(commit=False)
 
 		stageDescription = self.getStageDescription(newStage)
-
-		# Save stage information in import_stage
-		query = "select count(stage) from import_stage where hive_db = %s and hive_table = %s"
-		self.mysql_cursor.execute(query, (self.Hive_DB, self.Hive_Table))
-		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
-
-		row = self.mysql_cursor.fetchone()
-		rowCount = row[0]
-		if rowCount == 0:
+		stageTime = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+
+		# Save stage information in import_stage. The stage is part of the primary key, so the row is updated and only inserted if there is no stage for the table.
+		# The statements runs once for every stage, so they are prepared once and reused
+		query  = "update import_stage set "
+		query += "	stage = %s, "
+		query += "	stage_description = %s, "
+		query += "	stage_time = %s "
+		query += "where hive_db = %s and hive_table = %s "
+		mysql_cursor = self.mysql_conn.preparedCursor(query)
+		mysql_cursor.execute(query, (newStage, stageDescription, stageTime, self.Hive_DB, self.Hive_Table))
+		logging.debug("SQL Statement executed: %s" % (query) )
+
+		if mysql_cursor.rowcount == 0:
 			query  = "insert into import_stage "
-			query += "( "
-			query += "	hive_db, "
-			query += "	hive_table, "
-			query += "	stage, "
-			query += "	stage_description, "
-			query += "	stage_time "
-#			query += "	unrecoverable_error "
-			query += ") "
-			query += "values "
-			query += "( "
-			query += "	'%s', "%(self.Hive_DB)
-			query += "	'%s', "%(self.Hive_Table)
-			query += "	%s, "%(newStage)
-			query += "	'%s', "%(stageDescription)
-			query += "	'%s' "%(datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
-#			query += "	0 "
-			query += ") "
-		else:
-			query  = "update import_stage set"
-			query += "	stage = %s, "%(newStage)
-			query += "	stage_description = '%s', "%(stageDescription)
-			query += "	stage_time = '%s' "%(datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
-			query += "where "
-			query += "	hive_db = '%s' "%(self.Hive_DB)
-			query += "	and hive_table = '%s' "%(self.Hive_Table)
-
-		self.mysql_cursor.execute(query)
+			query += "( hive_db, hive_table, stage, stage_description, stage_time ) "
+			query += "values ( %s, %s, %s, %s, %s ) "
+			query += "on duplicate key update "
+			query += "	stage_description = values(stage_description), "
+			query += "	stage_time = values(stage_time) "
+			self.mysql_conn.preparedCursor(query).execute(query, (self.Hive_DB, self.Hive_Table, newStage, stageDescription, stageTime))
+			logging.debug("SQL Statement executed: %s" % (query) )
+
 		self.mysql_conn.commit()
-		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor.statement) )
 
 		self.currentStage = newStage
 		self.stageTimeStart = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
@@ -784,6 +753,29 @@ class stage(object):
 
 		logging.debug("Executing stage.setStage() - Finished")
 
+	def flushStageStatistics(self, commit=True):
+		""" Saves the buffered stage statistics to the import_stage_statistics table """
+		if len(self.stageStatisticsRows) == 0:
+			return
+
+		logging.debug("Executing stage.flushStageStatistics()")
+
+		query  = "insert into import_stage_statistics "
+		query += "( hive_db, hive_table, stage, start, stop, duration ) "
+		query += "values ( %s, %s, %s, %s, %s, %s ) "
+		query += "on duplicate key update "
+		query += "	start = values(start), "
+		query += "	stop = values(stop), "
+		query += "	duration = values(duration) "
+		self.mysql_cursor.executemany(query, self.stageStatisticsRows)
+		logging.debug("SQL Statement executed: %s" % (query) )
+		self.stageStatisticsRows = []
+
+		if commit == True:
+			self.mysql_conn.commit()
+
+		logging.debug("Executing stage.flushStageStatistics() - Finished")
+
 	def saveRetryAttempt(self, stage):
 		""" Saves the retry attempt in the import_retries_log table """
 		logging.debug("Executing stage.saveRetryAttempt()")
@@ -791,6 +783,7 @@ class stage(object):
 		if self.memoryStage == True:
 			return
 
+		self.flushStageStatistics()
 		stageDescription = self.getStageDescription(stage)
 
 		query  = "insert into import_retries_log "
@@ -21,13 +21,31 @@ import sys
 import logging
 import base64
 import json
+import queue
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from ConfigReader import configuration
 import mysql.connector
 from mysql.connector import errorcode
 from datetime import date, datetime, time, timedelta
 import pandas as pd
 from common import constants as constant
+from common import httpSession
+from common import configDatabase
+from common.Singleton import Singleton
+
+# Maximum number of batches waiting to be sent by restSender. sendBatch() blocks when the queue is full
+REST_SENDER_QUEUE_SIZE = 10
+
+# Number of seconds the sender thread waits for a new batch before it stops
+REST_SENDER_IDLE_TIMEOUT = 2
+
+# The json_to_rest table is read in batches of REST_REPLAY_BATCH_SIZE rows and each batch is posted by REST_REPLAY_THREADS threads.
+# When a type has failed REST_REPLAY_MAX_TYPE_ERRORS times, the rest of the documents with that type are left in the table for the next run
+REST_REPLAY_BATCH_SIZE = 1000
+REST_REPLAY_THREADS = 8
+REST_REPLAY_MAX_TYPE_ERRORS = 100
 
 class postSQLDataToREST(object):
 	def __init__(self):
@@ -42,20 +60,9 @@ class postSQLDataToREST(object):
 			logging.error("Cant find the REST endpoint. Please check configuration file")
 			sys.exit(1)
 
-		# Fetch configuration about MySQL database and how to connect to it
-		mysql_hostname = configuration.get("Database", "mysql_hostname")
-		mysql_port =     configuration.get("Database", "mysql_port")
-		mysql_database = configuration.get("Database", "mysql_database")
-		mysql_username = configuration.get("Database", "mysql_username")
-		mysql_password = configuration.get("Database", "mysql_password")
-
 		# Esablish a connection to the DBImport database in MySQL
 		try:
-			self.mysql_conn = mysql.connector.connect(host=mysql_hostname, 
-												 port=mysql_port, 
-												 database=mysql_database, 
-												 user=mysql_username, 
-												 password=mysql_password)
+			self.mysql_conn = configDatabase.configDatabase().getConnection()
 		except mysql.connector.Error as err:
 			if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
 				logging.error("Something is wrong with your user name or password")
@@ -70,35 +77,73 @@ class postSQLDataToREST(object):
 			self.mysql_cursor_01 = self.mysql_conn.cursor(buffered=False)
 			self.mysql_cursor_02 = self.mysql_conn.cursor(buffered=False)
 
-		rest = restInterface()
-
-		query = "select id, jsondata from json_to_rest"
-		self.mysql_cursor_01.execute(query)
-		logging.debug("SQL Statement executed: %s" % (self.mysql_cursor_01.statement) )
+		self.rest = restInterface()
 
 		successCounter = 0
 		errorCounter = 0
+		typeErrors = {}
+		lastID = 0
+
+		# The same threads, and their HTTP sessions, are used for all batches
+		executor = ThreadPoolExecutor(max_workers=REST_REPLAY_THREADS)
+
+		while True:
+			# Read the next batch of documents. The id is used as the start of the batch so we never read the whole table at once
+			query = "select id, type, jsondata from json_to_rest where id > %s order by id limit %s"
+			self.mysql_cursor_01.execute(query, (lastID, REST_REPLAY_BATCH_SIZE))
+			logging.debug("SQL Statement executed: %s" % (self.mysql_cursor_01.statement) )
+
+			rows = []
+			rowsRead = 0
+			for row in self.mysql_cursor_01:
+				rowsRead += 1
+				lastID = row[0]
+				if typeErrors.get(row[1], 0) < REST_REPLAY_MAX_TYPE_ERRORS:
+					rows.append(row)
+
+			if rowsRead == 0:
+				break
+
+			responseCodes = list(executor.map(lambda row: self.rest.sendData(row[2]), rows))
+
+			sentIDs = []
+			failedIDs = []
+			for row, response_code in zip(rows, responseCodes):
+				if response_code == 200:
+					sentIDs.append(row[0])
+				else:
+					failedIDs.append(row[0])
+					typeErrors[row[1]] = typeErrors.get(row[1], 0) + 1
+					if typeErrors[row[1]] == REST_REPLAY_MAX_TYPE_ERRORS:
+						logging.warning("Too many errors for JSON documents of type '%s'. The remaining documents of that type will be sent in the next run"%(row[1]))
+
+			if len(sentIDs) > 0:
+				query = "delete from json_to_rest where id in (%s)"%(", ".join(["%s"] * len(sentIDs)))
+				self.mysql_cursor_02.execute(query, sentIDs)
+				logging.debug("SQL Statement executed: %s" % (query) )
+
+			if len(failedIDs) > 0:
+				# The status column counts the number of failed transmissions for the document
+				query = "update json_to_rest set status = least(status + 1, 100) where id in (%s)"%(", ".join(["%s"] * len(failedIDs)))
+				self.mysql_cursor_02.execute(query, failedIDs)
+				logging.debug("SQL Statement executed: %s" % (query) )
+
+			if len(sentIDs) > 0 or len(failedIDs) > 0:
+				self.mysql_conn.commit()
+			successCounter += len(sentIDs)
+			errorCounter += len(failedIDs)
 
-		for row in self.mysql_cursor_01.fetchall():
-			jsonID = row[0]
-			jsonData = row[1]
-			response_code = -1
-
-			response_code = rest.sendData(jsonData)
+			if rowsRead < REST_REPLAY_BATCH_SIZE:
+				break
 
-			if response_code == 200:
-				query = "delete from json_to_rest where id = %s"
-				self.mysql_cursor_02.execute(query, (jsonID, ))
-				logging.debug("SQL Statement executed: %s" % (self.mysql_cursor_02.statement) )
-				self.mysql_conn.commit()
-				successCounter += 1
-			else:
-				errorCounter += 1
+		executor.shutdown()
 
 		logging.info("Transmitted %s JSON documents to %s"%(successCounter, self.RESTendpoint))
 		if errorCounter > 0:   logging.error("%s errors encountered"%(errorCounter))
+		for jsonType, errors in sorted(typeErrors.items()):
+			logging.error("    %s errors for type '%s'"%(errors, jsonType))
 
-		self.mysql_conn.close()
+		configDatabase.configDatabase().closeConnection()
 
 
 class restInterface(object):
@@ -124,7 +169,7 @@ class restInterface(object):
 
 		response_code = -1
 		try:
-			response = requests.post(self.RESTendpoint, data=jsonData, headers=self.headers, timeout=int(self.RESTtimeout))
+			response = httpSession.httpSessions().request("rest", "POST", self.RESTendpoint, data=jsonData, headers=self.headers, timeout=int(self.RESTtimeout))
 			response_code = response.status_code
 		except requests.exceptions.RequestException as e:
 			logging.error(e)
@@ -134,3 +179,68 @@ class restInterface(object):
 
 		logging.debug("Executing rest.restInterface.sendData - Finished")
 		return response_code
+
+
+class restSender(object, metaclass=Singleton):
+	""" Sends batches of JSON documents to the REST endpoint from a background thread. Each batch is posted as one JSON array.
+		If the post fails, the whole batch is saved as one row in the json_to_rest table so it can be sent later """
+
+	def __init__(self):
+		logging.debug("Executing rest.restSender.__init__()")
+
+		self.rest = restInterface()
+		self.sendQueue = queue.Queue(maxsize=REST_SENDER_QUEUE_SIZE)
+		self.threadLock = threading.Lock()
+		self.senderThread = None
+
+	def sendBatch(self, jsonType, jsonDocuments):
+		""" Queues a list of JSON documents for the sender thread. The thread is started if it isnt running """
+		logging.debug("Executing rest.restSender.sendBatch()")
+
+		if len(jsonDocuments) == 0:
+			return
+
+		self.sendQueue.put((jsonType, jsonDocuments))
+
+		with self.threadLock:
+			if self.senderThread == None:
+				# The thread is not a daemon, so the process waits for all queued batches before it exits
+				self.senderThread = threading.Thread(target=self.processQueue, name="restSender")
+				self.senderThread.start()
+
+		logging.debug("Executing rest.restSender.sendBatch() - Finished")
+
+	def processQueue(self):
+		""" Sends all queued batches. The thread stops when the queue has been empty for REST_SENDER_IDLE_TIMEOUT seconds """
+		while True:
+			try:
+				jsonType, jsonDocuments = self.sendQueue.get(timeout=REST_SENDER_IDLE_TIMEOUT)
+			except queue.Empty:
+				with self.threadLock:
+					if self.sendQueue.empty():
+						self.senderThread = None
+						configDatabase.configDatabase().closeConnection()
+						return
+				continue
+
+			jsonData = json.dumps(jsonDocuments)
+			logging.debug("Sending %s JSON documents of type '%s' to the REST interface"%(len(jsonDocuments), jsonType))
+			if self.rest.sendData(jsonData) != 200:
+				# There was something wrong with the REST call. So we save it to the database and handle it later
+				logging.debug("REST call failed!")
+				logging.debug("Saving the JSON to the json_to_rest table instead")
+				self.saveToDatabase(jsonType, jsonData)
+
+	def saveToDatabase(self, jsonType, jsonData):
+		""" Saves the JSON to the json_to_rest table. The sender thread gets its own connection as connections cant be shared between threads """
+		try:
+			mysql_conn = configDatabase.configDatabase().getConnection()
+			mysql_cursor = mysql_conn.cursor()
+
+			query = "insert into json_to_rest (type, status, jsondata) values (%s, 0, %s)"
+			mysql_cursor.execute(query, (jsonType, jsonData))
+			mysql_conn.commit()
+			logging.debug("SQL Statement executed: %s" % (mysql_cursor.statement) )
+
+		except mysql.connector.Error as err:
+			logging.error("Cant save the JSON to the json_to_rest table. %s"%(err))
@@ -24,16 +24,11 @@ import subprocess
 import re
 from reprint import output
 import requests
-import puretransport
 import random
-from pyhive import hive
-from pyhive import exc
 from common.Singleton import Singleton
 from common.Exceptions import *
+from common import lazyImport
 import common.Exceptions
-from TCLIService.ttypes import TOperationState
-from requests_kerberos import HTTPKerberosAuth, REQUIRED
-import kerberos
 from ConfigReader import configuration
 import mysql.connector
 from mysql.connector import errorcode
@@ -42,7 +37,6 @@ import pandas as pd
 from DBImportConfig import common_config
 
 import sqlalchemy as sa
-from DBImportOperation import hiveSchema
 #from sqlalchemy.orm import Session, sessionmaker
 #from sqlalchemy.ext.automap import automap_base
 # from setupOperation import schema
@@ -50,6 +44,14 @@ from sqlalchemy.sql import alias, select
 from sqlalchemy.orm import aliased, sessionmaker 
 from sqlalchemy.pool import QueuePool
 
+# The Hive and Kerberos modules are only loaded when they are used
+hive = lazyImport.lazyModule("pyhive.hive")
+exc = lazyImport.lazyModule("pyhive.exc")
+puretransport = lazyImport.lazyModule("puretransport")
+ttypes = lazyImport.lazyModule("TCLIService.ttypes")
+requests_kerberos = lazyImport.lazyModule("requests_kerberos")
+hiveSchema = lazyImport.lazyModule("DBImportOperation.hiveSchema")
+
 
 class operation(object, metaclass=Singleton):
 	def __init__(self, Hive_DB=None, Hive_Table=None):
@@ -68,7 +70,7 @@ class operation(object, metaclass=Singleton):
 
 		# Fetch and initialize the Kerberos configuration
 		self.kerberosPrincipal = configuration.get("Kerberos", "principal")
-		self.webHCatAuth = HTTPKerberosAuth(force_preemptive=True, principal=self.kerberosPrincipal)
+		self.webHCatAuth = requests_kerberos.HTTPKerberosAuth(force_preemptive=True, principal=self.kerberosPrincipal)
 
 		self.common_config = common_config.config()
 
@@ -454,7 +456,7 @@ class operation(object, metaclass=Singleton):
 		firstOutputLine = True
 		errorsFound = False
 		linesToJumpUp = 0
-		while status in (TOperationState.INITIALIZED_STATE, TOperationState.RUNNING_STATE):
+		while status in (ttypes.TOperationState.INITIALIZED_STATE, ttypes.TOperationState.RUNNING_STATE):
 			# If the user configured to print the logs, we do it here
 			logs = self.hive_cursor.fetch_logs()
 			for message in logs:
@@ -17,6 +17,7 @@
 
 import sys
 import re
+import json
 import logging
 import subprocess
 import errno, os, pty
@@ -32,13 +33,17 @@ import mysql.connector
 from mysql.connector import errorcode
 from common.Singleton import Singleton
 from common import constants as constant
+from common import hdfsCopy
+from common import lazyImport
 from DBImportConfig import import_config
-from DBImportConfig import configSchema
 from DBImportOperation import common_operations
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 import time
+import threading
+from queue import Queue
+from queue import Empty
 import sqlalchemy as sa
 from sqlalchemy.ext.automap import automap_base
 from sqlalchemy_utils import create_view
@@ -46,6 +51,8 @@ from sqlalchemy_views import CreateView, DropView
 from sqlalchemy.sql import text, alias, select
 from sqlalchemy.orm import aliased, sessionmaker, Query
 
+# The ORM schema is only needed for copy operations and is loaded at first use
+configSchema = lazyImport.lazyModule("DBImportConfig.configSchema")
 
 class operation(object, metaclass=Singleton):
 	def __init__(self):
@@ -282,6 +289,7 @@ class operation(object, metaclass=Singleton):
 			logging.warning("There are no destination for this table to receive a copy")
 			return
 
+		syncCopies = []
 		for destAndMethod in self.copyDestinations:
 			destination = destAndMethod.split(';')[0]
 			method = destAndMethod.split(';')[1]
@@ -291,7 +299,9 @@ class operation(object, metaclass=Singleton):
 	
 			row = (session.query(
 					dbimportInstances.hdfs_address,
-					dbimportInstances.hdfs_basedir
+					dbimportInstances.hdfs_basedir,
+					dbimportInstances.distcp_bandwidth,
+					dbimportInstances.distcp_maps
 				)
 				.filter(dbimportInstances.name == destination)
 				.one())
@@ -321,7 +331,8 @@ class operation(object, metaclass=Singleton):
 						destination = destination,
 						hdfs_source_path = "%s%s"%(sourceHDFSaddress, sourceHDFSdir),
 						hdfs_target_path = "%s%s"%(targetHDFSaddress, targetHDFSdir),
-						copy_status = 0)
+						copy_status = 0,
+						incremental_copy = 1 if self.import_config.import_is_incremental == True else 0)
 					session.add(newcopyASyncStatus)
 					session.commit()
 					logging.info("DBImport server was notified about asynchronous copy of imported data to '%s'"%(destination))
@@ -375,41 +386,217 @@ class operation(object, metaclass=Singleton):
 
 			else:
 				if self.connectRemoteDBImportInstance(instance = destination):
-					logging.info("Copy HDFS data to instance '%s'"%(destination))
-	
-					distcpCommand = ["hadoop", "distcp", "-overwrite", "-delete", 
-						"%s%s"%(sourceHDFSaddress, sourceHDFSdir),
-						"%s%s"%(targetHDFSaddress, targetHDFSdir)]
-
-					print(" ______________________ ")
-					print("|                      |")
-					print("| Hadoop distCp starts |")
-					print("|______________________|")
-					print("")
-
-
-					# Start distcp
-					sh_session = subprocess.Popen(distcpCommand, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-
-					# Print Stdout and stderr while distcp is running
-					while sh_session.poll() == None:
-						row = sh_session.stdout.readline().decode('utf-8').rstrip()
-						if row != "":
-							print(row)
-							sys.stdout.flush()
-
-					# Print what is left in output after distcp is finished
-					for row in sh_session.stdout.readlines():
-						row = row.decode('utf-8').rstrip()
-						if row != "":
-							print(row)
-							sys.stdout.flush()
-
-					print(" _________________________ ")
-					print("|                         |")
-					print("| Hadoop distCp completed |")
-					print("|_________________________|")
-					print("")
+					syncCopy = {}
+					syncCopy["destination"] = destination
+					syncCopy["HDFSsourcePath"] = "%s%s"%(sourceHDFSaddress, sourceHDFSdir)
+					syncCopy["HDFStargetPath"] = "%s%s"%(targetHDFSaddress, targetHDFSdir)
+					syncCopy["distCPoptions"] = hdfsCopy.getDistCPoptions(bandwidth = row.distcp_bandwidth, maps = row.distcp_maps)
+					syncCopy["manifest"] = None
+					if self.import_config.import_is_incremental == True:
+						syncCopy["manifest"] = self.getCopyManifest(session, destination, syncCopy["HDFSsourcePath"], syncCopy["HDFStargetPath"])
+					syncCopies.append(syncCopy)
+
+		if len(syncCopies) > 0:
+			self.runSyncCopies(session, syncCopies)
+
+	def runSyncCopies(self, session, syncCopies):
+		""" Runs the synchronous copies to all destinations in parallel. If one of the copies fails, the import will fail after all copies are finished """
+		logging.debug("Executing copy_operations.runSyncCopies()")
+
+		maxParallelCopies = max(1, self.import_config.common_config.getConfigValue(key = "copy_sync_max_parallel"))
+
+		copyQueue = Queue()
+		for syncCopy in syncCopies:
+			copyQueue.put(syncCopy)
+
+		print(" ______________________ ")
+		print("|                      |")
+		print("| Hadoop distCp starts |")
+		print("|______________________|")
+		print("")
+
+		outputLock = threading.Lock()
+		copyThreads = []
+		for i in range(min(maxParallelCopies, len(syncCopies))):
+			copyThread = threading.Thread(target = self.syncCopyWorker, args = (copyQueue, outputLock))
+			copyThread.start()
+			copyThreads.append(copyThread)
+
+		for copyThread in copyThreads:
+			copyThread.join()
+
+		print(" _________________________ ")
+		print("|                         |")
+		print("| Hadoop distCp completed |")
+		print("|_________________________|")
+		print("")
+
+		self.saveCopyStatistics(session, syncCopies)
+
+		copyFailed = False
+		for syncCopy in syncCopies:
+			if syncCopy["result"] == False:
+				logging.error("The copy to instance '%s' failed"%(syncCopy["destination"]))
+				copyFailed = True
+			elif syncCopy["sourceFiles"] != None:
+				self.saveCopyManifest(session, syncCopy["destination"], syncCopy["HDFSsourcePath"], syncCopy["HDFStargetPath"], syncCopy["sourceFiles"])
+
+		if copyFailed == True:
+			self.remove_temporary_files()
+			sys.exit(1)
+
+		logging.debug("Executing copy_operations.runSyncCopies() - Finished")
+
+	def syncCopyWorker(self, copyQueue, outputLock):
+		""" Thread that runs synchronous copies from the queue until it's empty """
+
+		while True:
+			try:
+				syncCopy = copyQueue.get(block = False)
+			except Empty:
+				break
+
+			# The statistics for a copy that fails before distCp starts is saved as a failed copy with nothing copied
+			syncCopy["result"] = False
+			syncCopy["incrementalCopy"] = False
+			syncCopy["copyStatistics"] = hdfsCopy.distCPoutputParser().getCopyStatistics()
+			syncCopy["copyStart"] = datetime.now()
+			syncCopy["copyStop"] = syncCopy["copyStart"]
+
+			try:
+				syncCopy["result"] = self.runSyncCopy(syncCopy, outputLock)
+			except Exception:
+				with outputLock:
+					logging.exception("The copy to instance '%s' failed with an unexpected error"%(syncCopy["destination"]))
+			finally:
+				copyQueue.task_done()
+
+	def runSyncCopy(self, syncCopy, outputLock):
+		""" Copies the data to one destination. Returns True if the copy was successful """
+
+		destination = syncCopy["destination"]
+		HDFSsourcePath = syncCopy["HDFSsourcePath"]
+		HDFStargetPath = syncCopy["HDFStargetPath"]
+
+		with outputLock:
+			logging.info("Copy HDFS data to instance '%s'"%(destination))
+
+		syncCopy["sourceFiles"] = None
+		copyPlan = None
+		if self.import_config.import_is_incremental == True:
+			syncCopy["sourceFiles"] = hdfsCopy.getHDFSfiles(HDFSsourcePath, checksums=True)
+			copyPlan = hdfsCopy.getIncrementalCopyPlan(syncCopy["manifest"], HDFSsourcePath, syncCopy["sourceFiles"], hdfsCopy.getHDFSfiles(HDFStargetPath))
+			with outputLock:
+				if copyPlan == None:
+					logging.info("%s: No valid manifest from a previous copy exists or the target have changed. Doing a full copy"%(destination))
+				else:
+					logging.info("%s: Incremental copy of %s files. %s files will be removed on the target"%(destination, len(copyPlan["copy"]), len(copyPlan["delete"])))
+
+		if copyPlan == None:
+			commandList = [["hadoop", "distcp"] + syncCopy["distCPoptions"] + ["-overwrite", "-delete", HDFSsourcePath, HDFStargetPath]]
+			tempFiles = []
+		else:
+			commandList, tempFiles = hdfsCopy.getIncrementalCopyCommands(HDFSsourcePath, HDFStargetPath, copyPlan, syncCopy["distCPoptions"])
+
+		copyResult = True
+		distCPparser = hdfsCopy.distCPoutputParser()
+		syncCopy["copyStart"] = datetime.now()
+		for command in commandList:
+			distCPparser.newCommand()
+			returnCode = self.runCopyCommand(command, destination, outputLock, distCPparser)
+			if command[0] == "hdfs":
+				if returnCode != 0:
+					copyResult = False
+			elif distCPparser.isSuccessful(returnCode) == False:
+				copyResult = False
+
+			if copyResult == False:
+				break
+
+		syncCopy["copyStop"] = datetime.now()
+		syncCopy["incrementalCopy"] = copyPlan != None
+		syncCopy["copyStatistics"] = distCPparser.getCopyStatistics()
+
+		for tempFile in tempFiles:
+			os.remove(tempFile)
+
+		with outputLock:
+			logging.info("%s: %s"%(destination, hdfsCopy.getCopySummary(syncCopy["copyStatistics"], syncCopy["copyStart"], syncCopy["copyStop"])))
+
+		return copyResult
+
+	def runCopyCommand(self, command, outputPrefix, outputLock, distCPparser):
+		""" Executes the command and prints the output with outputPrefix in front of every row. Every row is also sent to the 
+			distCP output parser. Returns the exit code """
+
+		sh_session = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+		for row in iter(sh_session.stdout.readline, b''):
+			row = row.decode('utf-8').rstrip()
+			if row != "":
+				distCPparser.parseRow(row)
+				with outputLock:
+					print("%s: %s"%(outputPrefix, row))
+					sys.stdout.flush()
+
+		sh_session.wait()
+		return sh_session.returncode
+
+	def saveCopyStatistics(self, session, syncCopies):
+		""" Saves the statistics from the synchronous copies in the copy_statistics table """
+		logging.debug("Executing copy_operations.saveCopyStatistics()")
+
+		statisticsList = []
+		for syncCopy in syncCopies:
+			statisticsDict = syncCopy["copyStatistics"]
+			statisticsDict["hive_db"] = self.Hive_DB
+			statisticsDict["hive_table"] = self.Hive_Table
+			statisticsDict["destination"] = syncCopy["destination"]
+			statisticsDict["data_transfer"] = "Synchronous"
+			statisticsDict["incremental_copy"] = 1 if syncCopy["incrementalCopy"] == True else 0
+			statisticsDict["result"] = 1 if syncCopy["result"] == True else 0
+			statisticsDict["start"] = syncCopy["copyStart"]
+			statisticsDict["stop"] = syncCopy["copyStop"]
+			statisticsDict["duration"] = int((syncCopy["copyStop"] - syncCopy["copyStart"]).total_seconds())
+			statisticsList.append(statisticsDict)
+
+		session.bulk_insert_mappings(configSchema.copyStatistics, statisticsList)
+		session.commit()
+
+	def getCopyManifest(self, session, destination, HDFSsourcePath, HDFStargetPath):
+		""" Returns the list of files that was copied to the destination in the last successful copy, or None if there is no valid manifest """
+		logging.debug("Executing copy_operations.getCopyManifest()")
+
+		copyManifest = aliased(configSchema.copyManifest)
+
+		row = (session.query(
+				copyManifest.hdfs_source_path,
+				copyManifest.hdfs_target_path,
+				copyManifest.manifest
+			)
+			.filter(copyManifest.hive_db == self.Hive_DB)
+			.filter(copyManifest.hive_table == self.Hive_Table)
+			.filter(copyManifest.destination == destination)
+			.one_or_none())
+
+		if row == None or row.hdfs_source_path != HDFSsourcePath or row.hdfs_target_path != HDFStargetPath:
+			return None
+
+		return json.loads(row.manifest)
+
+	def saveCopyManifest(self, session, destination, HDFSsourcePath, HDFStargetPath, sourceFiles):
+		""" Saves the list of files that was copied to the destination. Used by the next copy to only copy the changed files """
+		logging.debug("Executing copy_operations.saveCopyManifest()")
+
+		session.merge(configSchema.copyManifest(
+			hive_db = self.Hive_DB,
+			hive_table = self.Hive_Table,
+			destination = destination,
+			hdfs_source_path = HDFSsourcePath,
+			hdfs_target_path = HDFStargetPath,
+			manifest = json.dumps(sourceFiles),
+			last_copy = datetime.now()))
+		session.commit()
 
 	def scheduleTableAsyncCopy(self, hiveFilterDB, hiveFilterTable, copyDestination):
 		""" Schdeule an asynchronous copy of one or more Hive table to the specified destination """
@@ -513,7 +700,8 @@ class operation(object, metaclass=Singleton):
 					destination = copyDestination,
 					hdfs_source_path = "%s%s"%(sourceHDFSaddress, sourceHDFSdir),
 					hdfs_target_path = "%s%s"%(targetHDFSaddress, targetHDFSdir),
-					copy_status = 0)
+					copy_status = 0,
+					incremental_copy = 1 if self.import_config.import_is_incremental == True else 0)
 				localSession.add(newcopyASyncStatus)
 				localSession.commit()
 
@@ -648,7 +836,8 @@ class operation(object, metaclass=Singleton):
 						destination = copyDestination,
 						hdfs_source_path = "%s%s"%(sourceHDFSaddress, sourceHDFSdir),
 						hdfs_target_path = "%s%s"%(targetHDFSaddress, targetHDFSdir),
-						copy_status = 0)
+						copy_status = 0,
+						incremental_copy = 1 if self.import_config.import_is_incremental == True else 0)
 					localSession.add(newcopyASyncStatus)
 					localSession.commit()
 
@@ -150,11 +150,11 @@ class operation(object, metaclass=Singleton):
 			sys.exit(1)
 
 	def updateAtlasWithTargetSchema(self):
-		if self.export_config.common_config.checkAtlasSchema() == True:
+		if self.export_config.common_config.useAtlasOutbox() == True or self.export_config.common_config.checkAtlasSchema() == True:
 			self.export_config.updateAtlasWithRDBMSdata()
 
 	def updateAtlasWithExportLineage(self):
-		if self.export_config.common_config.checkAtlasSchema() == True:
+		if self.export_config.common_config.useAtlasOutbox() == True or self.export_config.common_config.checkAtlasSchema() == True:
 			self.export_config.updateAtlasWithExportLineage()
 
 	def checkHiveDB(self, hiveDB):
@@ -483,6 +483,7 @@ class operation(object, metaclass=Singleton):
 		logging.debug("Executing export_operations.updateExportTempTable()")
 		hiveDB = self.hiveExportTempDB
 		hiveTable = self.hiveExportTempTable
+		self.export_config.common_config.beginChangeHistoryBatch()
 
 		columnsHive   = self.common_operations.getHiveColumns(hiveDB, hiveTable, includeType=True, includeIdx=False)
 
@@ -627,6 +628,7 @@ class operation(object, metaclass=Singleton):
 
 			self.common_operations.executeHiveQuery(query)
 
+		self.export_config.common_config.saveChangeHistory()
 		logging.debug("Executing export_operations.updateTargetTable() - Finished")
 
 	def truncateExportTempTable(self,):
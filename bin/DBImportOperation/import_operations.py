@@ -162,11 +162,11 @@ class operation(object, metaclass=Singleton):
 		self.import_config.saveStageStatistics()
 	
 	def updateAtlasWithSourceSchema(self):
-		if self.import_config.common_config.checkAtlasSchema() == True:
+		if self.import_config.common_config.useAtlasOutbox() == True or self.import_config.common_config.checkAtlasSchema() == True:
 			self.import_config.updateAtlasWithRDBMSdata()
 
 	def updateAtlasWithImportLineage(self):
-		if self.import_config.common_config.checkAtlasSchema() == True:
+		if self.import_config.common_config.useAtlasOutbox() == True or self.import_config.common_config.checkAtlasSchema() == True:
 			self.import_config.updateAtlasWithImportLineage()
 			logging.info("")	# Just to get a blank row before connecting to Hive
 
@@ -1715,6 +1715,7 @@ class operation(object, metaclass=Singleton):
 		""" Update the target table based on the column information in the configuration database """
 		# TODO: If there are less columns in the source table together with a rename of a column, then it wont work. Needs to be handled
 		logging.debug("Executing import_operations.updateTargetTable()")
+		self.import_config.common_config.beginChangeHistoryBatch()
 		columnsConfig = self.import_config.getColumnsFromConfigDatabase(restrictColumns=restrictColumns, sourceIsParquetFile=sourceIsParquetFile) 
 		columnsHive   = self.common_operations.getHiveColumns(hiveDB, hiveTable, includeType=True, excludeDataLakeColumns=True) 
 
@@ -1905,6 +1906,7 @@ class operation(object, metaclass=Singleton):
 
 			self.common_operations.executeHiveQuery(query)
 
+		self.import_config.common_config.saveChangeHistory()
 		logging.debug("Executing import_operations.updateTargetTable() - Finished")
 
 	def updatePKonTargetTable(self,):
@@ -21,7 +21,6 @@ import sys
 import logging
 import subprocess 
 import shutil
-import jaydebeapi
 import re
 from ConfigReader import configuration
 from datetime import date, datetime, time, timedelta
@@ -73,35 +72,10 @@ class initialize(object):
 		self.postStartTask = None
 		self.postStopTask = None
 
-		# Fetch configuration about MySQL database and how to connect to it
-		self.configHostname = configuration.get("Database", "mysql_hostname")
-		self.configPort =     configuration.get("Database", "mysql_port")
-		self.configDatabase = configuration.get("Database", "mysql_database")
-		self.configUsername = configuration.get("Database", "mysql_username")
-		self.configPassword = configuration.get("Database", "mysql_password")
-
-		# Esablish a SQLAlchemy connection to the DBImport database 
-		self.connectStr = "mysql+pymysql://%s:%s@%s:%s/%s"%(
-			self.configUsername, 
-			self.configPassword, 
-			self.configHostname, 
-			self.configPort, 
-			self.configDatabase)
-
-		try:
-			self.configDB = sa.create_engine(self.connectStr, echo = self.debugLogLevel)
-			self.configDB.connect()
-			self.configDBSession = sessionmaker(bind=self.configDB)
-
-		except sa.exc.OperationalError as err:
-			logging.error("%s"%err)
-			self.common_config.remove_temporary_files()
-			sys.exit(1)
-		except:
-			print("Unexpected error: ")
-			print(sys.exc_info())
-			self.common_config.remove_temporary_files()
-			sys.exit(1)
+		# Esablish a SQLAlchemy connection to the DBImport database. The engine is shared with common_config
+		self.common_config.connectSQLAlchemy(exitIfFailure=True)
+		self.configDB = self.common_config.configDB
+		self.configDBSession = self.common_config.configDBSession
 
 		# Esablish a SQLAlchemy connection to the Airflow database
 		airflowConnectStr = configuration.get("Airflow", "airflow_alchemy_conn")
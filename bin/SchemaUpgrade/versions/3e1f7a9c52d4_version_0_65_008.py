@@ -0,0 +1,28 @@
+"""Version 0.65.008
+
+Revision ID: 3e1f7a9c52d4
+Revises: 7b0431792061
+Create Date: 2020-02-17 09:12:31.418203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '3e1f7a9c52d4'
+down_revision = '7b0431792061'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+	op.add_column('copy_async_status', sa.Column('lease_owner', sa.String(length=128), nullable=True, comment='The DBImport server that currently owns the copy'))
+	op.add_column('copy_async_status', sa.Column('lease_expire', sa.DateTime(), nullable=True, comment='Time when the lease of the owning DBImport server expires. After that, another server can take over the copy'))
+	op.create_index('copy_async_status_lease', 'copy_async_status', ['copy_status', 'lease_expire'])
+
+def downgrade():
+	op.drop_index('copy_async_status_lease', table_name='copy_async_status')
+	op.drop_column('copy_async_status', 'lease_expire')
+	op.drop_column('copy_async_status', 'lease_owner')
@@ -0,0 +1,37 @@
+"""Version 0.65.010
+
+Revision ID: 5b7e0c2d9f14
+Revises: 9d2c64b1e7a3
+Create Date: 2020-02-24 10:41:17.308527
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e0c2d9f14'
+down_revision = '9d2c64b1e7a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+	op.add_column('copy_async_status', sa.Column('incremental_copy', mysql.TINYINT(display_width=4), server_default=sa.text("'0'"), nullable=False, comment='1 = Only copy the files that changed since the last successful copy'))
+
+	op.create_table('copy_manifest',
+	sa.Column('hive_db', sa.String(length=256), nullable=False, comment='Hive Database'),
+	sa.Column('hive_table', sa.String(length=256), nullable=False, comment='Hive Table'),
+	sa.Column('destination', sa.String(length=32), nullable=False, comment='DBImport instance the data was copied to'),
+	sa.Column('hdfs_source_path', sa.String(length=768), nullable=False, comment='HDFS path the files was copied from'),
+	sa.Column('hdfs_target_path', sa.String(length=768), nullable=False, comment='HDFS path the files was copied to'),
+	sa.Column('manifest', mysql.LONGTEXT(), nullable=False, comment='JSON with all files, their size and modification time on the source at the time of the copy. Recently modified files also have their checksum'),
+	sa.Column('last_copy', sa.DateTime(), nullable=False, comment='Time of the last successful copy'),
+	sa.PrimaryKeyConstraint('hive_db', 'hive_table', 'destination'),
+	comment='List of files that was copied to a DBImport instance in the last successful copy. Used to only copy changed files on incremental imports'
+	)
+
+def downgrade():
+	op.drop_table('copy_manifest')
+	op.drop_column('copy_async_status', 'incremental_copy')
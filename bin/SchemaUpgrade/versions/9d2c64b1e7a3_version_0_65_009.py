@@ -0,0 +1,24 @@
+"""Version 0.65.009
+
+Revision ID: 9d2c64b1e7a3
+Revises: 3e1f7a9c52d4
+Create Date: 2020-02-18 14:03:52.771094
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2c64b1e7a3'
+down_revision = '3e1f7a9c52d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+	op.add_column('dbimport_instances', sa.Column('max_distcp_sessions', sa.SmallInteger(), nullable=True, comment='Maximum number of concurrent distCp copies the DBImport server will run against this instance. NULL = no limit'))
+
+def downgrade():
+	op.drop_column('dbimport_instances', 'max_distcp_sessions')
@@ -0,0 +1,32 @@
+"""Version 0.65.013
+
+Revision ID: a6d3f08b2c71
+Revises: e83f5a1c07b6
+Create Date: 2020-03-04 10:41:17.502316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d3f08b2c71'
+down_revision = 'e83f5a1c07b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+	op.create_table('atlas_schema_fingerprint',
+	sa.Column('dbalias', sa.String(length=256), nullable=False, comment='Database connection name'),
+	sa.Column('schema_name', sa.String(length=256), nullable=False, comment='Schema Name'),
+	sa.Column('table_name', sa.String(length=256), nullable=False, comment='Table Name'),
+	sa.Column('fingerprint', sa.String(length=64), nullable=False, comment='SHA256 hash of the columns, keys and connection information sent to Atlas'),
+	sa.Column('last_update', sa.DateTime(), nullable=False, comment='Time when the table was last sent to Atlas'),
+	sa.PrimaryKeyConstraint('dbalias', 'schema_name', 'table_name'),
+	comment='Fingerprint of the source table schema from the last Atlas discovery. Tables with an unchanged fingerprint are not sent to Atlas again'
+	)
+
+def downgrade():
+	op.drop_table('atlas_schema_fingerprint')
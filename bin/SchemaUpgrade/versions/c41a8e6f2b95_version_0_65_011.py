@@ -0,0 +1,26 @@
+"""Version 0.65.011
+
+Revision ID: c41a8e6f2b95
+Revises: 5b7e0c2d9f14
+Create Date: 2020-02-27 09:12:44.618203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41a8e6f2b95'
+down_revision = '5b7e0c2d9f14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+	op.add_column('dbimport_instances', sa.Column('distcp_bandwidth', sa.Integer(), nullable=True, comment='Bandwidth in MB/s for each map in distCp copies against this instance. NULL = distCp default'))
+	op.add_column('dbimport_instances', sa.Column('distcp_maps', sa.SmallInteger(), nullable=True, comment='Maximum number of maps in distCp copies against this instance. NULL = distCp default'))
+
+def downgrade():
+	op.drop_column('dbimport_instances', 'distcp_maps')
+	op.drop_column('dbimport_instances', 'distcp_bandwidth')
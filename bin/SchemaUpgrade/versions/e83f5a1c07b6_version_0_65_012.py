@@ -0,0 +1,43 @@
+"""Version 0.65.012
+
+Revision ID: e83f5a1c07b6
+Revises: c41a8e6f2b95
+Create Date: 2020-03-02 13:27:05.118940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e83f5a1c07b6'
+down_revision = 'c41a8e6f2b95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+	op.create_table('copy_statistics',
+	sa.Column('id', mysql.BIGINT(display_width=20), autoincrement=True, nullable=False, comment='Auto Incremented PrimaryKey of the table'),
+	sa.Column('hive_db', sa.String(length=256), nullable=False, comment='Hive Database'),
+	sa.Column('hive_table', sa.String(length=256), nullable=False, comment='Hive Table'),
+	sa.Column('destination', sa.String(length=32), nullable=False, comment='DBImport instance the data was copied to'),
+	sa.Column('data_transfer', sa.Enum('Synchronous', 'Asynchronous'), nullable=False, comment='Synchronous or Asynchronous copy'),
+	sa.Column('incremental_copy', mysql.TINYINT(display_width=4), server_default=sa.text("'0'"), nullable=False, comment='1 = Only the changed files was copied'),
+	sa.Column('result', mysql.TINYINT(display_width=4), nullable=False, comment='1 = Copy was successful, 0 = Copy failed'),
+	sa.Column('start', sa.DateTime(), nullable=False, comment='Time when the copy started'),
+	sa.Column('stop', sa.DateTime(), nullable=False, comment='Time when the copy was completed'),
+	sa.Column('duration', sa.Integer(), nullable=False, comment='Duration of the copy in seconds'),
+	sa.Column('bytes_copied', mysql.BIGINT(display_width=20), server_default=sa.text("'0'"), nullable=False, comment='Number of bytes copied'),
+	sa.Column('bytes_skipped', mysql.BIGINT(display_width=20), server_default=sa.text("'0'"), nullable=False, comment='Number of bytes skipped as they already existed on the target'),
+	sa.Column('files_copied', mysql.BIGINT(display_width=20), server_default=sa.text("'0'"), nullable=False, comment='Number of files copied'),
+	sa.Column('files_skipped', mysql.BIGINT(display_width=20), server_default=sa.text("'0'"), nullable=False, comment='Number of files skipped as they already existed on the target'),
+	sa.PrimaryKeyConstraint('id'),
+	comment='Statistics from every distCp copy to other DBImport instances.'
+	)
+	op.create_index('copy_statistics_destination', 'copy_statistics', ['destination', 'start'], unique=False)
+
+def downgrade():
+	op.drop_index('copy_statistics_destination', table_name='copy_statistics')
+	op.drop_table('copy_statistics')
@@ -0,0 +1,38 @@
+"""Version 0.65.014
+
+Revision ID: f2b8d4a61c37
+Revises: a6d3f08b2c71
+Create Date: 2020-03-06 14:02:51.334790
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d4a61c37'
+down_revision = 'a6d3f08b2c71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+	op.create_table('atlas_outbox',
+	sa.Column('id', mysql.BIGINT(display_width=20), autoincrement=True, nullable=False, comment='Unique Identifier'),
+	sa.Column('type', sa.Enum('rdbms_table', 'lineage'), nullable=False, comment='rdbms_table = Source/target table schema, lineage = Entities for the import or export lineage'),
+	sa.Column('dbalias', sa.String(length=256), nullable=False, comment='Database connection name'),
+	sa.Column('schema_name', sa.String(length=256), nullable=False, comment='Schema Name'),
+	sa.Column('table_name', sa.String(length=256), nullable=False, comment='Table Name'),
+	sa.Column('create_time', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False, comment='Time when the update was created'),
+	sa.Column('attempts', sa.Integer(), server_default=sa.text("'0'"), nullable=False, comment='Number of failed attempts to send the update to Atlas'),
+	sa.Column('next_attempt', sa.DateTime(), nullable=True, comment='The update will not be sent to Atlas before this time. NULL = as soon as possible'),
+	sa.Column('jsondata', mysql.LONGTEXT(), nullable=False, comment='The payload. Table schema for rdbms_table and the Atlas entities for lineage'),
+	sa.PrimaryKeyConstraint('id'),
+	comment='Atlas updates from imports and exports waiting to be sent to Atlas by the DBImport server'
+	)
+	op.create_index('atlas_outbox_next_attempt', 'atlas_outbox', ['next_attempt'], unique=False)
+
+def downgrade():
+	op.drop_index('atlas_outbox_next_attempt', table_name='atlas_outbox')
+	op.drop_table('atlas_outbox')
@@ -48,10 +48,79 @@ from sqlalchemy_views import CreateView, DropView
 from sqlalchemy.sql import text, alias, select, func
 from sqlalchemy.orm import aliased, sessionmaker, Query
 
+class atlasDiscoveryWorker(threading.Thread):
+	""" Runs Atlas discoveries on the connection aliases it receives from the atlasDiscovery thread. Every worker have its own 
+		common_config instance, and by that its own JDBC and MySQL connection """
+
+	def __init__(self, name, discoveryReqQueue, discoveryResQueue, threadStopEvent):
+		threading.Thread.__init__(self)
+		self.name = name
+		self.discoveryReqQueue = discoveryReqQueue
+		self.discoveryResQueue = discoveryResQueue
+		self.threadStopEvent = threadStopEvent
+
+	def run(self):
+		logger = "atlasDiscovery"
+		log = logging.getLogger(logger)
+
+		self.common_config = common_config.config.newInstance(instanceName = "atlasDiscovery%s"%(self.name))
+
+		while not self.threadStopEvent.isSet():
+			dbAlias = self.discoveryReqQueue.get()
+			if dbAlias is None:
+				break
+
+			discoveryResponse = {}
+			discoveryResponse["dbAlias"] = dbAlias
+			try:
+				discoveryResponse["result"] = self.discover(dbAlias, log, logger)
+			except:
+				log.error("Thread %s: Unexpected error during Atlas discovery on connection '%s'"%(self.name, dbAlias))
+				log.error(sys.exc_info())
+				self.common_config.disconnectFromJDBC()
+				discoveryResponse["result"] = False
+			self.discoveryResQueue.put(discoveryResponse)
+
+		self.common_config.remove_temporary_files()
+
+	def discover(self, dbAlias, log, logger):
+		""" Runs the Atlas discovery on one connection alias. Returns True if the discovery was successful, False if it failed and 
+			None if the source type does not support Atlas discovery """
+
+		try:
+			self.common_config.mysql_conn.commit()
+			self.common_config.lookupConnectionAlias(dbAlias)
+		except invalidConfiguration as errMsg:
+			log.error("Thread %s: %s"%(self.name, errMsg))
+			return False
+
+		if self.common_config.atlasJdbcSourceSupport == False:
+			# This source type does not support Atlas discovery
+			return None
+
+		# We now have a valid connection in dbAlias that we can do a discovery on
+		log.info("Thread %s: Starting a Atlas discovery on connection '%s'"%(self.name, dbAlias))
+
+		if self.common_config.connectToJDBC(allJarFiles=True, exitIfFailure=False, logger=logger) == False:
+			return False
+
+		self.common_config.atlasEnabled = True
+		response = self.common_config.discoverAtlasRdbms(dbAlias = dbAlias, logger=logger)
+		self.common_config.disconnectFromJDBC()
+
+		if response == False:
+			# Something went wrong when getting source system schema
+			log.warning("Thread %s: There was an error/warning when discovering source schema"%(self.name))
+			return False
+
+		log.info("Thread %s: Finished Atlas discovery on connection '%s'"%(self.name, dbAlias))
+		return True
+
 class atlasDiscovery(threading.Thread):
-	def __init__(self, threadStopEvent):
+	def __init__(self, threadStopEvent, configDBpool):
 		threading.Thread.__init__(self)
 		self.threadStopEvent = threadStopEvent
+		self.configDBpool = configDBpool
 
 	def run(self):
 		logger = "atlasDiscovery"
@@ -59,25 +128,17 @@ class atlasDiscovery(threading.Thread):
 #		log.info("atlasDiscovery started")
 		self.mysql_conn = None
 		self.mysql_cursor = None
-		self.configDBSession = None
-		self.configDBEngine = None
 		self.debugLogLevel = False
 
 		if logging.root.level == 10:        # DEBUG
 			self.debugLogLevel = True
 
-		# Fetch configuration about MySQL database and how to connect to it
-		self.configHostname = configuration.get("Database", "mysql_hostname")
-		self.configPort =     configuration.get("Database", "mysql_port")
-		self.configDatabase = configuration.get("Database", "mysql_database")
-		self.configUsername = configuration.get("Database", "mysql_username")
-		self.configPassword = configuration.get("Database", "mysql_password")
-
 		self.common_config = common_config.config()
 
 		jdbcConnections = aliased(configSchema.jdbcConnections)
 
 		failureLog = {}
+		unsupportedLog = {}
 
 		# The interval between the scans. This is in hours
 		atlasDiscoveryInterval = self.common_config.getConfigValue(key = "atlas_discovery_interval")
@@ -87,8 +148,87 @@ class atlasDiscovery(threading.Thread):
 			log.info("atlasDiscovery started")
 			log.info("Atlas discovery interval is set to %s hours"%(atlasDiscoveryInterval))
 
+		# Start the discovery workers. Connection aliases that are being discovered are kept in activeAliases
+		discoveryReqQueue = Queue()
+		discoveryResQueue = Queue()
+		discoveryWorkers = []
+		activeAliases = set()
+
+		if atlasEnabled == True:
+			atlasDiscoveryThreads = int(configuration.get("Server", "atlasDiscovery_threads", default="4"))
+			if atlasDiscoveryThreads < 1:
+				atlasDiscoveryThreads = 1
+
+			log.info("Starting %s Atlas discovery threads"%(atlasDiscoveryThreads))
+			for threadID in range(0, atlasDiscoveryThreads):
+				thread = atlasDiscoveryWorker(name = str(threadID), 
+								discoveryReqQueue = discoveryReqQueue, 
+								discoveryResQueue = discoveryResQueue, 
+								threadStopEvent = self.threadStopEvent)
+				thread.daemon = True
+				thread.start()
+				discoveryWorkers.append(thread)
+
 		while not self.threadStopEvent.isSet() and atlasEnabled == True:
 
+			# Handle the result from all finished discoveries
+			while True:
+				try:
+					discoveryResponse = discoveryResQueue.get(block = False)
+				except Empty:
+					break
+
+				dbAlias = discoveryResponse["dbAlias"]
+				activeAliases.discard(dbAlias)
+
+				if discoveryResponse["result"] == None:
+					# The source type does not support Atlas discovery. No need to check it again until the next interval
+					unsupportedLog[dbAlias] = datetime.now()
+
+				elif discoveryResponse["result"] == True:
+					updateDict = {}
+					updateDict["atlas_last_discovery"] = str(datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
+
+					try:
+						session = self.getDBImportSession()
+						(session.query(configSchema.jdbcConnections)
+							.filter(configSchema.jdbcConnections.dbalias == dbAlias)
+							.update(updateDict))
+						session.commit()
+						session.close()
+
+					except SQLAlchemyError as e:
+						log.error(str(e.__dict__['orig']))
+						session.rollback()
+
+					except SQLerror:
+						# The connection error is already logged by the connection pool
+						pass
+
+					else:
+						failureLog.pop(dbAlias, None)
+
+				else:
+					# Discovery failed. We need to blacklist this connection for some time
+					blackListData = failureLog.get(dbAlias, None)
+					if blackListData == None:
+						blackListTime = 1
+					else:
+						blackListTime = failureLog[dbAlias]['blackListTime'] * 2
+
+						# Max blacklist time is 24 hours
+						if blackListTime > 24: blackListTime = 24
+
+					failureLog[dbAlias] = { 'blackListTime': blackListTime, 'blackListStart': datetime.now() }
+
+					log.warning("Atlas Discovery failed on connection '%s'"%(dbAlias))
+					log.warning("This connection is now blacklisted for %s hours"%(failureLog[dbAlias]['blackListTime']))
+
+			if len(activeAliases) >= len(discoveryWorkers):
+				# All workers are busy
+				time.sleep(1)
+				continue
+
 			try:
 				session = self.getDBImportSession()
 				atlasDiscoveryCheckTime = datetime.utcnow() - timedelta(hours=atlasDiscoveryInterval)
@@ -110,13 +250,23 @@ class atlasDiscovery(threading.Thread):
 			except SQLAlchemyError as e:
 				log.error(str(e.__dict__['orig']))
 				session.rollback()
-				self.disconnectDBImportDB()
+
+			except SQLerror:
+				# The connection error is already logged by the connection pool
+				pass
 
 			else:
 
 				for index, row in jdbcConnectionsDf.iterrows():
+					if len(activeAliases) >= len(discoveryWorkers):
+						break
+
 					dbAlias = row['dbalias']
 
+					if dbAlias in activeAliases:
+						# Discovery is already running on this connection
+						continue
+
 					currentTime = str(datetime.now().strftime('%H:%M:%S'))
 					timeWindowStart = None
 					timeWindowStop = None
@@ -142,123 +292,27 @@ class atlasDiscovery(threading.Thread):
 							# This dbAlias is still blacklisted
 							continue
 
+					# Find out if the dbAlias was found to not support Atlas discovery during the current interval
+					if unsupportedLog.get(dbAlias, None) != None:
+						if datetime.now() < unsupportedLog[dbAlias] + timedelta(hours=atlasDiscoveryInterval):
+							continue
+
 					if dbAliasAllowedAtThisTime == False:
 						# Not allowed to access this connection at this time
 						continue
 
-					self.common_config.mysql_conn.commit()
-					self.common_config.lookupConnectionAlias(dbAlias)
-
-					if self.common_config.atlasJdbcSourceSupport == False:
-						# This source type does not support Atlas discovery
-						continue
-
-					# We now have a valid connection in dbAlias that we can do a discovery on
-					log.info("Starting a Atlas discovery on connection '%s'"%(dbAlias))
-
-					altasOperationFailed = False
-					if self.common_config.connectToJDBC(allJarFiles=True, exitIfFailure=False, logger=logger) == True:
-						self.common_config.atlasEnabled = True
-						response = self.common_config.discoverAtlasRdbms(dbAlias = dbAlias, logger=logger)
-						if response == False:
-							# Something went wrong when getting source system schema
-							altasOperationFailed = True
-							log.warning("There was an error/warning when discovering source schema")
-						else:
-							log.info("Finished Atlas discovery on connection '%s'"%(dbAlias))
-
-						self.common_config.disconnectFromJDBC()
-
-						if altasOperationFailed == False:
-							updateDict = {}
-							updateDict["atlas_last_discovery"] = str(datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
-
-							try:
-								session = self.getDBImportSession()
-								(session.query(configSchema.jdbcConnections)
-									.filter(configSchema.jdbcConnections.dbalias == dbAlias)
-									.update(updateDict))
-								session.commit()
-								session.close()
-	
-							except SQLAlchemyError as e:
-								log.error(str(e.__dict__['orig']))
-								session.rollback()
-								self.disconnectDBImportDB()
-
-							else:
-								failureLog.pop(dbAlias, None)
-								break	
-					else:
-						altasOperationFailed = True
-
-					if altasOperationFailed == True:
-
-						# Connection failed. We need to blacklist this connection for some time
-						blackListData = failureLog.get(dbAlias, None)
-						if blackListData == None:
-							blackListTime = 1
-						else:
-							blackListTime = failureLog[dbAlias]['blackListTime'] * 2
-
-							# Max blacklist time is 24 hours
-							if blackListTime > 24: blackListTime = 24
-
-						failureLog[dbAlias] = { 'blackListTime': blackListTime, 'blackListStart': datetime.now() }
-
-						log.warning("Atlas Discovery failed on connection '%s'"%(dbAlias))
-						log.warning("This connection is now blacklisted for %s hours"%(failureLog[dbAlias]['blackListTime']))
+					activeAliases.add(dbAlias)
+					discoveryReqQueue.put(dbAlias)
 
 			time.sleep(1)
 
-		self.disconnectDBImportDB()
+		# Stop the discovery workers
+		for thread in discoveryWorkers:
+			discoveryReqQueue.put(None)
+
 		if atlasEnabled == True:
 			log.info("atlasDiscovery stopped")
 
 	def getDBImportSession(self):
-		log = logging.getLogger("atlasDiscovery")
-		if self.configDBSession == None:
-			self.connectDBImportDB()
-
-		return self.configDBSession()
-
-
-	def connectDBImportDB(self):
-		# Esablish a SQLAlchemy connection to the DBImport database
-		log = logging.getLogger("atlasDiscovery")
-		self.connectStr = "mysql+pymysql://%s:%s@%s:%s/%s"%(
-			self.configUsername,
-			self.configPassword,
-			self.configHostname,
-			self.configPort,
-			self.configDatabase)
-
-		try:
-			self.configDBEngine = sa.create_engine(self.connectStr, echo = self.debugLogLevel)
-			self.configDBEngine.connect()
-			self.configDBSession = sessionmaker(bind=self.configDBEngine)
-
-		except sa.exc.OperationalError as err:
-			log.error("%s"%err)
-			self.common_config.remove_temporary_files()
-			sys.exit(1)
-		except:
-			print("Unexpected error: ")
-			print(sys.exc_info())
-			self.common_config.remove_temporary_files()
-			sys.exit(1)
-
-		log.info("Connected successful against DBImport database")
-
-	def disconnectDBImportDB(self):
-		""" Disconnects from the database and removes all sessions and engine """
-		log = logging.getLogger("atlasDiscovery")
-
-		if self.configDBEngine != None:
-			log.info("Disconnecting from DBImport database")
-			self.configDBEngine.dispose()
-			self.configDBEngine = None
-
-		self.configDBSession = None
-
-
+		""" Returns a session from the shared connection pool against the DBImport database. Raises SQLerror if there is no connection """
+		return self.configDBpool.getSession()
@@ -0,0 +1,221 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import sys
+import time
+import json
+import logging
+import threading
+from ConfigReader import configuration
+from datetime import datetime, timedelta
+from common.Exceptions import *
+from DBImportConfig import configSchema
+from DBImportConfig import common_config
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import aliased
+
+class atlasOutbox(threading.Thread):
+	""" Sends the Atlas updates that imports and exports saved in the atlas_outbox table to Atlas. The updates are sent in bulk
+		requests and failed updates are retried with an increasing delay """
+
+	def __init__(self, threadStopEvent, configDBpool):
+		threading.Thread.__init__(self)
+		self.threadStopEvent = threadStopEvent
+		self.configDBpool = configDBpool
+
+	def run(self):
+		logger = "atlasOutbox"
+		log = logging.getLogger(logger)
+
+		self.common_config = common_config.config.newInstance(instanceName = "atlasOutbox")
+
+		if self.common_config.atlasEnabled == False:
+			# Atlas is not configured
+			return
+
+		pollInterval = int(configuration.get("Server", "atlasOutbox_poll_interval", default="10"))
+		self.batchSize = int(configuration.get("Server", "atlasOutbox_batch_size", default="100"))
+		self.retryDelay = int(configuration.get("Server", "atlasOutbox_retry_delay", default="60"))
+		self.retryMaxDelay = int(configuration.get("Server", "atlasOutbox_retry_max_delay", default="3600"))
+
+		log.info("atlasOutbox started")
+
+		while not self.threadStopEvent.isSet():
+			# Atlas might have been disabled by an error in the previous round. checkAtlasSchema() only checks Atlas until it succeeds
+			self.common_config.atlasEnabled = True
+			if self.common_config.checkAtlasSchema(logger=logger) == True:
+				try:
+					processedRows = self.processOutbox(log, logger)
+				except:
+					log.error("Unexpected error when sending Atlas updates from the outbox")
+					log.error(sys.exc_info())
+					processedRows = 0
+
+				if processedRows >= self.batchSize:
+					# There is more in the outbox. No need to wait
+					continue
+
+			self.threadStopEvent.wait(pollInterval)
+
+		self.common_config.remove_temporary_files()
+		log.info("atlasOutbox stopped")
+
+	def processOutbox(self, log, logger):
+		""" Sends the next batch of updates in the outbox to Atlas. Returns the number of rows that was processed """
+		atlasOutbox = aliased(configSchema.atlasOutbox)
+
+		try:
+			session = self.configDBpool.getSession()
+			outboxRows = (session.query(atlasOutbox)
+				.filter((atlasOutbox.next_attempt == None) | (atlasOutbox.next_attempt <= datetime.now()))
+				.order_by(atlasOutbox.id)
+				.limit(self.batchSize)
+				.all())
+			session.expunge_all()
+			session.close()
+
+		except SQLAlchemyError as e:
+			log.error(str(e.__dict__['orig']))
+			session.rollback()
+			return 0
+
+		except SQLerror:
+			# The connection error is already logged by the connection pool
+			return 0
+
+		if len(outboxRows) == 0:
+			return 0
+
+		log.debug("Processing %s updates from the Atlas outbox"%(len(outboxRows)))
+
+		# The mysql connection in common_config is used by lookupConnectionAlias(). Commit to see changes done by other processes
+		self.common_config.mysql_conn.commit()
+
+		outboxDict = {}
+		successfulRows = []
+		failedRows = []
+
+		# Only the newest table schema is sent for each table. Older schemas in the batch are removed without being sent, so an old
+		# schema can never overwrite a newer one in Atlas
+		newestTableSchema = {}
+		for row in outboxRows:
+			if row.type == "rdbms_table":
+				newestTableSchema[(row.dbalias, row.schema_name, row.table_name)] = row.id
+
+		supersededIDs = []
+		for row in outboxRows:
+			if row.type == "rdbms_table" and newestTableSchema[(row.dbalias, row.schema_name, row.table_name)] != row.id:
+				log.debug("Skipping Atlas rdbms_table update %s for %s.%s on dbalias %s as there is a newer update in the outbox"%(row.id, row.schema_name, row.table_name, row.dbalias))
+				supersededIDs.append(row.id)
+				continue
+
+			# The id makes the reference unique, as there can be more than one update for the same table in the outbox
+			reference = "%s update %s for %s.%s on dbalias %s"%(row.type, row.id, row.schema_name, row.table_name, row.dbalias)
+			outboxDict[reference] = row
+			self.common_config.atlasEnabled = True
+
+			try:
+				jsonData = json.loads(row.jsondata)
+				if row.type == "rdbms_table":
+					self.common_config.lookupConnectionAlias(row.dbalias, decryptCredentials = False)
+					self.common_config.setAtlasRdbmsSnapshot(jsonData)
+					jsonData = self.common_config.getAtlasRdbmsTableJSON(schemaName = row.schema_name, tableName = row.table_name, logger=logger)
+			except invalidConfiguration as errMsg:
+				log.warning("%s: %s"%(reference, errMsg))
+				jsonData = None
+			except ValueError as errMsg:
+				log.warning("%s: Invalid JSON in outbox. %s"%(reference, errMsg))
+				jsonData = None
+
+			if jsonData == None:
+				failedRows.append(row)
+				continue
+
+			batchResult = self.common_config.atlasBatchAdd(jsonData, reference = reference, logger=logger)
+			self.processBatchResult(batchResult, outboxDict, successfulRows, failedRows, log, logger)
+
+		self.common_config.atlasEnabled = True
+		batchResult = self.common_config.atlasBatchFlush(logger=logger)
+		self.processBatchResult(batchResult, outboxDict, successfulRows, failedRows, log, logger)
+
+		self.saveOutboxResult(successfulRows, supersededIDs, failedRows, log)
+		return len(outboxRows)
+
+	def processBatchResult(self, batchResult, outboxDict, successfulRows, failedRows, log, logger):
+		""" Removes old columns and creates foreign keys for the rdbms_table updates that was successfully sent to Atlas """
+		for reference, result in batchResult:
+			row = outboxDict.pop(reference)
+			if result == False:
+				failedRows.append(row)
+				continue
+
+			if row.type == "rdbms_table":
+				self.common_config.atlasEnabled = True
+				self.common_config.lookupConnectionAlias(row.dbalias, decryptCredentials = False)
+				self.common_config.setAtlasRdbmsSnapshot(json.loads(row.jsondata))
+				self.common_config.updateAtlasRdbmsColumnsAndKeys(schemaName = row.schema_name, tableName = row.table_name, printInfo = False, logger=logger)
+
+			log.debug("Atlas %s sent"%(reference))
+			successfulRows.append(row)
+
+	def saveOutboxResult(self, successfulRows, supersededIDs, failedRows, log):
+		""" Deletes the updates that was sent to Atlas or replaced by a newer update and schedules a new attempt for the failed updates """
+		atlasOutbox = configSchema.atlasOutbox
+
+		try:
+			session = self.configDBpool.getSession()
+
+			deleteIDs = [row.id for row in successfulRows] + supersededIDs
+			if len(deleteIDs) > 0:
+				(session.query(atlasOutbox)
+					.filter(atlasOutbox.id.in_(deleteIDs))
+					.delete(synchronize_session=False))
+
+			# Older table schemas that are waiting for a retry must not be sent after the newer schema that was just sent
+			for row in successfulRows:
+				if row.type == "rdbms_table":
+					(session.query(atlasOutbox)
+						.filter(atlasOutbox.type == "rdbms_table")
+						.filter(atlasOutbox.dbalias == row.dbalias)
+						.filter(atlasOutbox.schema_name == row.schema_name)
+						.filter(atlasOutbox.table_name == row.table_name)
+						.filter(atlasOutbox.id < row.id)
+						.delete(synchronize_session=False))
+
+			for row in failedRows:
+				retryDelay = min(self.retryDelay * (2 ** row.attempts), self.retryMaxDelay)
+				(session.query(atlasOutbox)
+					.filter(atlasOutbox.id == row.id)
+					.update({
+						atlasOutbox.attempts: row.attempts + 1,
+						atlasOutbox.next_attempt: datetime.now() + timedelta(seconds=retryDelay)
+					}, synchronize_session=False))
+
+			session.commit()
+			session.close()
+
+		except SQLAlchemyError as e:
+			log.error(str(e.__dict__['orig']))
+			session.rollback()
+
+		except SQLerror:
+			# The connection error is already logged by the connection pool
+			pass
+
+		if len(failedRows) > 0:
+			log.warning("%s Atlas updates failed and will be retried later"%(len(failedRows)))
+		log.info("Sent %s updates from the outbox to Atlas"%(len(successfulRows)))
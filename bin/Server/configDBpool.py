@@ -0,0 +1,106 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import logging
+import threading
+from ConfigReader import configuration
+from datetime import datetime, timedelta
+from common.Singleton import Singleton
+from common.Exceptions import *
+import sqlalchemy as sa
+from sqlalchemy.orm import sessionmaker
+
+class configDBpool(object, metaclass=Singleton):
+	""" Process wide connection pool against the DBImport configuration database. All threads in the server gets their 
+		sessions from here, so the number of connections to MySQL is limited by the pool settings in the [Server] section. 
+		Failed connection attempts are retried with an exponential backoff """
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.configDBEngine = None
+		self.configDBSession = None
+		self.connectFailures = 0
+		self.nextConnectAttempt = None
+		self.debugLogLevel = False
+
+		if logging.root.level == 10:        # DEBUG
+			self.debugLogLevel = True
+
+		self.connectStr = "mysql+pymysql://%s:%s@%s:%s/%s"%(
+			configuration.get("Database", "mysql_username"),
+			configuration.get("Database", "mysql_password"),
+			configuration.get("Database", "mysql_hostname"),
+			configuration.get("Database", "mysql_port"),
+			configuration.get("Database", "mysql_database"))
+
+		self.poolSize = int(configuration.get("Server", "configDB_pool_size", default="5"))
+		self.poolMaxOverflow = int(configuration.get("Server", "configDB_pool_max_overflow", default="5"))
+		self.poolRecycle = int(configuration.get("Server", "configDB_pool_recycle", default="3600"))
+		self.reconnectMaxDelay = int(configuration.get("Server", "configDB_reconnect_max_delay", default="300"))
+
+	def getSession(self):
+		""" Returns a new session against the configuration database. The session must be closed by the caller so the 
+			connection is returned to the pool. Raises SQLerror if there is no connection to the database """
+
+		with self.lock:
+			if self.configDBSession == None:
+				self.connect()
+			sessionFactory = self.configDBSession
+
+		return sessionFactory()
+
+	def connect(self):
+		""" Creates the engine and the session factory. Must be called with the lock held """
+		log = logging.getLogger("server")
+
+		if self.nextConnectAttempt != None and datetime.now() < self.nextConnectAttempt:
+			raise SQLerror("Can't connect to DBImport database. Next connection attempt at %s"%(self.nextConnectAttempt.strftime('%H:%M:%S')))
+
+		try:
+			configDBEngine = sa.create_engine(self.connectStr, 
+				echo = self.debugLogLevel, 
+				pool_size = self.poolSize, 
+				max_overflow = self.poolMaxOverflow, 
+				pool_recycle = self.poolRecycle, 
+				pool_pre_ping = True)
+			configDBEngine.connect().close()
+
+		except sa.exc.OperationalError as err:
+			self.connectFailures += 1
+			reconnectDelay = min(2 ** (self.connectFailures - 1), self.reconnectMaxDelay)
+			self.nextConnectAttempt = datetime.now() + timedelta(seconds=reconnectDelay)
+			log.error("%s"%err)
+			log.error("Can't connect to DBImport database. Will retry in %s seconds"%(reconnectDelay))
+			raise SQLerror("Can't connect to DBImport database")
+
+		self.configDBEngine = configDBEngine
+		self.configDBSession = sessionmaker(bind=self.configDBEngine)
+		self.connectFailures = 0
+		self.nextConnectAttempt = None
+		log.info("Connected successful against DBImport database")
+
+	def disconnect(self):
+		""" Closes all connections in the pool and removes the engine """
+		log = logging.getLogger("server")
+
+		with self.lock:
+			if self.configDBEngine != None:
+				log.info("Disconnecting from DBImport database")
+				self.configDBEngine.dispose()
+				self.configDBEngine = None
+
+			self.configDBSession = None
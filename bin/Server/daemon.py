@@ -26,6 +26,8 @@ import logging
 import signal
 import subprocess
 import shlex
+import socket
+import json
 import pandas as pd
 import Crypto
 import binascii
@@ -37,18 +39,96 @@ from daemons.prefab import run
 from ConfigReader import configuration
 from datetime import date, datetime, timedelta
 from common import constants as constant
+from common import hdfsCopy
 from common.Exceptions import *
 from DBImportConfig import configSchema
 from DBImportConfig import common_config
 import sqlalchemy as sa
 from sqlalchemy.ext.automap import automap_base
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy_utils import create_view
 from sqlalchemy_views import CreateView, DropView
 from sqlalchemy.sql import text, alias, select, func
 from sqlalchemy.orm import aliased, sessionmaker, Query
+from Server import configDBpool
 from Server import atlasDiscovery
+from Server import atlasOutbox
 from Server import restServer
+from Server import jdbcGateway
+
+class distCPscheduler(object):
+	""" Work queue for the distCP threads. Requests are handed out with the highest Airflow priority first and the smallest table first 
+		within the same priority. There is a limit on how many copies that can run at the same time against each destination. Failed 
+		copies are not in the queue during their backoff, as claimCopyRequests() only claims them when the backoff have passed """
+
+	def __init__(self):
+		self.condition = threading.Condition()
+		self.requests = []
+		self.runningCopies = {}
+		self.destinationLimits = {}
+		self.stopped = False
+
+	def setDestinationLimits(self, destinationLimits):
+		""" Sets the max number of concurrent copies per destination. A destination that is not in the dict have no limit """
+		with self.condition:
+			self.destinationLimits = destinationLimits
+			self.condition.notify_all()
+
+	def put(self, distCPrequest):
+		""" Adds a request to the queue. Putting None will stop all distCP threads """
+		with self.condition:
+			if distCPrequest is None:
+				self.stopped = True
+			else:
+				self.requests.append(distCPrequest)
+			self.condition.notify_all()
+
+	def get(self):
+		""" Returns the request with the highest priority that is allowed to start. Blocks until there is one """
+		with self.condition:
+			while True:
+				if self.stopped == True:
+					return None
+
+				selectedRequest = None
+
+				for distCPrequest in self.requests:
+					destination = distCPrequest.get("destination")
+					destinationLimit = self.destinationLimits.get(destination)
+					if destinationLimit != None and self.runningCopies.get(destination, 0) >= destinationLimit:
+						continue
+
+					if selectedRequest == None or self.requestPriority(distCPrequest) < self.requestPriority(selectedRequest):
+						selectedRequest = distCPrequest
+
+				if selectedRequest != None:
+					self.requests.remove(selectedRequest)
+					destination = selectedRequest.get("destination")
+					self.runningCopies[destination] = self.runningCopies.get(destination, 0) + 1
+					return selectedRequest
+
+				self.condition.wait()
+
+	def taskDone(self, distCPrequest):
+		""" Must be called by the distCP thread when a copy is completed, so that the destination slot is released """
+		with self.condition:
+			destination = distCPrequest.get("destination")
+			self.runningCopies[destination] = self.runningCopies.get(destination, 1) - 1
+			self.condition.notify_all()
+
+	def requestPriority(self, distCPrequest):
+		""" Sort key for the requests. Lowest value is handed out first """
+		airflowPriority = distCPrequest.get("airflowPriority")
+		size = distCPrequest.get("size")
+		if airflowPriority == None: airflowPriority = 0
+		if size == None: size = 0
+		return (-airflowPriority, distCPrequest.get("failures"), size)
+
+	def qsize(self):
+		with self.condition:
+			return len(self.requests)
+
 
 class distCP(threading.Thread):
 	def __init__(self, name, distCPreqQueue, distCPresQueue, threadStopEvent, loggerName):
@@ -78,6 +158,8 @@ class distCP(threading.Thread):
 			failures = distCPrequest.get('failures')
 			HDFSsourcePath = distCPrequest.get('HDFSsourcePath')
 			HDFStargetPath = distCPrequest.get('HDFStargetPath')
+			incrementalCopy = distCPrequest.get('incrementalCopy')
+			distCPoptions = ["-D", "mapreduce.job.queuename=%s"%(yarnQueue)] + distCPrequest.get('distCPoptions')
 
 			log.info("Thread %s: Starting a new distCP copy with the following paramaters"%(self.name))
 			log.info("Thread %s: --------------------------------------------------------"%(self.name))
@@ -87,67 +169,117 @@ class distCP(threading.Thread):
 			log.info("Thread %s: destination = %s"%(self.name, destination))
 			log.info("Thread %s: HDFSsourcePath = %s"%(self.name, HDFSsourcePath))
 			log.info("Thread %s: HDFStargetPath = %s"%(self.name, HDFStargetPath))
+			log.info("Thread %s: incrementalCopy = %s"%(self.name, incrementalCopy))
 			log.info("Thread %s: --------------------------------------------------------"%(self.name))
 
-			distcpCommand = ["hadoop", "distcp", "-D", "mapreduce.job.queuename=%s"%(yarnQueue), "-overwrite", "-delete",
-				"%s"%(HDFSsourcePath),
-				"%s"%(HDFStargetPath)]
-
-			log.info("Thread %s:  ______________________ "%(self.name))
-			log.info("Thread %s: |                      |"%(self.name))
-			log.info("Thread %s: | Hadoop distCp starts |"%(self.name))
-			log.info("Thread %s: |______________________|"%(self.name))
-			log.info("Thread %s: "%(self.name))
-
-			# Start distcp
-			sh_session = subprocess.Popen(distcpCommand, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-			distCPoutput = ""
-
-			# Print Stdout and stderr while distcp is running
-			while sh_session.poll() == None:
-				row = sh_session.stdout.readline().decode('utf-8').rstrip()
-				if row != "":
-					log.info("Thread %s: %s"%(self.name, row))
-					distCPoutput += row + "\n"
-					sys.stdout.flush()
-
-			# Print what is left in output after distcp is finished
-			for row in sh_session.stdout.readlines():
-				row = row.decode('utf-8').rstrip()
-				if row != "":
-					log.info("Thread %s: %s"%(self.name, row))
-					distCPoutput += row + "\n"
-					sys.stdout.flush()
-
-			log.info("Thread %s:  _________________________ "%(self.name))
-			log.info("Thread %s: |                         |"%(self.name))
-			log.info("Thread %s: | Hadoop distCp completed |"%(self.name))
-			log.info("Thread %s: |_________________________|"%(self.name))
-			log.info("Thread %s: "%(self.name))
-
+			sourceFiles = None
+			copyPlan = None
+			tempFiles = []
 			disCPresult = False
-			if " ERROR " in distCPoutput:
-				log.error("Thread %s: ERROR detected during distCP copy."%(self.name)) 
-				failures = failures + 1
-			elif " completed successfully" in distCPoutput:
-				disCPresult = True
-				failures = 0
-			else:
-				log.error("Thread %s: Unknown status of distCP. Marked as failure as it cant find that it was finished successful"%(self.name)) 
-				failures = failures + 1
+			distCPparser = hdfsCopy.distCPoutputParser()
+			copyStart = datetime.now()
 
-			distCPresponse = {}
-			distCPresponse["tableID"] = tableID
-			distCPresponse["hiveDB"] = hiveDB
-			distCPresponse["hiveTable"] = hiveTable
-			distCPresponse["destination"] = destination
-			distCPresponse["result"] = disCPresult
-			distCPresponse["failures"] = failures
+			# The slot for the destination must always be released, and a copy that fails with an exception is reported as a failed copy
+			try:
+				try:
+					if incrementalCopy == True:
+						sourceFiles = hdfsCopy.getHDFSfiles(HDFSsourcePath, checksums=True)
+						copyPlan = hdfsCopy.getIncrementalCopyPlan(distCPrequest.get('manifest'), HDFSsourcePath, sourceFiles, hdfsCopy.getHDFSfiles(HDFStargetPath))
+						if copyPlan == None:
+							log.info("Thread %s: No valid manifest from a previous copy exists or the target have changed. Doing a full copy"%(self.name))
+						else:
+							log.info("Thread %s: Incremental copy of %s files. %s files will be removed on the target"%(self.name, len(copyPlan["copy"]), len(copyPlan["delete"])))
 
-			self.distCPresQueue.put(distCPresponse)
+					if copyPlan == None:
+						commandList = [["hadoop", "distcp"] + distCPoptions + ["-overwrite", "-delete",
+							"%s"%(HDFSsourcePath),
+							"%s"%(HDFStargetPath)]]
+					else:
+						commandList, tempFiles = hdfsCopy.getIncrementalCopyCommands(HDFSsourcePath, HDFStargetPath, copyPlan, distCPoptions)
+
+					log.info("Thread %s:  ______________________ "%(self.name))
+					log.info("Thread %s: |                      |"%(self.name))
+					log.info("Thread %s: | Hadoop distCp starts |"%(self.name))
+					log.info("Thread %s: |______________________|"%(self.name))
+					log.info("Thread %s: "%(self.name))
+
+					disCPresult = True
+					for command in commandList:
+						distCPparser.newCommand()
+						returnCode = self.runCommand(log, command, distCPparser)
+
+						if command[0] == "hdfs":
+							if returnCode != 0:
+								log.error("Thread %s: ERROR detected when removing files on the target."%(self.name)) 
+								disCPresult = False
+						elif distCPparser.errorFound == True:
+							log.error("Thread %s: ERROR detected during distCP copy."%(self.name)) 
+							disCPresult = False
+						elif distCPparser.isSuccessful(returnCode) == False:
+							log.error("Thread %s: Unknown status of distCP. Marked as failure as it cant find that it was finished successful"%(self.name)) 
+							disCPresult = False
+
+						if disCPresult == False:
+							break
+
+				except Exception:
+					log.exception("Thread %s: Unexpected error during distCP copy"%(self.name))
+					disCPresult = False
+
+				copyStop = datetime.now()
+				log.info("Thread %s: %s"%(self.name, hdfsCopy.getCopySummary(distCPparser.getCopyStatistics(), copyStart, copyStop)))
+				for tempFile in tempFiles:
+					os.remove(tempFile)
+
+				log.info("Thread %s:  _________________________ "%(self.name))
+				log.info("Thread %s: |                         |"%(self.name))
+				log.info("Thread %s: | Hadoop distCp completed |"%(self.name))
+				log.info("Thread %s: |_________________________|"%(self.name))
+				log.info("Thread %s: "%(self.name))
+
+				if disCPresult == True:
+					failures = 0
+				else:
+					failures = failures + 1
+
+				distCPresponse = {}
+				distCPresponse["tableID"] = tableID
+				distCPresponse["hiveDB"] = hiveDB
+				distCPresponse["hiveTable"] = hiveTable
+				distCPresponse["destination"] = destination
+				distCPresponse["result"] = disCPresult
+				distCPresponse["failures"] = failures
+				distCPresponse["incrementalCopy"] = copyPlan != None
+				distCPresponse["copyStart"] = copyStart
+				distCPresponse["copyStop"] = copyStop
+				distCPresponse["copyStatistics"] = distCPparser.getCopyStatistics()
+
+				if disCPresult == True and sourceFiles != None:
+					# Save the files we copied so the next copy can be incremental
+					distCPresponse["HDFSsourcePath"] = HDFSsourcePath
+					distCPresponse["HDFStargetPath"] = HDFStargetPath
+					distCPresponse["manifest"] = sourceFiles
+
+				self.distCPresQueue.put(distCPresponse)
+			finally:
+				self.distCPreqQueue.taskDone(distCPrequest)
 
 		log.info("distCP %s stopped"%(self.name))
 
+	def runCommand(self, log, command, distCPparser):
+		""" Executes the command and logs the output while it's running. Every row is also sent to the distCP output parser. Returns the exit code """
+
+		sh_session = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+		for row in iter(sh_session.stdout.readline, b''):
+			row = row.decode('utf-8').rstrip()
+			if row != "":
+				log.info("Thread %s: %s"%(self.name, row))
+				distCPparser.parseRow(row)
+
+		sh_session.wait()
+		return sh_session.returncode
+
 class serverDaemon(run.RunDaemon):
 
 	def run(self):
@@ -171,21 +303,38 @@ class serverDaemon(run.RunDaemon):
 		self.remoteDBImportEngines = {}
 		self.remoteDBImportSessions = {}
 		self.remoteInstanceConfigDB = None
-
-		self.configDBSession = None
-		self.configDBEngine = None
-
-		self.distCPreqQueue = Queue()
+		self.remoteInstanceHealth = {}
+		self.remoteRetryDelay = int(configuration.get("Server", "remoteDB_retry_delay", default="30"))
+		self.remoteRetryMaxDelay = int(configuration.get("Server", "remoteDB_retry_max_delay", default="900"))
+
+		# All threads in the server shares the same connection pool against the DBImport database
+		self.configDBpool = configDBpool.configDBpool()
+
+		self.distCPretryDelay = int(configuration.get("Server", "distCP_retry_delay", default="60"))
+		self.distCPretryMaxDelay = int(configuration.get("Server", "distCP_retry_max_delay", default="3600"))
+		self.distCPreqQueue = distCPscheduler()
+		self.lastDestinationLimitsUpdate = None
+		self.destinationDistCPoptions = {}
 		self.distCPresQueue = Queue()
 		self.threadStopEvent = threading.Event()
 
+		# Start the JDBC gateway Thread. This is done first, as the gateway starts the JVM that all JDBC connections in the server uses
+		self.jdbcGatewayThread = jdbcGateway.jdbcGateway(self.threadStopEvent, self.configDBpool)
+		self.jdbcGatewayThread.daemon = True
+		self.jdbcGatewayThread.start()
+
 		# Start the Atlas Discovery Thread
-		self.atlasDiscoveryThread = atlasDiscovery.atlasDiscovery(self.threadStopEvent)
+		self.atlasDiscoveryThread = atlasDiscovery.atlasDiscovery(self.threadStopEvent, self.configDBpool)
 		self.atlasDiscoveryThread.daemon = True
 		self.atlasDiscoveryThread.start()
 
+		# Start the Atlas Outbox Thread
+		self.atlasOutboxThread = atlasOutbox.atlasOutbox(self.threadStopEvent, self.configDBpool)
+		self.atlasOutboxThread.daemon = True
+		self.atlasOutboxThread.start()
+
 		# Start the REST Server Thread
-		self.restServerThread = restServer.restServer(self.threadStopEvent)
+		self.restServerThread = restServer.restServer(self.threadStopEvent, self.configDBpool)
 		self.restServerThread.daemon = True
 		self.restServerThread.start()
 
@@ -219,36 +368,33 @@ class serverDaemon(run.RunDaemon):
 			thread.start()
 			distCPobjects.append(thread)
 
-		# Fetch configuration about MySQL database and how to connect to it
-		self.configHostname = configuration.get("Database", "mysql_hostname")
-		self.configPort =     configuration.get("Database", "mysql_port")
-		self.configDatabase = configuration.get("Database", "mysql_database")
-		self.configUsername = configuration.get("Database", "mysql_username")
-		self.configPassword = configuration.get("Database", "mysql_password")
 
-		# Set all rows that have copy_status = 1 to 0. This is needed in the startup as if they are 1 in this stage, it means that a previous
-		# server marked it as 1 but didnt finish the copy. We need to retry that copy here and now
-		try:
-			updateDict = {}
-			updateDict["last_status_update"] = str(datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
-			updateDict["copy_status"] = 0
+		# Each server claims copies from copy_async_status with a lease that is renewed as long as the copy is running. If a server 
+		# dies, the lease will expire and the copy will be retried by this or another DBImport server
+		self.serverID = "%s:%s"%(socket.gethostname(), os.getpid())
+		self.leaseTime = int(configuration.get("Server", "distCP_lease_time", default="300"))
+		self.lastLeaseRenewal = datetime.now()
+		log.info("Server ID for copy leases is '%s'"%(self.serverID))
 
+		try:
 			session = self.getDBImportSession()
 
-			(session.query(configSchema.copyASyncStatus)
+			expiredLeases = (session.query(configSchema.copyASyncStatus)
 				.filter(configSchema.copyASyncStatus.copy_status == 1)
-				.update(updateDict))
-			session.commit()
+				.filter((configSchema.copyASyncStatus.lease_expire < datetime.now()) | (configSchema.copyASyncStatus.lease_expire == None))
+				.count())
 			session.close()
 
+			if expiredLeases > 0:
+				log.info("There are %s copies with an expired lease. These will be restarted"%(expiredLeases))
+
 			log.debug("Init part of daemon.serverDaemon.run() completed")
 
 			log.info("Server startup completed")
 
-		except SQLAlchemyError as e:
-			log.error(str(e.__dict__['orig']))
+		except (SQLAlchemyError, SQLerror) as e:
+			log.error(str(e))
 			log.error("Server startup failed")
-			self.disconnectDBImportDB()
 
 			# As we require this operation to be completed successful before entering the main loop, we will exit if there is a problem
 			self.common_config.remove_temporary_files()
@@ -258,278 +404,518 @@ class serverDaemon(run.RunDaemon):
 		dbimportInstances = aliased(configSchema.dbimportInstances)
 		copyASyncStatus = aliased(configSchema.copyASyncStatus)
 
+		# How many rows that will be claimed from copy_async_status in one statement and how long we wait between polls when there is no work
+		distCPclaimBatchSize = int(configuration.get("Server", "distCP_claim_batch_size", default="100"))
+		pollIntervalMin = float(configuration.get("Server", "poll_interval_min", default="1"))
+		pollIntervalMax = float(configuration.get("Server", "poll_interval_max", default="30"))
+		pollInterval = pollIntervalMin
+
+		# Responses from the distCP threads that are not yet saved in copy_async_status
+		self.distCPresponses = []
+
 		while True:
 
 			# ***********************************
 			# Main Loop for server
 			# ***********************************
 
-			try:
-				session = self.getDBImportSession()
+			# Will be set to True if anything was processed in this loop. If not, we will wait longer and longer before we poll again
+			workDone = False
 
-				# status 0 = New data from import
-				# status 1 = Data sent to distCP thread
-				# status 2 = Data returned from distCP and was a failure
-				# status 3 = Data returned from distCP and was a success
-
-				# ------------------------------------------
-				# Fetch all rows from copyASyncStatus that contains the status 0 and send them to distCP threads
-				# ------------------------------------------
-
-				# TODO: make the 1 min interval a configured param
-				status2checkTimestamp = (datetime.now() - timedelta(minutes=1)).strftime('%Y-%m-%d %H:%M:%S.%f')
-
-				aSyncRow = pd.DataFrame(session.query(
-					copyASyncStatus.table_id,
-					copyASyncStatus.hive_db,
-					copyASyncStatus.hive_table,
-					copyASyncStatus.destination,
-					copyASyncStatus.failures,
-					copyASyncStatus.hdfs_source_path,
-					copyASyncStatus.hdfs_target_path
-					)
-					.select_from(copyASyncStatus)
-					.filter((copyASyncStatus.copy_status == 0) | ((copyASyncStatus.copy_status == 2) & (copyASyncStatus.last_status_update <= status2checkTimestamp )))
-					.all())
-
-
-				for index, row in aSyncRow.iterrows():
-
-					tableID = row['table_id']
-					destination = row['destination']
-					hiveDB = row['hive_db']
-					hiveTable = row['hive_table']
-					failures = row['failures']
-					HDFSsourcePath = row['hdfs_source_path']
-					HDFStargetPath = row['hdfs_target_path']
-
-					log.info("New sync request for table %s.%s"%(hiveDB, hiveTable))
-
-					updateDict = {}
-					updateDict["copy_status"] = 1 
-					updateDict["last_status_update"] = str(datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
-
-					(session.query(configSchema.copyASyncStatus)
-						.filter(configSchema.copyASyncStatus.table_id == tableID)
-						.filter(configSchema.copyASyncStatus.destination == destination)
-						.update(updateDict))
-					session.commit()
-
-					distCPrequest = {}
-					distCPrequest["tableID"] = tableID
-					distCPrequest["hiveDB"] = hiveDB
-					distCPrequest["hiveTable"] = hiveTable
-					distCPrequest["destination"] = destination
-					distCPrequest["failures"] = failures
-					distCPrequest["HDFSsourcePath"] = HDFSsourcePath
-					distCPrequest["HDFStargetPath"] = HDFStargetPath
-					self.distCPreqQueue.put(distCPrequest)
+			# status 0 = New data from import
+			# status 1 = Data sent to distCP thread
+			# status 2 = Data returned from distCP and was a failure
+			# status 3 = Data returned from distCP and was a success
 
-					log.debug("Status changed to 1 for table %s.%s and sent to distCP threads"%(hiveDB, hiveTable))
+			# ------------------------------------------
+			# Claim rows from copyASyncStatus that contains the status 0 (or 2 and old enough for a retry) and send them to distCP threads
+			# ------------------------------------------
 
+			try:
+				session = self.getDBImportSession()
+				self.updateDestinationLimits(session)
+				distCPrequests = self.claimCopyRequests(session, distCPclaimBatchSize - self.distCPreqQueue.qsize())
 				session.close()
 
 			except SQLAlchemyError as e:
 				log.error(str(e.__dict__['orig']))
 				session.rollback()
-				self.disconnectDBImportDB()
 
 			except SQLerror:
-				self.disconnectDBImportDB()
+				# The connection error is already logged by the connection pool
+				pass
+
+			else:
+				for distCPrequest in distCPrequests:
+					log.info("New sync request for table %s.%s"%(distCPrequest["hiveDB"], distCPrequest["hiveTable"]))
+					self.distCPreqQueue.put(distCPrequest)
+					log.debug("Status changed to 1 for table %s.%s and sent to distCP threads"%(distCPrequest["hiveDB"], distCPrequest["hiveTable"]))
+
+				if len(distCPrequests) > 0:
+					workDone = True
+
+			# ------------------------------------------
+			# Renew the lease on all copies that this server owns
+			# ------------------------------------------
+			if (datetime.now() - self.lastLeaseRenewal).total_seconds() > self.leaseTime / 3:
+				self.renewCopyLeases()
+
+			# ------------------------------------------
+			# Read all pending responses from the distCP threads and save them in one batch
+			# ------------------------------------------
+			self.drainDistCPresponses()
+
+			if len(self.distCPresponses) > 0:
+				self.saveDistCPresponses()
+				if len(self.distCPresponses) == 0:
+					workDone = True
+
+
+			# ------------------------------------------
+			# Fetch all rows from copyASyncStatus that contains the status 3 and update the remote DBImport instance database
+			# Also dlete the record from the copyASyncStatus table
+			# ------------------------------------------
 
+			if self.completeFinishedCopies() == True:
+				workDone = True
 
 			# ------------------------------------------
-			# Read the response from the distCP threads
+			# Wait before next poll. If there was no work to do, the wait time will increase up to pollIntervalMax.
+			# A response from a distCP thread will interrupt the wait
 			# ------------------------------------------
+			if workDone == True:
+				pollInterval = pollIntervalMin
+			else:
+				pollInterval = min(pollInterval * 2, pollIntervalMax)
+
 			try:
-				distCPresponse = self.distCPresQueue.get(block = False)
-			except Empty:	
+				self.distCPresponses.append(self.distCPresQueue.get(timeout = pollInterval))
+			except Empty:
 				pass
 			else:
-				updateDict = {}
-				updateDict["last_status_update"] = str(datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
-				updateDict["failures"] = distCPresponse.get("failures") 
+				pollInterval = pollIntervalMin
 
-				distCPresult = distCPresponse.get("result")
-				if distCPresult == True:
-					updateDict["copy_status"] = 3 
-				else:
-					updateDict["copy_status"] = 2 
+		log.info("Server stopped")
+		log.debug("Executing daemon.serverDaemon.run() - Finished")
 
-				try:
-					session = self.getDBImportSession()
-					(session.query(configSchema.copyASyncStatus)
-						.filter(configSchema.copyASyncStatus.table_id == distCPresponse.get('tableID'))
-						.filter(configSchema.copyASyncStatus.destination == distCPresponse.get('destination'))
-						.update(updateDict))
-					session.commit()
-					session.close()
+	def claimCopyRequests(self, session, batchSize):
+		""" Claims up to 'batchSize' rows from copy_async_status that is ready to be copied and not leased by another server, in priority order. 
+			All claimed rows gets copy_status = 1 and a lease for this server with one update statement. Returns a list of distCP requests for the claimed rows """
+		log = logging.getLogger("server")
 
-				except SQLAlchemyError as e:
-					log.error(str(e.__dict__['orig']))
-					session.rollback()
-					self.disconnectDBImportDB()
+		if batchSize <= 0:
+			# The scheduler already have enough requests waiting
+			return []
 
-				except SQLerror:
-					self.disconnectDBImportDB()
+		copyASyncStatus = aliased(configSchema.copyASyncStatus)
 
+		# Failed copies are not claimed again until distCP_retry_delay seconds have passed. The delay is doubled for every failure, up 
+		# to distCP_retry_max_delay. The exponent is capped so the calculation cant overflow in MySQL
+		currentTime = datetime.now()
+		retryDelay = func.least(self.distCPretryDelay * func.pow(2, func.least(func.greatest(copyASyncStatus.failures - 1, 0), 30)), self.distCPretryMaxDelay)
+		nextAttempt = func.timestampadd(sa.literal_column("SECOND"), sa.cast(retryDelay, sa.Integer), copyASyncStatus.last_status_update)
+
+		# The rows are claimed in the same order as the scheduler starts them, so the highest Airflow priority and the smallest tables
+		# are claimed first from all waiting rows and not only within the batch. Subqueries are used as a locking read only locks the
+		# rows in copy_async_status and not the rows in the subqueries
+		importTables = configSchema.importTables
+		importStatisticsLast = configSchema.importStatisticsLast
+		airflowPriority = (sa.select(importTables.airflow_priority)
+			.where(importTables.table_id == copyASyncStatus.table_id)
+			.scalar_subquery())
+		tableSize = (sa.select(importStatisticsLast.size)
+			.where(importStatisticsLast.hive_db == copyASyncStatus.hive_db)
+			.where(importStatisticsLast.hive_table == copyASyncStatus.hive_table)
+			.scalar_subquery())
+
+		aSyncRows = (session.query(
+			copyASyncStatus.table_id,
+			copyASyncStatus.hive_db,
+			copyASyncStatus.hive_table,
+			copyASyncStatus.destination,
+			copyASyncStatus.failures,
+			copyASyncStatus.hdfs_source_path,
+			copyASyncStatus.hdfs_target_path,
+			copyASyncStatus.last_status_update,
+			copyASyncStatus.incremental_copy
+			)
+			.select_from(copyASyncStatus)
+			.filter((copyASyncStatus.copy_status == 0) | 
+				((copyASyncStatus.copy_status == 2) & (nextAttempt <= currentTime)) |
+				((copyASyncStatus.copy_status == 1) & ((copyASyncStatus.lease_expire < currentTime) | (copyASyncStatus.lease_expire == None))))
+			.filter((copyASyncStatus.lease_owner == None) | (copyASyncStatus.lease_expire < currentTime) | (copyASyncStatus.lease_expire == None))
+			.order_by(
+				func.coalesce(airflowPriority, 0).desc(),
+				copyASyncStatus.failures,
+				func.coalesce(tableSize, 0),
+				copyASyncStatus.last_status_update)
+			.limit(batchSize)
+			.with_for_update()
+			.all())
+
+		if len(aSyncRows) == 0:
+			session.commit()
+			return []
 
-			# ------------------------------------------
-			# Fetch all rows from copyASyncStatus that contains the status 3 and update the remote DBImport instance database
-			# Also dlete the record from the copyASyncStatus table
-			# ------------------------------------------
+		updateDict = {}
+		updateDict["copy_status"] = 1 
+		updateDict["last_status_update"] = str(currentTime.strftime('%Y-%m-%d %H:%M:%S.%f'))
+		updateDict["lease_owner"] = self.serverID
+		updateDict["lease_expire"] = str((currentTime + timedelta(seconds=self.leaseTime)).strftime('%Y-%m-%d %H:%M:%S.%f'))
+
+		(session.query(configSchema.copyASyncStatus)
+			.filter(sa.tuple_(configSchema.copyASyncStatus.table_id, configSchema.copyASyncStatus.destination).in_(
+				[(row.table_id, row.destination) for row in aSyncRows]))
+			.update(updateDict, synchronize_session=False))
+		session.commit()
+
+		# Fetch the Airflow priority and the size of the last import for the claimed tables. Used by the scheduler to select what to copy first
+		importTables = aliased(configSchema.importTables)
+		importStatisticsLast = aliased(configSchema.importStatisticsLast)
+
+		tablePriority = {}
+		for row in (session.query(
+				importTables.table_id,
+				importTables.airflow_priority,
+				importStatisticsLast.size
+			)
+			.select_from(importTables)
+			.outerjoin(importStatisticsLast, (importTables.hive_db == importStatisticsLast.hive_db) & (importTables.hive_table == importStatisticsLast.hive_table))
+			.filter(importTables.table_id.in_(set([row.table_id for row in aSyncRows])))
+			.all()):
+			tablePriority[row.table_id] = row
+
+		# Fetch the manifest from the last successful copy for incremental copies. Used to only copy the files that have changed
+		copyManifests = {}
+		incrementalRows = [(row.hive_db, row.hive_table, row.destination) for row in aSyncRows if row.incremental_copy == 1]
+		if len(incrementalRows) > 0:
+			copyManifest = aliased(configSchema.copyManifest)
+			for row in (session.query(
+					copyManifest.hive_db,
+					copyManifest.hive_table,
+					copyManifest.destination,
+					copyManifest.hdfs_source_path,
+					copyManifest.hdfs_target_path,
+					copyManifest.manifest
+				)
+				.filter(sa.tuple_(copyManifest.hive_db, copyManifest.hive_table, copyManifest.destination).in_(incrementalRows))
+				.all()):
+				copyManifests[(row.hive_db, row.hive_table, row.destination)] = row
+
+		distCPrequests = []
+		for row in aSyncRows:
+			distCPrequest = {}
+			distCPrequest["tableID"] = row.table_id
+			distCPrequest["hiveDB"] = row.hive_db
+			distCPrequest["hiveTable"] = row.hive_table
+			distCPrequest["destination"] = row.destination
+			distCPrequest["failures"] = row.failures
+			distCPrequest["HDFSsourcePath"] = row.hdfs_source_path
+			distCPrequest["HDFStargetPath"] = row.hdfs_target_path
+			distCPrequest["airflowPriority"] = None
+			distCPrequest["size"] = None
+			distCPrequest["incrementalCopy"] = row.incremental_copy == 1
+			distCPrequest["distCPoptions"] = self.destinationDistCPoptions.get(row.destination, [])
+			distCPrequest["manifest"] = None
+			if row.table_id in tablePriority:
+				distCPrequest["airflowPriority"] = tablePriority[row.table_id].airflow_priority
+				distCPrequest["size"] = tablePriority[row.table_id].size
+
+			copyManifestRow = copyManifests.get((row.hive_db, row.hive_table, row.destination))
+			if copyManifestRow != None and copyManifestRow.hdfs_source_path == row.hdfs_source_path and copyManifestRow.hdfs_target_path == row.hdfs_target_path:
+				distCPrequest["manifest"] = json.loads(copyManifestRow.manifest)
+			distCPrequests.append(distCPrequest)
+
+		log.debug("Claimed %s rows from copy_async_status"%(len(distCPrequests)))
+		return distCPrequests
+
+	def updateDestinationLimits(self, session):
+		""" Reads the max number of concurrent copies and the distCp bandwidth settings per destination from dbimport_instances. 
+			The concurrency limits are sent to the scheduler. Refreshed once a minute """
+
+		if self.lastDestinationLimitsUpdate != None and (datetime.now() - self.lastDestinationLimitsUpdate).total_seconds() < 60:
+			return
+
+		dbimportInstances = aliased(configSchema.dbimportInstances)
+
+		destinationLimits = {}
+		self.destinationDistCPoptions = {}
+		for row in (session.query(
+				dbimportInstances.name,
+				dbimportInstances.max_distcp_sessions,
+				dbimportInstances.distcp_bandwidth,
+				dbimportInstances.distcp_maps
+			)
+			.all()):
+			if row.max_distcp_sessions != None:
+				destinationLimits[row.name] = row.max_distcp_sessions
+			self.destinationDistCPoptions[row.name] = hdfsCopy.getDistCPoptions(bandwidth = row.distcp_bandwidth, maps = row.distcp_maps)
+
+		self.distCPreqQueue.setDestinationLimits(destinationLimits)
+		self.lastDestinationLimitsUpdate = datetime.now()
+
+	def completeFinishedCopies(self):
+		""" Sets copy_finished in import_tables on the remote DBImport instances for all successful copies and removes the copies from 
+			copy_async_status. The copies are grouped per destination so each remote instance is updated with one select and one update. 
+			Returns True if any copy was completed """
+		log = logging.getLogger("server")
+
+		copyASyncStatus = aliased(configSchema.copyASyncStatus)
+
+		try:
+			session = self.getDBImportSession()
+			aSyncRows = (session.query(
+				copyASyncStatus.table_id,
+				copyASyncStatus.hive_db,
+				copyASyncStatus.hive_table,
+				copyASyncStatus.destination
+				)
+				.select_from(copyASyncStatus)
+				.filter(copyASyncStatus.copy_status == 3)
+				.filter((copyASyncStatus.lease_owner == self.serverID) | (copyASyncStatus.lease_owner == None) | (copyASyncStatus.lease_expire < datetime.now()))
+				.all())
+			session.close()
+
+		except SQLAlchemyError as e:
+			log.error(str(e.__dict__['orig']))
+			session.rollback()
+			return False
+
+		except SQLerror:
+			# The connection error is already logged by the connection pool
+			return False
+
+		copiesPerDestination = {}
+		for row in aSyncRows:
+			copiesPerDestination.setdefault(row.destination, []).append(row)
+
+		workDone = False
+		for destination, copyRows in copiesPerDestination.items():
+
+			# Get the remote sessions. if sessions is not available, we just continue with the next destination
+			remoteSessionFactory = self.getDBImportRemoteSession(destination)
+			if remoteSessionFactory == None:
+				continue
+
+			importTables = aliased(configSchema.importTables)
+			updateDict = {}
+			updateDict["copy_finished"] = str(datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
 
 			try:
-				session = self.getDBImportSession()
-				aSyncRow = pd.DataFrame(session.query(
-					copyASyncStatus.table_id,
-					copyASyncStatus.hive_db,
-					copyASyncStatus.hive_table,
-					copyASyncStatus.destination,
-					copyASyncStatus.failures,
-					copyASyncStatus.hdfs_source_path,
-					copyASyncStatus.hdfs_target_path
+				remoteSession = remoteSessionFactory()
+
+				# Get the table_id for all tables at the remote instance
+				remoteTableIDs = {}
+				for remoteRow in (remoteSession.query(
+						importTables.table_id,
+						importTables.hive_db,
+						importTables.hive_table
 					)
-					.select_from(copyASyncStatus)
-					.filter(copyASyncStatus.copy_status == 3)
-					.all())
+					.select_from(importTables)
+					.filter(sa.tuple_(importTables.hive_db, importTables.hive_table).in_([(row.hive_db, row.hive_table) for row in copyRows]))
+					.all()):
+					remoteTableIDs[(remoteRow.hive_db, remoteRow.hive_table)] = remoteRow.table_id
+
+				# Update the values in import_table on the remote instance
+				if len(remoteTableIDs) > 0:
+					(remoteSession.query(configSchema.importTables)
+						.filter(configSchema.importTables.table_id.in_(list(remoteTableIDs.values())))
+						.update(updateDict, synchronize_session=False))
+				remoteSession.commit()
+				remoteSession.close()
+
+			except SQLAlchemyError as e:
+				log.error(str(e.__dict__['orig']))
+				remoteSession.rollback()
+				self.markRemoteInstanceFailed(destination)
+				continue
+
+			self.markRemoteInstanceHealthy(destination)
+
+			completedRows = []
+			for row in copyRows:
+				if (row.hive_db, row.hive_table) in remoteTableIDs:
+					completedRows.append(row)
+				else:
+					log.warning("Table %s.%s does not exist on DBImport instance '%s'"%(row.hive_db, row.hive_table, destination))
+
+			if len(completedRows) == 0:
+				continue
+
+			# Delete the records from copyASyncStatus
+			try:
+				session = self.getDBImportSession()
+				(session.query(configSchema.copyASyncStatus)
+					.filter(configSchema.copyASyncStatus.destination == destination)
+					.filter(configSchema.copyASyncStatus.table_id.in_([row.table_id for row in completedRows]))
+					.delete(synchronize_session=False))
+				session.commit()
 				session.close()
 
 			except SQLAlchemyError as e:
 				log.error(str(e.__dict__['orig']))
 				session.rollback()
-				self.disconnectDBImportDB()
 
-			else:
-				for index, row in aSyncRow.iterrows():
-
-					tableID = row['table_id']
-					destination = row['destination']
-					hiveDB = row['hive_db']
-					hiveTable = row['hive_table']
-					failures = row['failures']
-					HDFSsourcePath = row['hdfs_source_path']
-					HDFStargetPath = row['hdfs_target_path']
-
-					# Get the remote sessions. if sessions is not available, we just continue to the next item in the database
-					_remoteSession = self.getDBImportRemoteSession(destination)
-					if _remoteSession == None:
-						continue
+			except SQLerror:
+				# The connection error is already logged by the connection pool
+				pass
 
-					try:
-						remoteSession = _remoteSession()
-
-						# Get the table_id from the table at the remote instance
-						remoteImportTableID = (remoteSession.query(
-								importTables.table_id
-							)
-							.select_from(importTables)
-							.filter(importTables.hive_db == hiveDB)
-							.filter(importTables.hive_table == hiveTable)
-							.one())
-	
-						remoteTableID = remoteImportTableID[0]
+			else:
+				for row in completedRows:
+					log.info("Table %s.%s copied successfully to '%s'"%(row.hive_db, row.hive_table, destination))
+				workDone = True
 
-						updateDict = {}
-						updateDict["copy_finished"] = str(datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
-		
-						# Update the values in import_table on the remote instance
-						(remoteSession.query(configSchema.importTables)
-							.filter(configSchema.importTables.table_id == remoteTableID)
-							.update(updateDict))
-						remoteSession.commit()
-	
-						remoteSession.close()
+		return workDone
 
-					except SQLAlchemyError as e:
-						log.error(str(e.__dict__['orig']))
-						remoteSession.rollback()
-						self.disconnectRemoteSession(destination)
+	def markRemoteInstanceFailed(self, instance):
+		""" Disconnects from a remote DBImport instance that failed and waits with an exponential backoff before it's used again """
+		log = logging.getLogger("server")
 
-					else:
-						# Delete the record from copyASyncStatus 
-						try:
-							session = self.getDBImportSession()
-							(session.query(configSchema.copyASyncStatus)
-								.filter(configSchema.copyASyncStatus.table_id == tableID)
-								.filter(configSchema.copyASyncStatus.destination == destination)
-								.delete())
-							session.commit()
-							session.close()
-
-						except SQLAlchemyError as e:
-							log.error(str(e.__dict__['orig']))
-							session.rollback()
-							self.disconnectDBImportDB()
-
-						except SQLerror:
-							self.disconnectDBImportDB()
+		self.disconnectRemoteSession(instance)
 
-						else:
-							log.info("Table %s.%s copied successfully to '%s'"%(hiveDB, hiveTable, destination))
-				
-			session.close()
-#			log.info("Starting wait")
-			time.sleep(1)
+		remoteHealth = self.remoteInstanceHealth.setdefault(instance, {"failures": 0, "nextAttempt": None})
+		remoteHealth["failures"] += 1
+		retryDelay = min(self.remoteRetryDelay * 2 ** (remoteHealth["failures"] - 1), self.remoteRetryMaxDelay)
+		remoteHealth["nextAttempt"] = datetime.now() + timedelta(seconds=retryDelay)
+		log.warning("Remote DBImport database for '%s' is unavailable. Will retry in %s seconds"%(instance, retryDelay))
 
-		log.info("Server stopped")
-		log.debug("Executing daemon.serverDaemon.run() - Finished")
+	def markRemoteInstanceHealthy(self, instance):
+		""" Resets the backoff for a remote DBImport instance after a successful operation """
+		self.remoteInstanceHealth.pop(instance, None)
 
-	def disconnectDBImportDB(self):
-		""" Disconnects from the database and removes all sessions and engine """
+	def renewCopyLeases(self):
+		""" Extends the lease on all copies in copy_async_status that is owned by this server """
 		log = logging.getLogger("server")
 
-		if self.configDBEngine != None:
-			log.info("Disconnecting from DBImport database")
-			self.configDBEngine.dispose()
-			self.configDBEngine = None
+		updateDict = {}
+		updateDict["lease_expire"] = str((datetime.now() + timedelta(seconds=self.leaseTime)).strftime('%Y-%m-%d %H:%M:%S.%f'))
+
+		try:
+			session = self.getDBImportSession()
+			renewedLeases = (session.query(configSchema.copyASyncStatus)
+				.filter(configSchema.copyASyncStatus.lease_owner == self.serverID)
+				.filter(configSchema.copyASyncStatus.copy_status.in_([1, 3]))
+				.update(updateDict, synchronize_session=False))
+			session.commit()
+			session.close()
+
+		except SQLAlchemyError as e:
+			log.error(str(e.__dict__['orig']))
+			session.rollback()
 
-		self.configDBSession = None
+		except SQLerror:
+			# The connection error is already logged by the connection pool
+			pass
 
-	def getDBImportSession(self):
-		log = logging.getLogger("server")
-		if self.configDBSession == None:
-			if self.connectDBImportDB() == False:
-				raise SQLerror("Can't connect to DBImport database")
+		else:
+			log.debug("Renewed the lease on %s copies"%(renewedLeases))
+			self.lastLeaseRenewal = datetime.now()
 
-		return self.configDBSession()	
+	def drainDistCPresponses(self):
+		""" Moves all responses that are waiting in the response queue from the distCP threads to self.distCPresponses """
 
+		while True:
+			try:
+				self.distCPresponses.append(self.distCPresQueue.get(block = False))
+			except Empty:
+				break
 
-	def connectDBImportDB(self):
-		# Esablish a SQLAlchemy connection to the DBImport database
+	def saveDistCPresponses(self):
+		""" Saves the result of all responses in self.distCPresponses to copy_async_status in one transaction. 
+			If the save fails, the responses are kept and will be saved in the next loop """
 		log = logging.getLogger("server")
-		self.connectStr = "mysql+pymysql://%s:%s@%s:%s/%s"%(
-			self.configUsername,
-			self.configPassword,
-			self.configHostname,
-			self.configPort,
-			self.configDatabase)
 
+		lastStatusUpdate = str(datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
+		updateList = []
+		statisticsList = []
+		for distCPresponse in self.distCPresponses:
+			updateDict = {}
+			updateDict["last_status_update"] = lastStatusUpdate
+			updateDict["failures"] = distCPresponse.get("failures") 
+
+			# A successful copy keeps the lease so that this server also updates the remote instance. A failed copy 
+			# releases the lease so that any server can retry it
+			if distCPresponse.get("result") == True:
+				updateDict["copy_status"] = 3 
+				updateDict["lease_owner"] = self.serverID
+				updateDict["lease_expire"] = str((datetime.now() + timedelta(seconds=self.leaseTime)).strftime('%Y-%m-%d %H:%M:%S.%f'))
+			else:
+				updateDict["copy_status"] = 2 
+				updateDict["lease_owner"] = None
+				updateDict["lease_expire"] = None
+
+			statisticsDict = distCPresponse.get("copyStatistics")
+			statisticsDict["hive_db"] = distCPresponse.get("hiveDB")
+			statisticsDict["hive_table"] = distCPresponse.get("hiveTable")
+			statisticsDict["destination"] = distCPresponse.get("destination")
+			statisticsDict["data_transfer"] = "Asynchronous"
+			statisticsDict["incremental_copy"] = 1 if distCPresponse.get("incrementalCopy") == True else 0
+			statisticsDict["result"] = 1 if distCPresponse.get("result") == True else 0
+			statisticsDict["start"] = distCPresponse.get("copyStart")
+			statisticsDict["stop"] = distCPresponse.get("copyStop")
+			statisticsDict["duration"] = int((distCPresponse.get("copyStop") - distCPresponse.get("copyStart")).total_seconds())
+			statisticsList.append(statisticsDict)
+
+			manifestDict = None
+			if distCPresponse.get("manifest") != None:
+				manifestDict = {}
+				manifestDict["hive_db"] = distCPresponse.get("hiveDB")
+				manifestDict["hive_table"] = distCPresponse.get("hiveTable")
+				manifestDict["destination"] = distCPresponse.get("destination")
+				manifestDict["hdfs_source_path"] = distCPresponse.get("HDFSsourcePath")
+				manifestDict["hdfs_target_path"] = distCPresponse.get("HDFStargetPath")
+				manifestDict["manifest"] = json.dumps(distCPresponse.get("manifest"))
+				manifestDict["last_copy"] = lastStatusUpdate
+
+			updateList.append((distCPresponse, updateDict, manifestDict))
+
+		copyASyncStatus = configSchema.copyASyncStatus
 		try:
-			self.configDBEngine = sa.create_engine(self.connectStr, echo = self.debugLogLevel)
-			self.configDBEngine.connect()
-			self.configDBSession = sessionmaker(bind=self.configDBEngine)
+			session = self.getDBImportSession()
 
-		except sa.exc.OperationalError as err:
-			log.error("%s"%err)
-			self.configDBSession = None
-			self.configDBEngine = None
-			return False
-#			self.common_config.remove_temporary_files()
-#			sys.exit(1)
+			# The row is only updated if this server still owns the lease. If the lease expired during the copy, another server 
+			# might have claimed the row and the result from this server is thrown away
+			manifestList = []
+			for distCPresponse, updateDict, manifestDict in updateList:
+				updatedRows = (session.query(copyASyncStatus)
+					.filter(copyASyncStatus.table_id == distCPresponse.get("tableID"))
+					.filter(copyASyncStatus.destination == distCPresponse.get("destination"))
+					.filter(copyASyncStatus.lease_owner == self.serverID)
+					.update(updateDict, synchronize_session=False))
+
+				if updatedRows == 0:
+					log.warning("The lease for the copy of %s.%s to '%s' was lost. The result of the copy will not be saved"%(distCPresponse.get("hiveDB"), distCPresponse.get("hiveTable"), distCPresponse.get("destination")))
+				elif manifestDict != None:
+					manifestList.append(manifestDict)
+
+			session.bulk_insert_mappings(configSchema.copyStatistics, statisticsList)
+
+			if len(manifestList) > 0:
+				manifestInsert = mysql_insert(configSchema.copyManifest.__table__).values(manifestList)
+				session.execute(manifestInsert.on_duplicate_key_update(
+					hdfs_source_path = manifestInsert.inserted.hdfs_source_path,
+					hdfs_target_path = manifestInsert.inserted.hdfs_target_path,
+					manifest = manifestInsert.inserted.manifest,
+					last_copy = manifestInsert.inserted.last_copy))
 
-		except:
-			print("Unexpected error: ")
-			print(sys.exc_info())
-			self.configDBSession = None
-			self.configDBEngine = None
-			return False
-#			self.common_config.remove_temporary_files()
-#			sys.exit(1)
+			session.commit()
+			session.close()
+
+		except SQLAlchemyError as e:
+			log.error(str(e.__dict__['orig']))
+			session.rollback()
+
+		except SQLerror:
+			# The connection error is already logged by the connection pool
+			pass
 
-		log.info("Connected successful against DBImport database")
-		return True
+		else:
+			log.debug("Saved %s responses from distCP threads"%(len(updateList)))
+			self.distCPresponses = []
 
+	def getDBImportSession(self):
+		""" Returns a session from the shared connection pool against the DBImport database. Raises SQLerror if there is no connection """
+		return self.configDBpool.getSession()
 
 	def disconnectRemoteSession(self, instance):
 		""" Disconnects from the remote database and removes all sessions and engine """
@@ -550,6 +936,11 @@ class serverDaemon(run.RunDaemon):
 		""" Connects to the remote configuration database with SQLAlchemy """
 		log = logging.getLogger("server")
 
+		# Remote instances that recently failed are not used until the backoff time have passed
+		remoteHealth = self.remoteInstanceHealth.get(instance)
+		if remoteHealth != None and datetime.now() < remoteHealth["nextAttempt"]:
+			return None
+
 		# A dictionary of all remote DBImport configuration databases are keept in self.remoteDBImportSessions
 		# This will make only one sessions to the database and then save that for each and every connection after that
 		if instance in self.remoteDBImportSessions:
@@ -562,7 +953,6 @@ class serverDaemon(run.RunDaemon):
 		try:
 			session = self.getDBImportSession()
 		except SQLerror:
-			self.disconnectDBImportDB()
 			return None
 
 		dbimportInstances = aliased(configSchema.dbimportInstances)
@@ -607,16 +997,18 @@ class serverDaemon(run.RunDaemon):
 			row[2])
 
 		try:
-			remoteInstanceConfigDBEngine = sa.create_engine(instanceConnectStr, echo = self.debugLogLevel)
-			remoteInstanceConfigDBEngine.connect()
+			remoteInstanceConfigDBEngine = sa.create_engine(instanceConnectStr, echo = self.debugLogLevel, pool_pre_ping = True, pool_recycle = self.configDBpool.poolRecycle)
+			remoteInstanceConfigDBEngine.connect().close()
 			remoteInstanceConfigDBSession = sessionmaker(bind=remoteInstanceConfigDBEngine)
 
 		except sa.exc.OperationalError as err:
 			log.error("%s"%err)
+			self.markRemoteInstanceFailed(instance)
 			return None
 		except:
 			log.error("Unexpected error: ")
 			log.error(sys.exc_info())
+			self.markRemoteInstanceFailed(instance)
 			return None
 
 		self.remoteDBImportEngines[instance] = remoteInstanceConfigDBEngine 
@@ -0,0 +1,375 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import os
+import time
+import logging
+import threading
+import socketserver
+import jaydebeapi
+import jpype
+from ConfigReader import configuration
+from common.Exceptions import *
+from common import jdbcGatewayClient
+from DBImportConfig import configSchema
+from DBImportConfig import common_config
+from sqlalchemy.exc import SQLAlchemyError
+
+# Idle connections that have not been used for this many seconds are tested before they are given to a client
+CONNECTION_VALIDATE_AFTER = 60
+
+# Queries that dont change the session. A connection where the client ran anything else is closed instead of being
+# reused, as temporary tables, SET options and other session state cant be reset in the same way for all databases
+READ_ONLY_QUERY_PREFIXES = ("select", "with")
+
+class jdbcConnectionPool(object):
+	""" Pool of JDBC connections against one database. No more than maxConnections connections are open at the same time """
+
+	def __init__(self, driver, url, username, password, maxConnections):
+		self.driver = driver
+		self.url = url
+		self.username = username
+		self.password = password
+		self.maxConnections = maxConnections
+		self.condition = threading.Condition()
+		self.idleConnections = []
+		self.openConnections = 0
+		self.initialAutoCommit = {}
+
+	def getConnection(self, waitTimeout):
+		""" Returns an idle connection or opens a new one. Returns None if all connections are in use for waitTimeout seconds """
+		waitUntil = time.monotonic() + waitTimeout
+
+		with self.condition:
+			while True:
+				if len(self.idleConnections) > 0:
+					connection, idleSince = self.idleConnections.pop()
+					if time.monotonic() - idleSince < CONNECTION_VALIDATE_AFTER or self.isValid(connection) == True:
+						return connection
+					self.closeConnection(connection)
+					continue
+
+				if self.openConnections < self.maxConnections:
+					self.openConnections += 1
+					break
+
+				waitTime = waitUntil - time.monotonic()
+				if waitTime <= 0:
+					return None
+				self.condition.wait(waitTime)
+
+		# The connection is opened without the lock, as it can take a long time for some databases
+		try:
+			connection = jaydebeapi.connect(self.driver, self.url, [ self.username, self.password ])
+			initialAutoCommit = connection.jconn.getAutoCommit()
+		except:
+			with self.condition:
+				self.openConnections -= 1
+				self.condition.notify()
+			raise
+
+		with self.condition:
+			self.initialAutoCommit[connection] = initialAutoCommit
+		return connection
+
+	def releaseConnection(self, connection, broken=False):
+		""" Gives the connection back to the pool. The connection is closed if it's broken or if it cant be reset """
+		if broken == False:
+			try:
+				self.resetConnection(connection)
+			except Exception:
+				broken = True
+
+		with self.condition:
+			if broken == True:
+				self.closeConnection(connection)
+			else:
+				self.idleConnections.append((connection, time.monotonic()))
+			self.condition.notify()
+
+	def resetConnection(self, connection):
+		""" Rollbacks an open transaction and restores the settings the connection had when it was opened """
+		if connection.jconn.getAutoCommit() == False:
+			connection.rollback()
+		connection.jconn.setAutoCommit(self.initialAutoCommit[connection])
+		connection.jconn.clearWarnings()
+
+	def closeIdleConnections(self, idleTimeout):
+		""" Closes the connections that have been idle for more than idleTimeout seconds """
+		with self.condition:
+			for connection, idleSince in list(self.idleConnections):
+				if time.monotonic() - idleSince > idleTimeout:
+					self.idleConnections.remove((connection, idleSince))
+					self.closeConnection(connection)
+
+	def closeConnection(self, connection):
+		""" Must be called with the lock held """
+		self.openConnections -= 1
+		self.initialAutoCommit.pop(connection, None)
+		try:
+			connection.close()
+		except Exception:
+			pass
+
+	def isValid(self, connection):
+		try:
+			return connection.jconn.isValid(5) == True
+		except Exception:
+			return False
+
+class jdbcGatewayServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+	daemon_threads = True
+
+class jdbcGatewayHandler(socketserver.StreamRequestHandler):
+	""" Handles one client. The client gets a connection from the pool on 'connect' and keeps it until it sends 'close' or disconnects """
+
+	def handle(self):
+		gateway = self.server.gateway
+		gateway.attachThread()
+
+		pool = None
+		connection = None
+		cursor = None
+		broken = False
+		changedSession = False
+
+		try:
+			while True:
+				message = jdbcGatewayClient.readMessage(self.rfile)
+				if message == None or message["command"] == "close":
+					break
+
+				if message["command"] == "connect" and connection == None:
+					pool, connection, response = gateway.getConnection(message)
+					if connection != None:
+						cursor = connection.cursor()
+
+				elif message["command"] == "execute" and cursor != None:
+					if not message["query"].lstrip().lower().startswith(READ_ONLY_QUERY_PREFIXES):
+						changedSession = True
+					response = gateway.execute(cursor, message["query"])
+
+				elif message["command"] == "fetch" and cursor != None:
+					response = gateway.fetch(cursor, message["size"])
+
+				else:
+					response = { "status": "error", "errorType": "ProgrammingError", "error": "Invalid JDBC gateway command '%s'"%(message["command"]) }
+
+				jdbcGatewayClient.sendMessage(self.wfile, response)
+
+		except (OSError, ValueError) as errMsg:
+			# The client disconnected in the middle of a request or sent invalid JSON. The connection might be in the middle of a query
+			gateway.log.warning("JDBC gateway client error. %s"%(errMsg))
+			broken = True
+
+		finally:
+			if connection != None:
+				try:
+					cursor.close()
+				except Exception:
+					broken = True
+				pool.releaseConnection(connection, broken=(broken or changedSession))
+			gateway.detachThread()
+
+class jdbcGateway(threading.Thread):
+	""" Keeps a JVM with all JDBC drivers and pools of JDBC connections that the import, export and manage tools on this
+		host uses over a Unix socket. The tools connects in-process if the gateway isnt running """
+
+	def __init__(self, threadStopEvent, configDBpool):
+		threading.Thread.__init__(self)
+		self.threadStopEvent = threadStopEvent
+		self.configDBpool = configDBpool
+		self.log = logging.getLogger("jdbcGateway")
+		self.poolLock = threading.Lock()
+		self.pools = {}
+		self.jvmStarted = False
+
+		# The gateway is disabled if the configuration file is from before the gateway was added
+		self.socketPath = configuration.get("Server", "jdbcGateway_socket", default="").strip()
+		self.defaultPoolSize = int(configuration.get("Server", "jdbcGateway_default_pool_size", default="4"))
+		self.idleTimeout = int(configuration.get("Server", "jdbcGateway_idle_timeout", default="300"))
+		self.connectionWait = int(configuration.get("Server", "jdbcGateway_connection_wait", default="30"))
+
+		if self.socketPath != "":
+			# The JVM must be started before any other thread in the server makes a JDBC connection, as the classpath cant be changed later
+			self.jvmStarted = self.startJVM()
+
+	def startJVM(self):
+		""" Starts the JVM with the drivers for all database types in the classpath """
+		jdbcConnectionsDrivers = configSchema.jdbcConnectionsDrivers
+
+		try:
+			session = self.configDBpool.getSession()
+			classpath = common_config.getJDBCClasspath([ row.classpath for row in session.query(jdbcConnectionsDrivers.classpath).all() ])
+			session.close()
+
+		except SQLAlchemyError as e:
+			self.log.error(str(e.__dict__['orig']))
+			session.rollback()
+			return False
+
+		except SQLerror:
+			# The connection error is already logged by the connection pool
+			return False
+
+		if jpype.isJVMStarted() == True:
+			self.log.error("The JVM is already started. The JDBC gateway will not be available")
+			return False
+
+		try:
+			jpype.startJVM(jpype.getDefaultJVMPath(), "-Djava.class.path=%s"%(":".join(classpath)))
+		except Exception as errMsg:
+			self.log.error("Cant start the JVM for the JDBC gateway. %s"%(errMsg))
+			return False
+
+		return True
+
+	def run(self):
+		if self.jvmStarted == False:
+			return
+
+		if os.path.exists(self.socketPath):
+			# Left from a server that didnt stop cleanly
+			os.unlink(self.socketPath)
+
+		try:
+			server = jdbcGatewayServer(self.socketPath, jdbcGatewayHandler)
+			os.chmod(self.socketPath, 0o660)
+		except OSError as errMsg:
+			self.log.error("Cant create the socket for the JDBC gateway. %s"%(errMsg))
+			return
+
+		server.gateway = self
+		server.timeout = 1
+		self.log.info("JDBC gateway started on %s"%(self.socketPath))
+
+		while not self.threadStopEvent.isSet():
+			server.handle_request()
+			with self.poolLock:
+				pools = list(self.pools.values())
+			for pool in pools:
+				pool.closeIdleConnections(self.idleTimeout)
+
+		server.server_close()
+		os.unlink(self.socketPath)
+		with self.poolLock:
+			pools = list(self.pools.values())
+		for pool in pools:
+			pool.closeIdleConnections(0)
+		self.log.info("JDBC gateway stopped")
+
+	def getPool(self, message):
+		""" Returns the pool for the database. A new pool is limited by max_import_sessions for the connection alias """
+		# The password is part of the key, so a client must know the credentials to use connections from the pool
+		poolKey = (message["dbalias"], message["url"], message["username"], message["password"])
+
+		with self.poolLock:
+			if poolKey in self.pools:
+				return self.pools[poolKey]
+
+		jdbcConnections = configSchema.jdbcConnections
+		maxConnections = self.defaultPoolSize
+
+		try:
+			session = self.configDBpool.getSession()
+			row = (session.query(jdbcConnections.max_import_sessions)
+				.filter(jdbcConnections.dbalias == message["dbalias"])
+				.one_or_none())
+			session.close()
+
+		except SQLAlchemyError as e:
+			self.log.error(str(e.__dict__['orig']))
+			session.rollback()
+			return None
+
+		except SQLerror:
+			# The connection error is already logged by the connection pool
+			return None
+
+		if row != None and row.max_import_sessions != None and row.max_import_sessions > 0:
+			maxConnections = row.max_import_sessions
+
+		with self.poolLock:
+			if poolKey not in self.pools:
+				self.log.info("Creating a pool with %s connections for '%s'"%(maxConnections, message["dbalias"]))
+				self.pools[poolKey] = jdbcConnectionPool(message["driver"], message["url"], message["username"], message["password"], maxConnections)
+			return self.pools[poolKey]
+
+	def getConnection(self, message):
+		""" Returns the pool, the connection and the response to the client. The status is 'unavailable' if the client should
+			connect in-process instead """
+		try:
+			# Drivers added to the configuration after the JVM was started are not in the classpath
+			jpype.JClass(message["driver"])
+		except Exception:
+			return None, None, { "status": "unavailable", "error": "JDBC driver '%s' is not loaded in the JDBC gateway"%(message["driver"]) }
+
+		pool = self.getPool(message)
+		if pool == None:
+			return None, None, { "status": "unavailable", "error": "JDBC gateway cant read the configuration for '%s'"%(message["dbalias"]) }
+
+		try:
+			connection = pool.getConnection(self.connectionWait)
+		except jaydebeapi.Error as errMsg:
+			return None, None, { "status": "error", "error": str(errMsg) }
+		except jpype.JavaException as exception:
+			return None, None, { "status": "error", "error": exception.message() }
+
+		if connection == None:
+			return None, None, { "status": "unavailable", "error": "All %s JDBC gateway connections for '%s' are in use"%(pool.maxConnections, message["dbalias"]) }
+
+		return pool, connection, { "status": "ok" }
+
+	def execute(self, cursor, query):
+		try:
+			cursor.execute(query)
+		except jaydebeapi.DatabaseError as errMsg:
+			return { "status": "error", "errorType": "DatabaseError", "error": str(errMsg) }
+		except jaydebeapi.Error as errMsg:
+			return { "status": "error", "errorType": "Error", "error": str(errMsg) }
+
+		description = None
+		if cursor.description != None:
+			description = [ [ column[0], self.getTypeName(column[1]) ] + list(column[2:]) for column in cursor.description ]
+
+		return { "status": "ok", "description": description }
+
+	def getTypeName(self, typeObject):
+		""" Returns the name of the jaydebeapi type object, so the client can map it back to the same object """
+		for typeName in jdbcGatewayClient.DBAPI_TYPE_NAMES:
+			if typeObject is getattr(jaydebeapi, typeName):
+				return typeName
+		return None
+
+	def fetch(self, cursor, size):
+		try:
+			if size == None:
+				rows = cursor.fetchall()
+			else:
+				rows = cursor.fetchmany(size)
+		except jaydebeapi.Error as errMsg:
+			return { "status": "error", "errorType": "Error", "error": str(errMsg) }
+
+		return { "status": "ok", "rows": [ list(row) for row in rows ] }
+
+	def attachThread(self):
+		if jpype.isThreadAttachedToJVM() == False:
+			jpype.attachThreadToJVM()
+
+	def detachThread(self):
+		if jpype.isThreadAttachedToJVM() == True:
+			jpype.detachThreadFromJVM()
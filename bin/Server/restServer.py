@@ -38,8 +38,10 @@ from ConfigReader import configuration
 from datetime import date, datetime, timedelta
 from common import constants as constant
 from common.Exceptions import *
+from common import httpSession
 from DBImportConfig import configSchema
 from DBImportConfig import common_config
+from Server import configDBpool
 import sqlalchemy as sa
 from sqlalchemy.ext.automap import automap_base
 from sqlalchemy.exc import SQLAlchemyError
@@ -81,12 +83,11 @@ class restJdbcConnections(Resource):
 
 	@use_args(restArgs)
 	def get(self, args):
-		if self.common_config.configDBSession == None:
-			self.common_config.connectSQLAlchemy(exitIfFailure = False)
-		session = self.common_config.configDBSession()
+		log = logging.getLogger("restServer")
 
 		returnJSON = []
 		try:
+			session = configDBpool.configDBpool().getSession()
 			if args["dbAlias"] == "":
 				jdbcConnectionsDf = pd.DataFrame(session.query(configSchema.jdbcConnections.__table__).all())
 			else:
@@ -100,7 +101,10 @@ class restJdbcConnections(Resource):
 		except SQLAlchemyError as e:
 			log.error(str(e.__dict__['orig']))
 			session.rollback()
-			self.disconnectDBImportDB()
+
+		except SQLerror:
+			# The connection error is already logged by the connection pool
+			pass
 
 		else:
 			for index, row in jdbcConnectionsDf.iterrows():
@@ -116,16 +120,74 @@ class restJdbcConnections(Resource):
 
 		return jsonify(returnJSON)
 
-#	def getDBImportSession(self):
-#		if self.common_config.configDBSession == None:
-#			self.common_config.connectSQLAlchemy(exitIfFailure = False)
-#		return self.common_config.configDBSession()
+class restCopyStatistics(Resource):
+	restArgs = {"days": fields.Int(missing=7)}
+
+	def __init__(self):
+		self.common_config = common_config.config()
+
+	@use_args(restArgs)
+	def get(self, args):
+		""" Returns the number of copies, bytes copied and the average throughput in MB/s per destination for the last 'days' days """
+		log = logging.getLogger("restServer")
+
+		copyStatistics = aliased(configSchema.copyStatistics)
+		startTime = datetime.now() - timedelta(days=args["days"])
+
+		returnJSON = []
+		try:
+			session = configDBpool.configDBpool().getSession()
+			result = (session.query(
+					copyStatistics.destination,
+					func.count(copyStatistics.id).label("copies"),
+					func.sum(copyStatistics.result).label("successful"),
+					func.sum(copyStatistics.bytes_copied).label("bytes_copied"),
+					func.sum(copyStatistics.files_copied).label("files_copied"),
+					func.sum(copyStatistics.duration).label("duration")
+				)
+				.filter(copyStatistics.start >= startTime)
+				.group_by(copyStatistics.destination)
+				.all())
+			session.close()
+
+		except SQLAlchemyError as e:
+			log.error(str(e.__dict__['orig']))
+			session.rollback()
+
+		except SQLerror:
+			# The connection error is already logged by the connection pool
+			pass
+
+		else:
+			for row in result:
+				throughput = 0
+				if row.duration != None and row.duration > 0:
+					throughput = round(float(row.bytes_copied) / 1024 / 1024 / float(row.duration), 2)
+
+				returnDict = {}
+				returnDict["destination"] = row.destination
+				returnDict["copies"] = int(row.copies)
+				returnDict["failed_copies"] = int(row.copies - row.successful)
+				returnDict["bytes_copied"] = int(row.bytes_copied)
+				returnDict["files_copied"] = int(row.files_copied)
+				returnDict["mb_per_second"] = throughput
+				returnJSON.append(returnDict)
+
+		return jsonify(returnJSON)
+
+class restHttpLatency(Resource):
+	def __init__(self):
+		self.common_config = common_config.config()
 
+	def get(self):
+		""" Returns the number of requests, errors and latency per endpoint for the Atlas and REST calls made by this server """
+		return jsonify(httpSession.httpSessions().getLatencyCounters())
 
 class restServer(threading.Thread):
-	def __init__(self, threadStopEvent):
+	def __init__(self, threadStopEvent, configDBpool):
 		threading.Thread.__init__(self)
 		self.threadStopEvent = threadStopEvent
+		self.configDBpool = configDBpool
 
 	def run(self):
 		logger = "restServer"
@@ -133,8 +195,6 @@ class restServer(threading.Thread):
 		log.info("REST Server started")
 		self.mysql_conn = None
 		self.mysql_cursor = None
-		self.configDBSession = None
-		self.configDBEngine = None
 		self.debugLogLevel = False
 
 		if logging.root.level == 10:        # DEBUG
@@ -149,6 +209,8 @@ class restServer(threading.Thread):
 			api.add_resource(restRoot, '/')
 			api.add_resource(restStatus, '/status')
 			api.add_resource(restJdbcConnections, '/jdbc_connections')
+			api.add_resource(restCopyStatistics, '/copy_statistics')
+			api.add_resource(restHttpLatency, '/http_latency')
 
 			log.info("Starting RESTserver on %s:%s"%(restAddress, restPort))
 			serve(
@@ -23,3 +23,6 @@ class Singleton(type):
 			cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
 		return cls._instances[cls]
 
+	def newInstance(cls, *args, **kwargs):
+		""" Creates a new instance of the class that is not shared with the rest of the process. Used by threads that needs their own state """
+		return super(Singleton, cls).__call__(*args, **kwargs)
@@ -0,0 +1,148 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import logging
+import threading
+import time
+import mysql.connector
+import sqlalchemy as sa
+from ConfigReader import configuration
+from common.Singleton import Singleton
+
+class configDatabase(object, metaclass=Singleton):
+	""" Keeps one mysql.connector connection to the DBImport configuration database per thread and one SQLAlchemy engine per
+		process, so the modules in a process dont open their own connections. All queries are counted and timed in getStatistics() """
+
+	def __init__(self):
+		logging.debug("Executing configDatabase.__init__()")
+		self.threadLocal = threading.local()
+		self.counterLock = threading.Lock()
+		self.queryCount = 0
+		self.queryTime = 0.0
+		self.engineLock = threading.Lock()
+		self.engine = None
+
+	def getConnection(self):
+		""" Returns the connection for the current thread. mysql.connector.Error is raised to the caller if the connection fails """
+		connection = getattr(self.threadLocal, "connection", None)
+		if connection != None:
+			return connection
+
+		# Buffered cursors are default, as the code using mysql.connector checks rowcount before the rows are fetched
+		mysqlConnection = mysql.connector.connect(host=configuration.get("Database", "mysql_hostname"),
+												 port=configuration.get("Database", "mysql_port"),
+												 database=configuration.get("Database", "mysql_database"),
+												 user=configuration.get("Database", "mysql_username"),
+												 password=configuration.get("Database", "mysql_password"),
+												 buffered=True)
+
+		self.threadLocal.connection = countingConnection(mysqlConnection, self)
+		return self.threadLocal.connection
+
+	def closeConnection(self):
+		""" Closes the connection for the current thread. Used by threads that are about to stop """
+		connection = getattr(self.threadLocal, "connection", None)
+		if connection == None:
+			return
+
+		self.threadLocal.connection = None
+		connection.close()
+
+	def getEngine(self, echo=False):
+		""" Returns the SQLAlchemy engine for the process. The engine have its own connection pool, so a session that is closed
+			or rolled back never affects uncommitted work done with the mysql.connector cursors, or the other way around """
+		with self.engineLock:
+			if self.engine != None:
+				return self.engine
+
+			connectStr = "mysql+pymysql://%s:%s@%s:%s/%s"%(
+				configuration.get("Database", "mysql_username"),
+				configuration.get("Database", "mysql_password"),
+				configuration.get("Database", "mysql_hostname"),
+				configuration.get("Database", "mysql_port"),
+				configuration.get("Database", "mysql_database"))
+
+			engine = sa.create_engine(connectStr, echo = echo)
+			sa.event.listen(engine, "before_cursor_execute", self.beforeCursorExecute)
+			sa.event.listen(engine, "after_cursor_execute", self.afterCursorExecute)
+
+			self.engine = engine
+			return engine
+
+	def beforeCursorExecute(self, conn, cursor, statement, parameters, context, executemany):
+		conn.info.setdefault("queryStartTime", []).append(time.monotonic())
+
+	def afterCursorExecute(self, conn, cursor, statement, parameters, context, executemany):
+		self.countQuery(time.monotonic() - conn.info["queryStartTime"].pop())
+
+	def countQuery(self, duration):
+		with self.counterLock:
+			self.queryCount += 1
+			self.queryTime += duration
+
+	def getStatistics(self):
+		""" Returns the number of queries against the configuration database and the time spent on them in this process """
+		with self.counterLock:
+			return { "queries": self.queryCount, "seconds": round(self.queryTime, 3) }
+
+class countingConnection(object):
+	""" Wraps a mysql.connector connection so all cursors are counted. Everything else is passed to the real connection """
+
+	def __init__(self, mysqlConnection, configDatabase):
+		self.mysqlConnection = mysqlConnection
+		self.configDatabase = configDatabase
+		self.preparedCursors = {}
+
+	def __getattr__(self, name):
+		return getattr(self.mysqlConnection, name)
+
+	def cursor(self, *args, **kwargs):
+		return countingCursor(self.mysqlConnection.cursor(*args, **kwargs), self.configDatabase)
+
+	def preparedCursor(self, query):
+		""" Returns a prepared cursor for the query. The cursor is reused for the same query so the statement is only prepared once per connection """
+		if query not in self.preparedCursors:
+			# The connection is opened with buffered=True and mysql.connector have no cursor that is both buffered and prepared
+			self.preparedCursors[query] = self.cursor(buffered=False, prepared=True)
+		return self.preparedCursors[query]
+
+class countingCursor(object):
+	""" Wraps a mysql.connector cursor and counts the time spent in execute() and executemany() """
+
+	def __init__(self, mysqlCursor, configDatabase):
+		self.mysqlCursor = mysqlCursor
+		self.configDatabase = configDatabase
+
+	def __getattr__(self, name):
+		return getattr(self.mysqlCursor, name)
+
+	def __iter__(self):
+		return iter(self.mysqlCursor)
+
+	def execute(self, *args, **kwargs):
+		startTime = time.monotonic()
+		try:
+			return self.mysqlCursor.execute(*args, **kwargs)
+		finally:
+			self.configDatabase.countQuery(time.monotonic() - startTime)
+
+	def executemany(self, *args, **kwargs):
+		startTime = time.monotonic()
+		try:
+			return self.mysqlCursor.executemany(*args, **kwargs)
+		finally:
+			self.configDatabase.countQuery(time.monotonic() - startTime)
@@ -0,0 +1,254 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import os
+import re
+import logging
+import subprocess
+import tempfile
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+# Files modified this many seconds before the source is listed gets a checksum in the manifest. 'hdfs dfs -ls' only shows the
+# modification time in minutes, so the checksum is the only way to see if they are rewritten with the same size in the same minute
+HDFS_CHECKSUM_WINDOW = 120
+
+# If an incremental copy have changed files in more directories than this, one distCp job with -update on the whole table is used 
+# instead of one distCp job per directory
+HDFS_INCREMENTAL_MAX_DIRECTORIES = 10
+
+def getDistCPoptions(bandwidth, maps):
+	""" Returns the distCp options that limits the bandwidth (MB/s per map) and the number of maps. None means that distCp default is used """
+
+	distCPoptions = []
+	if bandwidth != None:
+		distCPoptions.extend(["-bandwidth", str(bandwidth)])
+	if maps != None:
+		distCPoptions.extend(["-m", str(maps)])
+	return distCPoptions
+
+def getHDFSfiles(hdfsPath, checksums=False):
+	""" Returns a dict with all files under hdfsPath. The key is the path relative to hdfsPath and the value is a dict with size and 
+	    modification time. Returns None if the listing failed. The modification time only have minute resolution, so a file that was
+	    modified within the last HDFS_CHECKSUM_WINDOW seconds can be rewritten with the same size and still show the same time. With
+	    checksums=True, the HDFS checksum is also included for those files """
+
+	listingTime = datetime.now()
+	hdfsCommandList = ['hdfs', 'dfs', '-ls', '-R', hdfsPath]
+	hdfsProc = subprocess.Popen(hdfsCommandList , stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+	stdOut, stdErr = hdfsProc.communicate()
+
+	if hdfsProc.returncode != 0:
+		logging.debug("Listing of '%s' failed with: %s"%(hdfsPath, stdErr.decode('utf-8').rstrip()))
+		return None
+
+	basePath = urlparse(hdfsPath).path.rstrip('/')
+	hdfsFiles = {}
+
+	for line in stdOut.decode('utf-8').splitlines():
+		# Format: permissions replication owner group size date time path
+		fields = line.split(None, 7)
+		if len(fields) != 8 or fields[0].startswith('d'):
+			continue
+
+		filePath = urlparse(fields[7]).path
+		hdfsFiles[os.path.relpath(filePath, basePath)] = { "size": int(fields[4]), "modified": "%s %s"%(fields[5], fields[6]) }
+
+	if checksums == True:
+		# The time from 'hdfs dfs -ls' is in local time, the same as datetime.now()
+		recentTime = (listingTime - timedelta(seconds=HDFS_CHECKSUM_WINDOW)).strftime("%Y-%m-%d %H:%M")
+		recentFiles = [fileName for fileName, fileAttributes in hdfsFiles.items() if fileAttributes["modified"] >= recentTime]
+
+		fileChecksums = getHDFSchecksums(hdfsPath, recentFiles)
+		if fileChecksums == None:
+			return None
+
+		for fileName, checksum in fileChecksums.items():
+			hdfsFiles[fileName]["checksum"] = checksum
+
+	return hdfsFiles
+
+def getHDFSchecksums(hdfsPath, fileNames):
+	""" Returns a dict with the HDFS checksum for the files. The file names are relative to hdfsPath. Returns None if the checksum 
+	    could not be read for all files """
+
+	basePath = urlparse(hdfsPath).path.rstrip('/')
+	filePaths = [ "%s/%s"%(hdfsPath.rstrip('/'), fileName) for fileName in fileNames ]
+	fileChecksums = {}
+
+	for i in range(0, len(filePaths), 100):
+		hdfsCommandList = ['hdfs', 'dfs', '-checksum'] + filePaths[i:i+100]
+		hdfsProc = subprocess.Popen(hdfsCommandList , stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+		stdOut, stdErr = hdfsProc.communicate()
+
+		if hdfsProc.returncode != 0:
+			logging.debug("Checksum of the files in '%s' failed with: %s"%(hdfsPath, stdErr.decode('utf-8').rstrip()))
+			return None
+
+		for line in stdOut.decode('utf-8').splitlines():
+			# Format: path<TAB>algorithm<TAB>checksum
+			fields = line.split('\t')
+			if len(fields) != 3:
+				continue
+
+			fileChecksums[os.path.relpath(urlparse(fields[0]).path, basePath)] = "%s:%s"%(fields[1], fields[2])
+
+	for fileName in fileNames:
+		if fileName not in fileChecksums:
+			logging.debug("No checksum was returned for '%s'"%(fileName))
+			return None
+
+	return fileChecksums
+
+def getIncrementalCopyPlan(manifest, sourcePath, sourceFiles, targetFiles):
+	""" Compares the manifest from the last successful copy with the files currently on the source and target. Returns a dict with 
+	    the files that needs to be copied and deleted, or None if the manifest is missing or inconsistent and a full copy is required.
+	    A source file is copied if its size or modification time differs from the manifest. Files that had a checksum in the manifest
+	    was modified close to the last copy, so their checksum is also compared """
+
+	if manifest == None or sourceFiles == None or targetFiles == None:
+		return None
+
+	# The target must contain exactly the files that was copied the last time
+	if set(manifest.keys()) != set(targetFiles.keys()):
+		return None
+
+	for fileName, fileAttributes in manifest.items():
+		if targetFiles[fileName]["size"] != fileAttributes["size"]:
+			return None
+
+	filesToCopy = []
+	filesToVerify = []
+	for fileName, fileAttributes in sourceFiles.items():
+		manifestAttributes = manifest.get(fileName)
+		if manifestAttributes == None or manifestAttributes["size"] != fileAttributes["size"] or manifestAttributes["modified"] != fileAttributes["modified"]:
+			filesToCopy.append(fileName)
+		elif "checksum" in manifestAttributes:
+			filesToVerify.append(fileName)
+
+	if len(filesToVerify) > 0:
+		fileChecksums = getHDFSchecksums(sourcePath, [fileName for fileName in filesToVerify if "checksum" not in sourceFiles[fileName]])
+		if fileChecksums == None:
+			return None
+
+		for fileName in filesToVerify:
+			if fileChecksums.get(fileName, sourceFiles[fileName].get("checksum")) != manifest[fileName]["checksum"]:
+				filesToCopy.append(fileName)
+
+	copyPlan = {}
+	copyPlan["copy"] = sorted(filesToCopy)
+	copyPlan["delete"] = sorted([fileName for fileName in manifest if fileName not in sourceFiles])
+	return copyPlan
+
+def getIncrementalCopyCommands(sourcePath, targetPath, copyPlan, distCPoptions):
+	""" Creates the commands needed to execute a copyPlan from getIncrementalCopyPlan(). Returns a list of commands and a list of 
+	    temporary files that must be removed after the commands are executed """
+
+	commandList = []
+	tempFiles = []
+
+	# distCp with a file list will put all files directly in the target directory. So we need one copy for every subdirectory
+	filesPerDirectory = {}
+	for fileName in copyPlan["copy"]:
+		filesPerDirectory.setdefault(os.path.dirname(fileName), []).append(fileName)
+
+	if len(filesPerDirectory) > HDFS_INCREMENTAL_MAX_DIRECTORIES:
+		# Starting one distCp job per directory is slower than letting one job compare all files. -update skips the files that 
+		# have the same size and checksum on the target, and -delete removes the files that no longer exists on the source
+		commandList.append(["hadoop", "distcp"] + distCPoptions + ["-update", "-delete", sourcePath, targetPath])
+		return commandList, tempFiles
+
+	# Files that are removed on the source are removed on the target before the copy starts
+	filesToDelete = [ "%s/%s"%(targetPath.rstrip('/'), fileName) for fileName in copyPlan["delete"] ]
+	for i in range(0, len(filesToDelete), 100):
+		commandList.append(['hdfs', 'dfs', '-rm', '-f', '-skipTrash'] + filesToDelete[i:i+100])
+
+	for directory, fileNames in sorted(filesPerDirectory.items()):
+		fd, fileListName = tempfile.mkstemp(prefix="dbimport_distcp_", suffix=".lst")
+		with os.fdopen(fd, "w") as fileList:
+			for fileName in fileNames:
+				fileList.write("%s/%s\n"%(sourcePath.rstrip('/'), fileName))
+		tempFiles.append(fileListName)
+
+		targetDirectory = targetPath.rstrip('/')
+		if directory != "":
+			targetDirectory = "%s/%s"%(targetDirectory, directory)
+
+		commandList.append(["hadoop", "distcp"] + distCPoptions + ["-update", "-f", "file://%s"%(fileListName), targetDirectory])
+
+	return commandList, tempFiles
+
+def getCopySummary(copyStatistics, copyStart, copyStop):
+	""" Returns a string with the number of bytes and files copied and the throughput in MB/s """
+
+	duration = (copyStop - copyStart).total_seconds()
+	throughput = 0
+	if duration > 0:
+		throughput = copyStatistics["bytes_copied"] / 1024 / 1024 / duration
+
+	return "Copied %s bytes in %s files (%s files skipped) in %s seconds. Throughput was %.2f MB/s"%(
+		copyStatistics["bytes_copied"], copyStatistics["files_copied"], copyStatistics["files_skipped"], int(duration), throughput)
+
+class distCPoutputParser(object):
+	""" Parses the output from distCp while it's running. Keeps track of the result of the MapReduce job and sums up the 
+	    counters from all distCp jobs that the parser have seen """
+
+	jobResultRegex = re.compile(r"\sJob (job_\S+) (completed successfully|failed with state (\S+))")
+	errorRegex = re.compile(r"^\S+ \S+ ERROR ")
+	counterRegex = re.compile(r"^\s+([A-Za-z][A-Za-z_ ]*[A-Za-z])=(\d+)$")
+
+	def __init__(self):
+		self.counters = {}
+		self.newCommand()
+
+	def newCommand(self):
+		""" Resets the job result before the next command is executed. The counters are kept """
+		self.jobID = None
+		self.jobSucceeded = False
+		self.errorFound = False
+
+	def parseRow(self, row):
+		""" Parses one row of output from distCp """
+
+		counterMatch = self.counterRegex.match(row)
+		if counterMatch != None:
+			counterName = counterMatch.group(1)
+			self.counters[counterName] = self.counters.get(counterName, 0) + int(counterMatch.group(2))
+			return
+
+		if self.errorRegex.match(row) != None:
+			self.errorFound = True
+			return
+
+		jobResultMatch = self.jobResultRegex.search(row)
+		if jobResultMatch != None:
+			self.jobID = jobResultMatch.group(1)
+			self.jobSucceeded = jobResultMatch.group(3) == None
+
+	def isSuccessful(self, returnCode):
+		""" Returns True if the last distCp command was successful """
+		return returnCode == 0 and self.errorFound == False and self.jobSucceeded == True
+
+	def getCopyStatistics(self):
+		""" Returns the number of bytes and files that was copied and skipped """
+
+		copyStatistics = {}
+		copyStatistics["bytes_copied"] = self.counters.get("Bytes Copied", 0)
+		copyStatistics["bytes_skipped"] = self.counters.get("Bytes Skipped", 0)
+		copyStatistics["files_copied"] = self.counters.get("Files Copied", 0)
+		copyStatistics["files_skipped"] = self.counters.get("Files Skipped", 0)
+		return copyStatistics
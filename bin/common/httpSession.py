@@ -0,0 +1,116 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import logging
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from urllib3.util.retry import Retry
+from requests_kerberos import HTTPKerberosAuth
+from common.Singleton import Singleton
+
+# Number of retries and the backoff between them for requests that fails with a connection error, a timeout or a 502/503/504 response.
+# Timeouts and 502/503/504 are only retried for idempotent methods like GET
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_RETRY_STATUS = (502, 503, 504)
+
+# Number of keep-alive connections per host in each session
+HTTP_POOL_SIZE = 10
+
+class httpSessions(object, metaclass=Singleton):
+	""" Keeps one requests.Session per name and thread so keep-alive connections and the Kerberos context are reused between calls.
+		All calls are timed and the latency is available per endpoint in getLatencyCounters() """
+
+	def __init__(self):
+		logging.debug("Executing httpSession.__init__()")
+		self.threadLocal = threading.local()
+		self.counterLock = threading.Lock()
+		self.latencyCounters = {}
+
+	def getSession(self, name, kerberos=False):
+		""" Returns the session with 'name' for the current thread. The session is created on the first call """
+		try:
+			sessions = self.threadLocal.sessions
+		except AttributeError:
+			sessions = {}
+			self.threadLocal.sessions = sessions
+
+		if name not in sessions:
+			# A POST is only retried on connection errors, as the server might already have processed the body
+			retry = Retry(total=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR, status_forcelist=HTTP_RETRY_STATUS, raise_on_status=False)
+
+			adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+			session = requests.Session()
+			session.mount("http://", adapter)
+			session.mount("https://", adapter)
+			if kerberos == True:
+				session.auth = HTTPKerberosAuth()
+			sessions[name] = session
+
+		return sessions[name]
+
+	def request(self, name, method, url, kerberos=False, **kwargs):
+		""" Sends the request with the session called 'name' and updates the latency counter for the endpoint. Exceptions from requests are raised to the caller """
+		log = logging.getLogger()
+		session = self.getSession(name, kerberos=kerberos)
+
+		urlParts = urlsplit(url)
+		endpoint = "%s %s://%s%s"%(method, urlParts.scheme, urlParts.netloc, urlParts.path)
+
+		startTime = time.monotonic()
+		failed = True
+		try:
+			response = session.request(method, url, **kwargs)
+			if response.status_code < 400:
+				failed = False
+			return response
+		finally:
+			duration = time.monotonic() - startTime
+			log.debug("HTTP %s took %.3f seconds"%(endpoint, duration))
+			self.updateLatencyCounter(name, endpoint, duration, failed)
+
+	def updateLatencyCounter(self, name, endpoint, duration, failed):
+		with self.counterLock:
+			if endpoint not in self.latencyCounters:
+				self.latencyCounters[endpoint] = { "session": name, "requests": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0 }
+
+			counter = self.latencyCounters[endpoint]
+			counter["requests"] += 1
+			counter["total_seconds"] += duration
+			if duration > counter["max_seconds"]:
+				counter["max_seconds"] = duration
+			if failed == True:
+				counter["errors"] += 1
+
+	def getLatencyCounters(self):
+		""" Returns a list with one dict per endpoint containing number of requests, errors and average and max latency in milliseconds """
+		result = []
+		with self.counterLock:
+			for endpoint, counter in sorted(self.latencyCounters.items()):
+				returnDict = {}
+				returnDict["session"] = counter["session"]
+				returnDict["endpoint"] = endpoint
+				returnDict["requests"] = counter["requests"]
+				returnDict["errors"] = counter["errors"]
+				returnDict["avg_ms"] = round(counter["total_seconds"] * 1000 / counter["requests"], 1)
+				returnDict["max_ms"] = round(counter["max_seconds"] * 1000, 1)
+				result.append(returnDict)
+
+		return result
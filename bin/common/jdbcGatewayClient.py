@@ -0,0 +1,167 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+# Client for the JDBC gateway in the DBImport server. The gateway keeps a warm JVM and pooled JDBC connections, so the
+# import, export and manage tools dont need to start their own JVM. The protocol is one JSON document per line over a
+# Unix socket. The connection and cursor classes have the same methods as the jaydebeapi ones that DBImport uses
+
+import json
+import socket
+import logging
+from common.Exceptions import *
+from common import lazyImport
+
+# Only used to raise the same exceptions and return the same column types as an in-process connection
+jaydebeapi = lazyImport.lazyModule("jaydebeapi")
+
+# The column types in cursor.description are sent as the name of the type object in jaydebeapi
+DBAPI_TYPE_NAMES = ("STRING", "TEXT", "BINARY", "NUMBER", "FLOAT", "DECIMAL", "DATE", "TIME", "DATETIME", "ROWID")
+
+def sendMessage(stream, message):
+	""" Writes one message to the stream. Values that JSON cant handle, like dates from some drivers, are sent as strings """
+	stream.write((json.dumps(message, default=str) + "\n").encode("utf-8"))
+	stream.flush()
+
+def readMessage(stream):
+	""" Reads one message from the stream. None is returned if the other side has closed the connection """
+	line = stream.readline()
+	if not line:
+		return None
+	return json.loads(line.decode("utf-8"))
+
+def connect(socketPath, dbAlias, driver, url, username, password, connectTimeout=10):
+	""" Connects to the source database through the gateway. Raises jdbcGatewayUnavailable if the gateway isnt running or
+		cant load the driver, so the caller can connect in-process instead. Raises SQLerror if the database refused the connection """
+	logging.debug("Executing jdbcGatewayClient.connect()")
+
+	try:
+		gatewaySocket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		gatewaySocket.settimeout(connectTimeout)
+		gatewaySocket.connect(socketPath)
+
+		# Queries against the source can run for a long time, so there is no timeout after the connection is made
+		gatewaySocket.settimeout(None)
+	except OSError as errMsg:
+		raise jdbcGatewayUnavailable("Cant connect to JDBC gateway on '%s'. %s"%(socketPath, errMsg))
+
+	connection = gatewayConnection(gatewaySocket)
+	try:
+		sendMessage(connection.stream, {
+			"command": "connect",
+			"dbalias": dbAlias,
+			"driver": driver,
+			"url": url,
+			"username": username,
+			"password": password
+			})
+		response = readMessage(connection.stream)
+	except OSError as errMsg:
+		response = { "status": "unavailable", "error": "Connection to JDBC gateway failed. %s"%(errMsg) }
+
+	if response == None:
+		response = { "status": "unavailable", "error": "JDBC gateway closed the connection" }
+
+	if response["status"] == "unavailable":
+		connection.close()
+		raise jdbcGatewayUnavailable(response["error"])
+
+	if response["status"] != "ok":
+		connection.close()
+		raise SQLerror(response["error"])
+
+	logging.debug("Executing jdbcGatewayClient.connect() - Finished")
+	return connection
+
+class gatewayConnection(object):
+	def __init__(self, gatewaySocket):
+		self.gatewaySocket = gatewaySocket
+		self.stream = gatewaySocket.makefile("rwb")
+
+	def request(self, message):
+		""" Sends a request and returns the response from the gateway """
+		try:
+			sendMessage(self.stream, message)
+			response = readMessage(self.stream)
+		except OSError as errMsg:
+			raise jaydebeapi.OperationalError("Connection to JDBC gateway failed. %s"%(errMsg))
+
+		if response == None:
+			raise jaydebeapi.OperationalError("JDBC gateway closed the connection")
+		return response
+
+	def cursor(self):
+		return gatewayCursor(self)
+
+	def close(self):
+		""" Returns the JDBC connection to the pool in the gateway """
+		if self.stream == None:
+			return
+
+		try:
+			sendMessage(self.stream, { "command": "close" })
+			self.stream.close()
+			self.gatewaySocket.close()
+		except OSError:
+			pass
+		self.stream = None
+
+class gatewayCursor(object):
+	def __init__(self, connection):
+		self.connection = connection
+		self.gatewayDescription = None
+
+	@property
+	def description(self):
+		""" Same format as jaydebeapi. The type names are mapped back to the jaydebeapi type objects """
+		if self.gatewayDescription == None:
+			return None
+
+		description = []
+		for column in self.gatewayDescription:
+			typeObject = None
+			if column[1] in DBAPI_TYPE_NAMES:
+				typeObject = getattr(jaydebeapi, column[1])
+			description.append(tuple([ column[0], typeObject ] + column[2:]))
+		return description
+
+	def execute(self, query):
+		response = self.connection.request({ "command": "execute", "query": query })
+		if response["status"] != "ok":
+			raise getattr(jaydebeapi, response.get("errorType", "Error"), jaydebeapi.Error)(response["error"])
+
+		self.gatewayDescription = response["description"]
+
+	def fetch(self, size):
+		response = self.connection.request({ "command": "fetch", "size": size })
+		if response["status"] != "ok":
+			raise getattr(jaydebeapi, response.get("errorType", "Error"), jaydebeapi.Error)(response["error"])
+		return [ tuple(row) for row in response["rows"] ]
+
+	def fetchone(self):
+		rows = self.fetch(1)
+		if len(rows) == 0:
+			return None
+		return rows[0]
+
+	def fetchmany(self, size=1):
+		return self.fetch(size)
+
+	def fetchall(self):
+		return self.fetch(None)
+
+	def close(self):
+		pass
@@ -0,0 +1,38 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import sys
+import importlib.util
+
+def lazyModule(name):
+	""" Returns the module without executing it. The module is loaded the first time one of its attributes is used. This keeps
+		heavy modules like jaydebeapi, pymongo and the ORM schemas out of the startup of commands that never use them.
+		Only use it for modules where the code access attributes on the module, as 'from x import y' will load it directly """
+
+	if name in sys.modules:
+		return sys.modules[name]
+
+	spec = importlib.util.find_spec(name)
+	if spec == None:
+		raise ModuleNotFoundError("No module named '%s'"%(name), name=name)
+
+	loader = importlib.util.LazyLoader(spec.loader)
+	spec.loader = loader
+	module = importlib.util.module_from_spec(spec)
+	sys.modules[name] = module
+	loader.exec_module(module)
+	return module
@@ -0,0 +1,183 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+# Startup profiling and cold start benchmark for the DBImport command line tools.
+#
+# Set DBIMPORT_PROFILE_STARTUP=true before running import, export or manage to get a report of the time spent importing
+# each Python module. The benchmark runs each tool in new processes and can be compared against a saved baseline:
+#
+#   cd $DBIMPORT_HOME/bin
+#   python3 -m common.startupProfile --saveBaseline=/tmp/startup.json
+#   python3 -m common.startupProfile --baseline=/tmp/startup.json
+
+import os
+import sys
+import time
+import subprocess
+
+STARTUP_PROFILE_ENV = "DBIMPORT_PROFILE_STARTUP"
+STARTUP_PROFILE_TOP_MODULES = 30
+
+BENCHMARK_RUNS = 5
+BENCHMARK_TOLERANCE = 0.20
+
+# The modules each tool needs for a full run. The tools themselves only load them when the operation starts
+CLI_MODULES = {
+	"import": [ "DBImportOperation.import_operations", "DBImportOperation.copy_operations", "DBImportOperation.etl_operations" ],
+	"export": [ "DBImportOperation.export_operations" ],
+	"manage": [ "DBImportConfig.common_config" ]
+	}
+
+binDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def start():
+	""" Called first in the command line tools. If DBIMPORT_PROFILE_STARTUP is set, the tool is started again in a child
+		process with '-X importtime' and a summary of the module import times is printed when it finishes """
+	if os.environ.get(STARTUP_PROFILE_ENV, "").lower() not in ("1", "true"):
+		return
+
+	env = dict(os.environ)
+	env.pop(STARTUP_PROFILE_ENV)
+
+	startTime = time.monotonic()
+	proc = subprocess.Popen([sys.executable, "-X", "importtime"] + sys.argv, stderr=subprocess.PIPE, env=env, universal_newlines=True)
+	importTimes = []
+	for line in proc.stderr:
+		if not line.startswith("import time:"):
+			sys.stderr.write(line)
+			continue
+
+		importTime = parseImportTimeLine(line)
+		if importTime != None:
+			importTimes.append(importTime)
+	proc.wait()
+
+	printImportTimes(importTimes, time.monotonic() - startTime)
+	sys.exit(proc.returncode)
+
+def parseImportTimeLine(line):
+	""" Returns (module, self seconds, cumulative seconds) for a line from '-X importtime', or None for all other lines """
+	if not line.startswith("import time:"):
+		return None
+
+	columns = line[len("import time:"):].split("|")
+	if len(columns) != 3:
+		return None
+
+	try:
+		selfTime = int(columns[0]) / 1000000
+		cumulativeTime = int(columns[1]) / 1000000
+	except ValueError:
+		# The header line
+		return None
+
+	# The module name is indented with the depth in the import tree
+	return (columns[2].strip(), selfTime, cumulativeTime)
+
+def printImportTimes(importTimes, runTime):
+	totalImportTime = sum(importTime[1] for importTime in importTimes)
+
+	sys.stderr.write("\n")
+	sys.stderr.write("Startup profile: %s modules imported in %.3f seconds (total runtime %.3f seconds)\n"%(len(importTimes), totalImportTime, runTime))
+	sys.stderr.write("%-60s %12s %12s\n"%("Module", "Self (s)", "Total (s)"))
+	for module, selfTime, cumulativeTime in sorted(importTimes, key=lambda importTime: importTime[2], reverse=True)[:STARTUP_PROFILE_TOP_MODULES]:
+		sys.stderr.write("%-60s %12.3f %12.3f\n"%(module, selfTime, cumulativeTime))
+
+def timeCommand(command, checkExitCode=True):
+	""" Runs the command in a new process and returns the wall clock time in seconds """
+	startTime = time.monotonic()
+	subprocess.run(command, cwd=binDirectory, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=checkExitCode)
+	return time.monotonic() - startTime
+
+def benchmark(runs=BENCHMARK_RUNS):
+	""" Measures cold start for each tool. 'startup' is the tool running up to argument parsing and 'modules' is loading
+		everything the tool needs for a full run. The median of all runs is returned """
+	# Only imported here to keep it out of the startup of the tools
+	import statistics
+
+	result = {}
+	for cli, modules in CLI_MODULES.items():
+		# All tools supports --help, but they exit with 1 after printing it
+		startupCommand = [sys.executable, os.path.join(binDirectory, cli), "--help"]
+		modulesCommand = [sys.executable, "-c", "; ".join("import %s"%(module) for module in modules)]
+
+		result[cli] = {
+			"startup": statistics.median(timeCommand(startupCommand, checkExitCode=False) for i in range(runs)),
+			"modules": statistics.median(timeCommand(modulesCommand) for i in range(runs))
+			}
+	return result
+
+def compareWithBaseline(result, baseline, tolerance=BENCHMARK_TOLERANCE):
+	""" Returns a list of the measurements that are more than 'tolerance' slower than the baseline """
+	regressions = []
+	for cli, measurements in result.items():
+		for measurement, seconds in measurements.items():
+			baselineSeconds = baseline.get(cli, {}).get(measurement)
+			if baselineSeconds != None and seconds > baselineSeconds * (1 + tolerance):
+				regressions.append("%s %s: %.3f seconds, baseline is %.3f seconds"%(cli, measurement, seconds, baselineSeconds))
+	return regressions
+
+def main(argv):
+	import json
+	import getopt
+
+	try:
+		opts, args = getopt.getopt(argv, "", ["runs=", "baseline=", "saveBaseline=", "tolerance="])
+	except getopt.GetoptError as errMsg:
+		print(errMsg)
+		print("Usage: python3 -m common.startupProfile [--runs=N] [--baseline=FILE] [--saveBaseline=FILE] [--tolerance=0.20]")
+		sys.exit(1)
+
+	runs = BENCHMARK_RUNS
+	tolerance = BENCHMARK_TOLERANCE
+	baselineFile = None
+	saveBaselineFile = None
+
+	for opt, arg in opts:
+		if opt == "--runs":
+			runs = int(arg)
+		elif opt == "--tolerance":
+			tolerance = float(arg)
+		elif opt == "--baseline":
+			baselineFile = arg
+		elif opt == "--saveBaseline":
+			saveBaselineFile = arg
+
+	result = benchmark(runs)
+
+	print("%-10s %12s %12s"%("Tool", "Startup (s)", "Modules (s)"))
+	for cli, measurements in result.items():
+		print("%-10s %12.3f %12.3f"%(cli, measurements["startup"], measurements["modules"]))
+
+	if saveBaselineFile != None:
+		with open(saveBaselineFile, "w") as f:
+			json.dump(result, f, indent=4)
+		print("Baseline saved to %s"%(saveBaselineFile))
+
+	if baselineFile != None:
+		with open(baselineFile) as f:
+			regressions = compareWithBaseline(result, json.load(f), tolerance)
+
+		if len(regressions) > 0:
+			print("Cold start is slower than the baseline:")
+			for regression in regressions:
+				print("  %s"%(regression))
+			sys.exit(1)
+		print("Cold start is within %s%% of the baseline"%(int(tolerance * 100)))
+
+if __name__ == "__main__":
+	main(sys.argv[1:])
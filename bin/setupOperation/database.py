@@ -573,3 +573,24 @@ class initialize(object):
 				valueInt='0', 
 				description='If 1, then the import will do a full processing of import even if they contain no data.')
 			self.configDB.execute(query)
+
+		if result_df.empty or (result_df[0] == 'copy_sync_max_parallel').any() == False:
+			query = sa.insert(configSchema.configuration).values(
+				configKey='copy_sync_max_parallel', 
+				valueInt='3', 
+				description='The maximum number of synchronous copies to other DBImport instances that will run in parallel')
+			self.configDB.execute(query)
+
+		if result_df.empty or (result_df[0] == 'atlas_async_lineage').any() == False:
+			query = sa.insert(configSchema.configuration).values(
+				configKey='atlas_async_lineage', 
+				valueInt='1', 
+				description='If 1, imports and exports saves the Atlas updates in the atlas_outbox table and the DBImport server sends them to Atlas. If 0, they are sent to Atlas directly')
+			self.configDB.execute(query)
+
+		if result_df.empty or (result_df[0] == 'buffer_stage_statistics').any() == False:
+			query = sa.insert(configSchema.configuration).values(
+				configKey='buffer_stage_statistics', 
+				valueInt='0', 
+				description='If 1, the stage statistics are kept in memory and saved when an import or export moves to a new phase. The current stage is always saved directly')
+			self.configDB.execute(query)
@@ -85,7 +85,8 @@ class source(object):
 			query += "	AND colDesc.name = COL.COLUMN_NAME " 
 			query += "WHERE lower(TBL.TABLE_TYPE) in ('base table','view') "
 			query += "	AND COL.TABLE_SCHEMA = '%s' "%(schema)
-			query += "	AND COL.TABLE_NAME = '%s' "%(table)
+			if table != None:
+				query += "	AND COL.TABLE_NAME = '%s' "%(table)
 			query += "ORDER BY TBL.TABLE_SCHEMA, TBL.TABLE_NAME,COL.ordinal_position"
 
 #			query  = "select "
@@ -131,6 +132,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 #				line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
 #				line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 				if row[2] == "" or row[2] == None:
@@ -205,7 +209,8 @@ class source(object):
 			query += "  ON ALL_TAB_COLUMNS.TABLE_NAME = ALL_OBJECTS.OBJECT_NAME " 
 			query += "  AND ALL_COL_COMMENTS.OWNER = ALL_OBJECTS.OWNER " 
 			query += "WHERE ALL_TAB_COLUMNS.OWNER = '%s' "%(schema)
-			query += "  AND ALL_TAB_COLUMNS.TABLE_NAME = '%s' "%(table)
+			if table != None:
+				query += "  AND ALL_TAB_COLUMNS.TABLE_NAME = '%s' "%(table)
 			query += "  AND ALL_OBJECTS.OBJECT_TYPE IN ('TABLE', 'VIEW') " 
 			query += "ORDER BY SCHEMA_NAME, ALL_TAB_COLUMNS.TABLE_NAME, ALL_TAB_COLUMNS.COLUMN_ID"
 
@@ -220,6 +225,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 #				line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
 #				line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 				if row[2] == "" or row[2] == None:
@@ -284,7 +292,9 @@ class source(object):
 			query += "from information_schema.columns c "
 			query += "left join information_schema.tables t " 
 			query += "   on c.table_schema = t.table_schema and c.table_name = t.table_name "
-			query += "where c.table_schema = '%s' and c.table_name = '%s' "%(database, table)
+			query += "where c.table_schema = '%s' "%(database)
+			if table != None:
+				query += "   and c.table_name = '%s' "%(table)
 			query += "order by c.table_schema,c.table_name, c.ordinal_position "
 
 			logging.debug("SQL Statement executed: %s" % (query) )
@@ -298,6 +308,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 
 				if row[2] == "" or row[2] == None:
 					line_dict["TABLE_COMMENT"] = None
@@ -351,7 +364,8 @@ class source(object):
 			query += "	AND ST.CREATOR = SC.TBCREATOR "
 			query += "WHERE "
 			query += "	ST.CREATOR = '%s' "%(schema)
-			query += "	AND ST.NAME = '%s' "%(table)
+			if table != None:
+				query += "	AND ST.NAME = '%s' "%(table)
 			query += "ORDER BY ST.CREATOR, ST.NAME"
 
 			logging.debug("SQL Statement executed: %s" % (query) )
@@ -366,6 +380,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 				if row[2] == "" or row[2] == None:
 					line_dict["TABLE_COMMENT"] = None
 				else:
@@ -420,7 +437,8 @@ class source(object):
 			query += "	AND ST.TABLE_NAME= SC.TABLE_NAME "
 			query += "WHERE "
 			query += "	ST.TABLE_SCHEMA = '%s' "%(schema)
-			query += "	AND SC.TABLE_NAME = '%s' "%(table)
+			if table != None:
+				query += "	AND SC.TABLE_NAME = '%s' "%(table)
 			query += "ORDER BY ST.TABLE_SCHEMA, SC.TABLE_NAME, SC.ORDINAL_POSITION"
 
 			logging.debug("SQL Statement executed: %s" % (query) )
@@ -434,6 +452,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 #				line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
 #				line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 				if row[2] == "" or row[2] == None:
@@ -489,7 +510,8 @@ class source(object):
 			query += "	AND tab_tables.table_name = tab_columns.table_name "
 			query += "WHERE tab_columns.table_catalog = '%s' "%(database)
 			query += "	AND tab_columns.table_schema ='%s' "%(schema)
-			query += "	AND tab_columns.table_name = '%s' "%(table)
+			if table != None:
+				query += "	AND tab_columns.table_name = '%s' "%(table)
 			query += "ORDER BY table_schema, table_name"
 
 			logging.debug("SQL Statement executed: %s" % (query) )
@@ -503,6 +525,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 
 				if row[2] == "" or row[2] == None:
 					line_dict["TABLE_COMMENT"] = None
@@ -548,7 +573,8 @@ class source(object):
 			query += "	AND tab_tables.OWNER = tab_columns.OWNER  "
 			query += "WHERE "
 			query += "	tab_columns.OWNER = '%s' "%(schema)
-			query += "	AND tab_columns.TBL = '%s' "%(table)
+			if table != None:
+				query += "	AND tab_columns.TBL = '%s' "%(table)
 			query += "ORDER BY tab_tables.OWNER, tab_tables.TBL"
 
 			logging.debug("SQL Statement executed: %s" % (query) )
@@ -562,6 +588,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 #				line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
 #				line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 				if row[2] == "" or row[2] == None:
@@ -635,7 +664,8 @@ class source(object):
 			query += "	ON oParentColDtl.TABLE_NAME=PKnUTable.name " 
 			query += "	AND oParentColDtl.COLUMN_NAME=PKnUKEYCol.name " 
 			query += "WHERE oParentColDtl.TABLE_SCHEMA = '%s' "%(schema)
-			query += "	and PKnUTable.name = '%s' "%(table)
+			if table != None:
+				query += "	and PKnUTable.name = '%s' "%(table)
 			query += "	and PKnUKEY.type_desc = 'PRIMARY_KEY_CONSTRAINT' "
 
 			query += "UNION ALL " 
@@ -671,7 +701,8 @@ class source(object):
 			query += "	AND FKC.referenced_column_id=oReferenceCol.column_id " 
 			query += "INNER JOIN  sys.[tables] AS T  ON T.[object_id] = oReferenceCol.[object_id] "
 			query += "WHERE oParentColDtl.TABLE_SCHEMA = '%s' "%(schema)
-			query += "	and oParent.name = '%s' "%(table)
+			if table != None:
+				query += "	and oParent.name = '%s' "%(table)
 			query += "ORDER BY SCHEMA_NAME, TABLE_NAME, CONSTRAINT_TYPE, ORDINAL_POSITION"
 
 			logging.debug("SQL Statement executed: %s" % (query) )
@@ -685,6 +716,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 #				line_dict["SCHEMA_NAME"] = line.split('|')[0]
 #				line_dict["TABLE_NAME"] = line.split('|')[1]
 				line_dict["CONSTRAINT_NAME"] = row[2]
@@ -723,7 +757,8 @@ class source(object):
 			query += "  AND acc.COLUMN_NAME = atc.COLUMN_NAME "
 			query += "WHERE ac.CONSTRAINT_TYPE = 'P' "
 			query += "  AND acc.OWNER = '%s' "%(schema)
-			query += "  AND acc.TABLE_NAME = '%s' "%(table)
+			if table != None:
+				query += "  AND acc.TABLE_NAME = '%s' "%(table)
 			query += "UNION ALL " 
 			query += "select "
 			query += "  b.owner AS SCHEMA_NAME, " 
@@ -755,7 +790,8 @@ class source(object):
 			query += "where "
 			query += "  a.constraint_type = 'R' "
 			query += "  AND b.OWNER = '%s' "%(schema)
-			query += "  AND b.TABLE_NAME = '%s' "%(table)
+			if table != None:
+				query += "  AND b.TABLE_NAME = '%s' "%(table)
 			query += "ORDER BY SCHEMA_NAME, TABLE_NAME,CONSTRAINT_TYPE,CONSTRAINT_NAME,COL_KEY_POSITION"
 
 			logging.debug("SQL Statement executed: %s" % (query) )
@@ -769,6 +805,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 #				line_dict["SCHEMA_NAME"] = line.split('|')[0]
 #				line_dict["TABLE_NAME"] = line.split('|')[1]
 				line_dict["CONSTRAINT_NAME"] = row[2]
@@ -801,7 +840,8 @@ class source(object):
 			query += "	kcu.referenced_table_name IS NULL " 
 			query += "	AND (CONSTRAINT_NAME='PRIMARY' OR CONSTRAINT_NAME='UNIQUE') "
 			query += "	AND kcu.CONSTRAINT_SCHEMA = '%s' "%(database)
-			query += "	AND kcu.table_name = '%s' "%(table)
+			if table != None:
+				query += "	AND kcu.table_name = '%s' "%(table)
 
 			query += "UNION "
 
@@ -823,7 +863,8 @@ class source(object):
 			query += "WHERE "
 			query += "	kcu.referenced_table_name IS NOT NULL " 
 			query += "	AND kcu.CONSTRAINT_SCHEMA = '%s' "%(database)
-			query += "	AND kcu.table_name = '%s' "%(table)
+			if table != None:
+				query += "	AND kcu.table_name = '%s' "%(table)
 			query += "order by schema_name, table_name, CONSTRAINT_TYPE, COL_KEY_POSITION"
 
 			logging.debug("SQL Statement executed: %s" % (query) )
@@ -837,6 +878,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 #				line_dict["SCHEMA_NAME"] = line.split('|')[0]
 #				line_dict["TABLE_NAME"] = line.split('|')[1]
 				line_dict["CONSTRAINT_NAME"] = row[2]
@@ -872,7 +916,8 @@ class source(object):
 			query += "	SI.COLNAMES = CONCAT('+',SC.NAME) "
 			query += "	AND SI.uniquerule = 'P'"
 			query += "	AND SI.TBCREATOR = '%s' "%(schema)
-			query += "	AND SI.TBNAME = '%s' "%(table)
+			if table != None:
+				query += "	AND SI.TBNAME = '%s' "%(table)
 
 			query += "UNION ALL " 
 
@@ -940,7 +985,8 @@ class source(object):
 			query += "  AND TRIM(SC.NAME)= TRIM(R.FK_COLNAMES) "
 			query += "WHERE "
 			query += "	R.tabschema = '%s' "%(schema)
-			query += "	AND R.tabname = '%s' "%(table)
+			if table != None:
+				query += "	AND R.tabname = '%s' "%(table)
 			query += "ORDER BY SCHEMA_NAME, TABLE_NAME, CONSTRAINT_TYPE, ORDINAL_POSITION "
 
 			logging.debug("SQL Statement executed: %s" % (query) )
@@ -954,6 +1000,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 #				line_dict["SCHEMA_NAME"] = line.split('|')[0]
 #				line_dict["TABLE_NAME"] = line.split('|')[1]
 				line_dict["CONSTRAINT_NAME"] = row[2]
@@ -990,7 +1039,8 @@ class source(object):
 			query += "	AND SPK.COLUMN_NAME=SC.COLUMN_NAME "
 			query += "WHERE " 
 			query += "	SPK.TABLE_SCHEM = '%s' "%(schema)
-			query += "	AND SPK.TABLE_NAME = '%s' "%(table)
+			if table != None:
+				query += "	AND SPK.TABLE_NAME = '%s' "%(table)
 
 			query += "UNION ALL " 
 
@@ -1016,7 +1066,8 @@ class source(object):
 			query += "	AND SFK.FKCOLUMN_NAME = SC.COLUMN_NAME "
 			query += "WHERE " 
 			query += "	SFK.FKTABLE_SCHEM = '%s' "%(schema)
-			query += "	AND SFK.FKTABLE_NAME = '%s' "%(table)
+			if table != None:
+				query += "	AND SFK.FKTABLE_NAME = '%s' "%(table)
 			query += "ORDER BY SCHEMA_NAME, TABLE_NAME, CONSTRAINT_TYPE, ORDINAL_POSITION"
 
 			logging.debug("SQL Statement executed: %s" % (query) )
@@ -1030,6 +1081,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 #				line_dict["SCHEMA_NAME"] = line.split('|')[0]
 #				line_dict["TABLE_NAME"] = line.split('|')[1]
 				line_dict["CONSTRAINT_NAME"] = row[2]
@@ -1066,7 +1120,8 @@ class source(object):
 			query += "	AND pg_get_constraintdef(c.oid) LIKE 'PRIMARY KEY %' "
 			query += "	AND ist.table_catalog = '%s' "%(database)
 			query += "	AND kcu.constraint_schema ='%s' "%(schema)
-			query += "	AND kcu.table_name = '%s' "%(table)
+			if table != None:
+				query += "	AND kcu.table_name = '%s' "%(table)
 
 			query += "UNION " 
 
@@ -1096,7 +1151,8 @@ class source(object):
 			query += "	AND pg_get_constraintdef(c.oid) LIKE 'FOREIGN KEY %' "
 			query += "	AND ist.table_catalog = '%s' "%(database)
 			query += "	AND kcu.constraint_schema ='%s' "%(schema)
-			query += "	AND kcu.table_name = '%s' "%(table)
+			if table != None:
+				query += "	AND kcu.table_name = '%s' "%(table)
 			query += "ORDER BY SCHEMA_NAME, TABLE_NAME,CONSTRAINT_TYPE "
 
 			logging.debug("SQL Statement executed: %s" % (query) )
@@ -1110,6 +1166,9 @@ class source(object):
 			for row in JDBCCursor.fetchall():
 				logging.debug(row)
 				line_dict = {}
+				if table == None:
+					line_dict["SCHEMA_NAME"] = self.removeNewLine(row[0])
+					line_dict["TABLE_NAME"] = self.removeNewLine(row[1])
 				schemaName = row[0]
 				tableName = row[1]
 				constraintName = row[2]